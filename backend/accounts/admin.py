@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.db.models import Count
 from .models import User
+from .stats import user_summary
 
 
 @admin.register(User)
@@ -94,18 +95,8 @@ class UserAdmin(admin.ModelAdmin):
     def changelist_view(self, request, extra_context=None):
         extra_context = extra_context or {}
         
-        # Calculate statistics
-        total_users = User.objects.count()
-        active_users = User.objects.filter(is_active=True).count()
-        student_users = User.objects.filter(is_staff=False, is_superuser=False).count()
-        premium_members = User.objects.filter(membership_type='premium').count()
-        
-        extra_context['dashboard_stats'] = {
-            'total_users': total_users,
-            'active_users': active_users,
-            'student_users': student_users,
-            'premium_members': premium_members,
-        }
+        # Calculate statistics (one cached aggregate query)
+        extra_context['dashboard_stats'] = user_summary()
         
         return super().changelist_view(request, extra_context)
 
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import User
+from .stats import invalidate_user_stats
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def expire_user_stats(sender, instance, **kwargs):
+    """Keep the admin dashboard counts in step with user changes"""
+    invalidate_user_stats()
@@ -0,0 +1,131 @@
+"""
+Primary/replica routing.
+
+When DATABASES has a 'replica' alias (DATABASE_REPLICA_URL), ReplicaRoutingMiddleware
+marks safe GET/HEAD requests and views decorated with @replica_read as replica
+reads, and ReplicaRouter sends their queries there. Writes always go to the
+primary, and a user who has just written is pinned to the primary for
+REPLICA_PIN_SECONDS so they read their own changes. Without a replica every
+query uses 'default' as before.
+"""
+
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_DB_ALIAS = 'replica'
+PIN_COOKIE = 'db_pin'
+
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def replica_configured():
+    return REPLICA_DB_ALIAS in connections.settings
+
+
+def replica_read(view):
+    """Mark a reporting view as safe to serve from the replica. Apply above @api_view."""
+    view.replica_read = True
+    return view
+
+
+def primary_read(view):
+    """Keep a view's reads on the primary even for GET requests"""
+    view.replica_read = False
+    return view
+
+
+class ReplicaRouter:
+    """Route reads to the replica when the current request allows it"""
+
+    def db_for_read(self, model, **hints):
+        if _read_alias.get() != REPLICA_DB_ALIAS or not replica_configured():
+            return None
+        # Reads inside a primary transaction must see that transaction's writes
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return REPLICA_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives its schema through replication
+        return db != REPLICA_DB_ALIAS
+
+
+def _pin_key(user_id):
+    return f'db-pin:{user_id}'
+
+
+def _request_user_id(request):
+    """Session user, or the user id claim of a bearer JWT (verified, but no DB lookup)"""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.pk
+
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    if not header.startswith('Bearer '):
+        return None
+    from rest_framework_simplejwt.settings import api_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+    try:
+        return AccessToken(header.split(' ', 1)[1])[api_settings.USER_ID_CLAIM]
+    except Exception:
+        return None
+
+
+def is_pinned(request):
+    if request.COOKIES.get(PIN_COOKIE):
+        return True
+    user_id = _request_user_id(request)
+    return user_id is not None and cache.get(_pin_key(user_id)) is not None
+
+
+def pin_to_primary(request, response):
+    """Keep this client on the primary long enough to read its own write"""
+    seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 10)
+    user_id = _request_user_id(request)
+    if user_id is not None:
+        cache.set(_pin_key(user_id), 1, seconds)
+    response.set_cookie(PIN_COOKIE, '1', max_age=seconds, httponly=True, samesite='Lax')
+
+
+class ReplicaRoutingMiddleware:
+    """Decide per request whether reads may use the replica"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replica_configured():
+            return self.get_response(request)
+
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_alias.set(None)
+
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400:
+            pin_to_primary(request, response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not replica_configured():
+            return None
+
+        marker = getattr(view_func, 'replica_read', None)
+        if marker is None and hasattr(view_func, 'cls'):
+            marker = getattr(view_func.cls, 'replica_read', None)
+
+        eligible = request.method in ('GET', 'HEAD') and marker is not False and (
+            marker or getattr(settings, 'REPLICA_ROUTE_SAFE_GETS', True)
+        )
+        _read_alias.set(REPLICA_DB_ALIAS if eligible and not is_pinned(request) else None)
+        return None
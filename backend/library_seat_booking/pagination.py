@@ -0,0 +1,167 @@
+"""
+Keyset (cursor) pagination for high-churn list endpoints.
+
+A copy of library_booking_api/library_booking_api/pagination.py for the
+legacy project; keep the two in sync.
+"""
+
+import base64
+from collections import OrderedDict
+
+from django.db import connections
+from django.db.models import BooleanField, DateTimeField, Expression, F, Q, Value
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class RowComparison(Expression):
+    """SQL row-value comparison, e.g. (created_at, id) < (%s, %s), usable in filter()"""
+
+    conditional = True
+
+    def __init__(self, lhs, operator, rhs):
+        super().__init__(output_field=BooleanField())
+        self.lhs, self.operator, self.rhs = list(lhs), operator, list(rhs)
+
+    def get_source_expressions(self):
+        return [*self.lhs, *self.rhs]
+
+    def set_source_expressions(self, exprs):
+        self.lhs, self.rhs = exprs[:len(self.lhs)], exprs[len(self.lhs):]
+
+    def as_sql(self, compiler, connection):
+        sides, params = [], []
+        for side in (self.lhs, self.rhs):
+            parts = []
+            for expression in side:
+                sql, expression_params = compiler.compile(expression)
+                parts.append(sql)
+                params.extend(expression_params)
+            sides.append(', '.join(parts))
+        return f'({sides[0]}) {self.operator} ({sides[1]})', params
+
+
+class CreatedAtCursorPagination(BasePagination):
+    """
+    Newest-first pagination keyed on (created_at, id).
+    On PostgreSQL the cursor condition is a row comparison, which the planner
+    turns into a single range scan on the (created_at, id) index, so deep pages
+    cost the same as the first one. Other databases get the equivalent OR form.
+    COUNT(*) only runs with ?include_count=true.
+    """
+
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'include_count'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.count = queryset.count() if self.wants_count(request) else None
+
+        cursor = self.decode_cursor(request)
+        reverse = False
+        page_queryset = queryset.order_by('-created_at', '-id')
+
+        if cursor is not None:
+            created_at, pk, reverse = cursor
+            if reverse:
+                # Previous page: rows newer than the cursor, read oldest-first then flipped
+                page_queryset = self.keyset_filter(queryset, created_at, pk, newer=True).order_by('created_at', 'id')
+            else:
+                page_queryset = self.keyset_filter(page_queryset, created_at, pk)
+
+        results = list(page_queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        has_next = (cursor is not None) if reverse else has_more
+        has_previous = has_more if reverse else (cursor is not None)
+
+        self.next_cursor = self.encode_cursor(results[-1], reverse=False) if has_next and results else None
+        self.previous_cursor = self.encode_cursor(results[0], reverse=True) if has_previous and results else None
+        return results
+
+    @staticmethod
+    def keyset_filter(queryset, created_at, pk, newer=False):
+        """Rows older (or newer) than the (created_at, id) cursor position"""
+        if connections[queryset.db].vendor == 'postgresql':
+            return queryset.filter(RowComparison(
+                (F('created_at'), F('id')), '>' if newer else '<',
+                (Value(created_at, output_field=DateTimeField()), Value(pk)),
+            ))
+        lookup = 'gt' if newer else 'lt'
+        return queryset.filter(
+            Q(**{f'created_at__{lookup}': created_at}) | Q(created_at=created_at, **{f'id__{lookup}': pk})
+        )
+
+    def get_paginated_response(self, data):
+        payload = OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+        ])
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['results'] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'count': {'type': 'integer'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def wants_count(self, request):
+        return request.query_params.get(self.count_query_param, '').lower() in ('1', 'true', 'yes')
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.next_cursor)
+
+    def get_previous_link(self):
+        if self.previous_cursor is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.previous_cursor)
+
+    def encode_cursor(self, obj, reverse):
+        raw = f"{obj.created_at.isoformat()}|{obj.id}|{'p' if reverse else 'n'}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode()).decode()
+            created_at, pk, direction = raw.split('|')
+            created_at = parse_datetime(created_at)
+            if created_at is None or direction not in ('n', 'p'):
+                raise ValueError
+            return created_at, int(pk), direction == 'p'
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
@@ -52,6 +52,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'library_seat_booking.db_router.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -77,7 +78,11 @@ TEMPLATES = [
 WSGI_APPLICATION = 'library_seat_booking.wsgi.application'
 
 # Database Configuration
-# Use PostgreSQL for production, SQLite for development
+# Use PostgreSQL for production, SQLite for development. Django 4.2 has no
+# native pool, so connections persist per thread for CONN_MAX_AGE seconds
+# (a module-level CONN_MAX_AGE setting is ignored; it belongs in DATABASES)
+DB_CONN_MAX_AGE = config('CONN_MAX_AGE', default=600, cast=int)
+
 if config('DATABASE_URL', default=None):
     # Production PostgreSQL
     import dj_database_url
@@ -94,7 +99,7 @@ if config('DATABASE_URL', default=None):
         DATABASES = {
             'default': dj_database_url.config(
                 default=database_url,
-                conn_max_age=600,
+                conn_max_age=DB_CONN_MAX_AGE,
                 conn_health_checks=True,
                 ssl_require=True,  # Required for Render PostgreSQL
             )
@@ -118,6 +123,24 @@ else:
         }
     }
 
+# Optional read replica: admin dashboards and safe GETs read from it, writes
+# and users who wrote in the last REPLICA_PIN_SECONDS stay on the primary
+replica_url = config('DATABASE_REPLICA_URL', default='')
+if replica_url:
+    import dj_database_url
+    DATABASES['replica'] = dj_database_url.parse(
+        replica_url,
+        conn_max_age=DB_CONN_MAX_AGE,
+        conn_health_checks=True,
+        # sslmode is a PostgreSQL option; sqlite:/// replicas are for local testing
+        ssl_require=not replica_url.startswith('sqlite'),
+    )
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['library_seat_booking.db_router.ReplicaRouter']
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=10, cast=int)
+REPLICA_ROUTE_SAFE_GETS = config('REPLICA_ROUTE_SAFE_GETS', default=True, cast=bool)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -229,8 +252,8 @@ if not DEBUG:
     CSRF_COOKIE_HTTPONLY = config('CSRF_COOKIE_HTTPONLY', default=True, cast=bool)
     CSRF_COOKIE_SAMESITE = config('CSRF_COOKIE_SAMESITE', default='Lax')
 
-# Performance Settings
-CONN_MAX_AGE = config('CONN_MAX_AGE', default=60, cast=int)
+# Admin dashboard statistics are cached this many seconds (user saves expire them)
+DASHBOARD_STATS_TTL = config('DASHBOARD_STATS_TTL', default=60, cast=int)
 
 # Logging Configuration
 LOGGING = {
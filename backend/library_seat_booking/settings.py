@@ -5,6 +5,7 @@ Django settings for library_seat_booking project.
 from pathlib import Path
 import os
 from datetime import timedelta
+from decouple import config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -49,6 +50,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'library_seat_booking.db_router.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -89,6 +91,18 @@ DATABASES = {
     }
 }
 
+# Optional read replica: admin dashboards and safe GETs read from it, writes
+# and users who wrote in the last REPLICA_PIN_SECONDS stay on the primary.
+# Any dj-database-url URL works, including a sqlite:/// copy for local testing
+if config('DATABASE_REPLICA_URL', default=''):
+    import dj_database_url
+    DATABASES['replica'] = dj_database_url.parse(config('DATABASE_REPLICA_URL'))
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['library_seat_booking.db_router.ReplicaRouter']
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=10, cast=int)
+REPLICA_ROUTE_SAFE_GETS = config('REPLICA_ROUTE_SAFE_GETS', default=True, cast=bool)
+
 # You can change to MySQL or PostgreSQL by uncommenting and configuring:
 # DATABASES = {
 #     'default': {
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from library_seat_booking import phash
+from payments.models import PaymentRecord
+
+
+class Command(BaseCommand):
+    help = 'Compute perceptual hashes for payment record screenshots that do not have one yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, help='Hash at most this many distinct screenshot files')
+
+    def handle(self, *args, **options):
+        # Records that share a file are decoded once
+        pending = PaymentRecord.objects.exclude(screenshot='').exclude(screenshot__isnull=True).filter(
+            screenshot_phash__isnull=True,
+        ).order_by('screenshot').values_list('screenshot', flat=True).distinct()
+        if options['limit']:
+            pending = pending[:options['limit']]
+
+        storage = PaymentRecord._meta.get_field('screenshot').storage
+        hashed = failed = payments = 0
+        for name in pending.iterator():
+            try:
+                with storage.open(name, 'rb') as source:
+                    value = phash.hash_file(source)
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f'Could not hash {name}: {exc}')
+                continue
+            payments += PaymentRecord.objects.filter(screenshot=name, screenshot_phash__isnull=True).update(
+                **phash.hash_columns('screenshot_phash', value),
+            )
+            hashed += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Hashed {hashed} screenshots for {payments} payment records ({failed} unreadable)'
+        ))
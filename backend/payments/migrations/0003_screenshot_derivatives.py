@@ -0,0 +1,23 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0002_paymentrecord_payrec_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymentrecord',
+            name='screenshot_preview',
+            field=models.ImageField(blank=True, editable=False, help_text='Downscaled, EXIF-free copy of the screenshot', null=True, upload_to='payments/previews/'),
+        ),
+        migrations.AddField(
+            model_name='paymentrecord',
+            name='screenshot_thumbnail',
+            field=models.ImageField(blank=True, editable=False, help_text='Admin list thumbnail of the screenshot', null=True, upload_to='payments/thumbs/'),
+        ),
+    ]
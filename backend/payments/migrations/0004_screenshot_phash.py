@@ -0,0 +1,54 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0003_screenshot_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymentrecord',
+            name='screenshot_phash',
+            field=models.BigIntegerField(blank=True, editable=False, help_text='Perceptual hash (dHash) of the screenshot for duplicate detection', null=True),
+        ),
+        migrations.AddField(
+            model_name='paymentrecord',
+            name='screenshot_phash_0',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='paymentrecord',
+            name='screenshot_phash_1',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='paymentrecord',
+            name='screenshot_phash_2',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='paymentrecord',
+            name='screenshot_phash_3',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='paymentrecord',
+            index=models.Index(fields=['screenshot_phash_0'], name='payrec_phash_0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paymentrecord',
+            index=models.Index(fields=['screenshot_phash_1'], name='payrec_phash_1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paymentrecord',
+            index=models.Index(fields=['screenshot_phash_2'], name='payrec_phash_2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paymentrecord',
+            index=models.Index(fields=['screenshot_phash_3'], name='payrec_phash_3_idx'),
+        ),
+    ]
@@ -1,5 +1,9 @@
 from django.db import models
 from django.conf import settings
+from library_seat_booking import phash
+
+# Fields of each match returned by PaymentRecord.possible_duplicates()
+DUPLICATE_FIELDS = ['id', 'user_id', 'user__username', 'transaction_id', 'amount', 'status', 'created_at']
 
 
 class PaymentRecord(models.Model):
@@ -61,6 +65,30 @@ class PaymentRecord(models.Model):
         null=True,
         help_text="Payment screenshot"
     )
+    screenshot_preview = models.ImageField(
+        upload_to='payments/previews/',
+        blank=True,
+        null=True,
+        editable=False,
+        help_text="Downscaled, EXIF-free copy of the screenshot"
+    )
+    screenshot_thumbnail = models.ImageField(
+        upload_to='payments/thumbs/',
+        blank=True,
+        null=True,
+        editable=False,
+        help_text="Admin list thumbnail of the screenshot"
+    )
+    screenshot_phash = models.BigIntegerField(
+        blank=True,
+        null=True,
+        editable=False,
+        help_text="Perceptual hash (dHash) of the screenshot for duplicate detection"
+    )
+    screenshot_phash_0 = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    screenshot_phash_1 = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    screenshot_phash_2 = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    screenshot_phash_3 = models.PositiveIntegerField(blank=True, null=True, editable=False)
     membership_plan = models.PositiveIntegerField(
         blank=True,
         null=True,
@@ -77,6 +105,19 @@ class PaymentRecord(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='payrec_created_id_idx'),
+            models.Index(fields=['screenshot_phash_0'], name='payrec_phash_0_idx'),
+            models.Index(fields=['screenshot_phash_1'], name='payrec_phash_1_idx'),
+            models.Index(fields=['screenshot_phash_2'], name='payrec_phash_2_idx'),
+            models.Index(fields=['screenshot_phash_3'], name='payrec_phash_3_idx'),
+        ]
 
     def __str__(self):
         return f"Payment {self.amount} by {self.user.username} ({self.status})"
+
+    def possible_duplicates(self, within=None):
+        """Other payment records whose screenshot looks like this one, closest first"""
+        return phash.find_duplicates(
+            PaymentRecord.objects.all(), 'screenshot_phash', [self], DUPLICATE_FIELDS, within,
+        ).get(self.pk, [])
@@ -0,0 +1,37 @@
+"""
+Match bank/UPI statements against pending payment records
+(see library_seat_booking.reconciliation).
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from library_seat_booking import reconciliation
+from .models import PaymentRecord
+
+# Ids per UPDATE while approving, below every backend's bind-parameter limit
+APPROVE_BATCH_SIZE = 5000
+
+
+def approve_records(ids):
+    """Mark exact matches paid in one transaction; returns the ids that were marked"""
+    ids = sorted(ids)
+    now = timezone.now()
+    approved = []
+    with transaction.atomic():
+        for start in range(0, len(ids), APPROVE_BATCH_SIZE):
+            # status='pending' again: skip anything an admin handled while the statement was read
+            batch = list(PaymentRecord.objects.filter(
+                id__in=ids[start:start + APPROVE_BATCH_SIZE], status='pending',
+            ).select_for_update().values_list('id', flat=True))
+            PaymentRecord.objects.filter(id__in=batch).update(status='paid', updated_at=now)
+            approved += batch
+    return approved
+
+
+def reconcile_statement(source, dry_run=False, date_tolerance=None):
+    """Match a statement file against pending payment records; see reconciliation.reconcile()"""
+    pending = PaymentRecord.objects.filter(status='pending').order_by().values_list(
+        'id', 'transaction_id', 'amount', 'date', 'account_holder_name',
+    ).iterator(chunk_size=5000)
+    return reconciliation.reconcile(source, pending, approve_records, dry_run=dry_run, date_tolerance=date_tolerance)
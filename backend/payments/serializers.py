@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from library_seat_booking.media_pipeline import derivative_url
 from .models import PaymentRecord
 
 
@@ -6,24 +7,40 @@ class PaymentRecordSerializer(serializers.ModelSerializer):
     username = serializers.ReadOnlyField(source='user.username')
     user_email = serializers.ReadOnlyField(source='user.email')
     screenshot = serializers.SerializerMethodField()
+    screenshot_original = serializers.SerializerMethodField()
+    screenshot_thumbnail = serializers.SerializerMethodField()
+    possible_duplicates = serializers.SerializerMethodField()
 
     class Meta:
         model = PaymentRecord
         fields = [
             'id', 'user', 'username', 'user_email', 'description', 'amount', 
             'method', 'status', 'transaction_id', 'account_holder_name', 
-            'date', 'screenshot', 'membership_plan', 'plan_name', 
+            'date', 'screenshot', 'screenshot_original', 'screenshot_thumbnail', 'possible_duplicates',
+            'membership_plan', 'plan_name', 
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'user', 'created_at', 'updated_at']
 
     def get_screenshot(self, obj):
-        if obj.screenshot:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.screenshot.url)
-            return obj.screenshot.url
-        return None
+        """Downscaled preview once processed, the original until then"""
+        return derivative_url(obj, ['screenshot_preview', 'screenshot'], self.context.get('request'))
+
+    def get_screenshot_original(self, obj):
+        return derivative_url(obj, ['screenshot'], self.context.get('request'))
+
+    def get_screenshot_thumbnail(self, obj):
+        return derivative_url(obj, ['screenshot_thumbnail'], self.context.get('request'))
+
+    def get_possible_duplicates(self, obj):
+        """Records with a near-identical screenshot (admins only)"""
+        request = self.context.get('request')
+        if not request or not (request.user.is_staff or request.user.is_superuser):
+            return None
+        # List views precompute every row of the page in one query
+        if 'duplicates' in self.context:
+            return self.context['duplicates'].get(obj.pk, [])
+        return obj.possible_duplicates()
 
     def create(self, validated_data):
         # Set user from request context
@@ -0,0 +1,7 @@
+from library_seat_booking.media_pipeline import track_derivatives
+from .models import PaymentRecord
+
+# Preview, thumbnail and perceptual hash are built off the request thread after commit
+track_derivatives(
+    PaymentRecord, 'screenshot', 'screenshot_preview', 'screenshot_thumbnail', hash_field='screenshot_phash',
+)
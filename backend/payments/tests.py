@@ -1,3 +1,53 @@
+import io
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 
-# Create your tests here.
+from library_seat_booking import reconciliation
+from .models import PaymentRecord
+from .reconcile import approve_records, reconcile_statement
+
+
+class ReconcileStatementTests(TestCase):
+    """Statement reconciliation marks exact matches paid and reports only what it changed"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='member', email='member@example.com', password='pass',
+        )
+        self.day = date(2026, 3, 10)
+        self.exact = self.record('TXN001', '300.00')
+        self.mismatch = self.record('TXN002', '350.00')
+
+    def record(self, reference, amount, status='pending'):
+        return PaymentRecord.objects.create(
+            user=self.user, description='Membership Fee', amount=Decimal(amount), method='online',
+            status=status, transaction_id=reference, account_holder_name='Asha Verma', date=self.day,
+        )
+
+    def statement(self, *lines):
+        return io.BytesIO('\n'.join(('Date,UTR,Amount,Name',) + lines).encode())
+
+    def test_exact_match_is_marked_paid(self):
+        day = self.day.isoformat()
+        result = reconcile_statement(self.statement(f'{day},TXN001,300.00,Asha', f'{day},TXN002,300.00,Asha'))
+        self.assertEqual(result['approved'], [self.exact.id])
+        self.exact.refresh_from_db()
+        self.mismatch.refresh_from_db()
+        self.assertEqual((self.exact.status, self.mismatch.status), ('paid', 'pending'))
+        self.assertEqual([row['result'] for row in result['report']], [reconciliation.AMOUNT_MISMATCH])
+
+    def test_approved_lists_only_records_still_pending(self):
+        handled = self.record('TXN005', '250.00', status='paid')
+        pending = [
+            (record.id, record.transaction_id, record.amount, record.date, record.account_holder_name)
+            for record in (self.exact, handled)
+        ]
+        day = self.day.isoformat()
+        result = reconciliation.reconcile(
+            self.statement(f'{day},TXN001,300.00,Asha', f'{day},TXN005,250.00,Asha'), pending, approve_records,
+        )
+        self.assertEqual(result['approved'], [self.exact.id])
+        self.assertEqual(result['summary']['approved'], 1)
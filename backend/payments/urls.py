@@ -4,6 +4,8 @@ from . import views
 urlpatterns = [
     path('', views.PaymentRecordViewSet.as_view({'get': 'list', 'post': 'create'}), name='payment-records'),
     path('records/', views.PaymentRecordViewSet.as_view({'get': 'list', 'post': 'create'}), name='payment-records'),
+    path('records/export/', views.PaymentRecordViewSet.as_view({'get': 'export'}), name='payment-export'),
+    path('records/reconcile/', views.PaymentRecordViewSet.as_view({'post': 'reconcile'}), name='payment-reconcile'),
     path('records/history/', views.PaymentRecordViewSet.as_view({'get': 'history'}), name='payment-history'),
     path('records/<int:pk>/', views.PaymentRecordViewSet.as_view({'get': 'retrieve', 'put': 'update', 'delete': 'destroy'}), name='payment-detail'),
     path('records/<int:pk>/approve/', views.PaymentRecordViewSet.as_view({'post': 'approve'}), name='payment-approve'),
@@ -3,16 +3,30 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
-from rest_framework.pagination import PageNumberPagination
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import PaymentRecord
+from library_seat_booking import phash
+from library_seat_booking.pagination import CreatedAtCursorPagination
+from library_seat_booking.reconciliation import write_report
+from .models import DUPLICATE_FIELDS, PaymentRecord
+from .reconcile import reconcile_statement
 from .serializers import PaymentRecordSerializer
+import csv
+import json
 
 
-class PaymentPagination(PageNumberPagination):
+class PaymentPagination(CreatedAtCursorPagination):
     page_size = 20
-    page_size_query_param = 'page_size'
-    max_page_size = 1000
+    max_page_size = 100
+
+
+class Echo:
+    """File-like object whose write() hands the line straight back to the caller"""
+
+    def write(self, value):
+        return value
 
 
 class PaymentRecordViewSet(viewsets.ModelViewSet):
@@ -31,6 +45,18 @@ class PaymentRecordViewSet(viewsets.ModelViewSet):
             return PaymentRecord.objects.all()
         return PaymentRecord.objects.filter(user=user)
 
+    def get_serializer(self, *args, **kwargs):
+        # Admin lists get the possible duplicates of the whole page from one query
+        user = self.request.user
+        if kwargs.get('many') and args and (user.is_staff or user.is_superuser):
+            kwargs['context'] = {
+                **self.get_serializer_context(),
+                'duplicates': phash.find_duplicates(
+                    PaymentRecord.objects.all(), 'screenshot_phash', args[0], DUPLICATE_FIELDS,
+                ),
+            }
+        return super().get_serializer(*args, **kwargs)
+
     def create(self, request, *args, **kwargs):
         """Create a new payment record with file upload support"""
         print(f"Payment request method: {request.method}")
@@ -72,7 +98,11 @@ class PaymentRecordViewSet(viewsets.ModelViewSet):
         payment = self.get_object()
         payment.status = 'paid'
         payment.save()
-        return Response({'message': 'Payment approved successfully'})
+        # Approval still goes through; the admin sees any reused screenshot in the response
+        return Response({
+            'message': 'Payment approved successfully',
+            'possible_duplicates': payment.possible_duplicates(),
+        })
 
     @action(detail=True, methods=['post'])
     def reject(self, request, pk=None):
@@ -87,3 +117,79 @@ class PaymentRecordViewSet(viewsets.ModelViewSet):
         payment.status = 'rejected'
         payment.save()
         return Response({'message': 'Payment rejected successfully'})
+
+    @action(detail=False, methods=['post'])
+    def reconcile(self, request):
+        """
+        Match an uploaded bank statement CSV ('statement') against pending
+        records (admin only). Exact transaction id + amount matches are marked
+        paid; ?dry_run=true only reports, ?file_format=csv downloads the report.
+        """
+        if not request.user.is_staff and not request.user.is_superuser:
+            return Response(
+                {'detail': 'Admin access required'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        statement = request.FILES.get('statement')
+        if not statement:
+            return Response({'error': 'Upload the statement CSV as "statement"'}, status=status.HTTP_400_BAD_REQUEST)
+
+        dry_run = str(request.query_params.get('dry_run', request.data.get('dry_run', ''))).lower() in ('1', 'true', 'yes')
+        try:
+            tolerance = request.query_params.get('date_tolerance')
+            result = reconcile_statement(
+                statement.open('rb'), dry_run=dry_run, date_tolerance=int(tolerance) if tolerance else None,
+            )
+        except (ValueError, UnicodeDecodeError, csv.Error) as exc:
+            return Response({'error': f'Could not read statement: {exc}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.query_params.get('file_format') == 'csv':
+            response = HttpResponse(content_type='text/csv')
+            response['Content-Disposition'] = 'attachment; filename="reconciliation_report.csv"'
+            write_report(result['report'], response)
+            return response
+        return Response({'dry_run': dry_run, **result})
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream payment records as CSV or NDJSON (admin only)"""
+        if not request.user.is_staff and not request.user.is_superuser:
+            return Response(
+                {'detail': 'Admin access required'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        file_format = request.query_params.get('file_format', 'csv').lower()
+        if file_format not in ('csv', 'ndjson'):
+            return Response(
+                {'error': 'file_format must be csv or ndjson'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = self.filter_queryset(self.get_queryset()).order_by('id')
+        fields = [
+            'id', 'user_id', 'user__email', 'description', 'amount', 'method', 'status',
+            'transaction_id', 'account_holder_name', 'date', 'membership_plan',
+            'plan_name', 'created_at', 'updated_at',
+        ]
+        # Chunked iterator over a values projection keeps memory flat for any export size
+        rows = queryset.values_list(*fields).iterator(chunk_size=2000)
+
+        if file_format == 'ndjson':
+            content = (json.dumps(dict(zip(fields, row)), cls=DjangoJSONEncoder) + '\n' for row in rows)
+            content_type = 'application/x-ndjson'
+        else:
+            writer = csv.writer(Echo())
+            content = (writer.writerow(row) for row in _with_header(fields, rows))
+            content_type = 'text/csv'
+
+        stamp = timezone.now().strftime('%Y%m%d_%H%M%S')
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="payment_records_{stamp}.{file_format}"'
+        return response
+
+
+def _with_header(fields, rows):
+    yield fields
+    yield from rows
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.utils.html import format_html
 from .models import Seat, SeatBooking
 
 
@@ -17,7 +18,7 @@ class SeatAdmin(admin.ModelAdmin):
 
 @admin.register(SeatBooking)
 class SeatBookingAdmin(admin.ModelAdmin):
-    list_display = ['id', 'user', 'seat', 'start_time', 'end_time', 'status', 'payment_method', 'total_amount', 'created_at']
+    list_display = ['id', 'user', 'seat', 'start_time', 'end_time', 'status', 'payment_method', 'total_amount', 'screenshot_tag', 'created_at']
     list_filter = ['status', 'payment_method', 'plan', 'created_at', 'start_time']
     search_fields = ['user__username', 'seat__number', 'transaction_id']
     ordering = ['-created_at']
@@ -36,6 +37,18 @@ class SeatBookingAdmin(admin.ModelAdmin):
         }),
     )
 
+    @admin.display(description='Proof')
+    def screenshot_tag(self, obj):
+        # Thumbnail only; the full-size original opens on click
+        if obj.payment_screenshot_thumbnail:
+            return format_html(
+                '<a href="{0}" target="_blank"><img src="{1}" width="50" height="50" style="object-fit:cover;"/></a>',
+                obj.payment_screenshot.url, obj.payment_screenshot_thumbnail.url,
+            )
+        if obj.payment_screenshot:
+            return format_html('<a href="{0}" target="_blank">View proof</a>', obj.payment_screenshot.url)
+        return '-'
+
     def get_readonly_fields(self, request, obj=None):
         if obj:  # Editing existing object
             return ['user', 'seat', 'start_time', 'end_time', 'total_amount', 'created_at', 'updated_at']
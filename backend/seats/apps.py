@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class SeatsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'seats'
\ No newline at end of file
+    name = 'seats'
+
+    def ready(self):
+        import seats.signals
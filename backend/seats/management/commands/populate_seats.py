@@ -25,10 +25,8 @@ class Command(BaseCommand):
 
         seats_created = 0
         for i in range(1, count + 1):
-            # Distribute statuses: mostly available, some booked, few maintenance
-            if i % 7 == 0:
-                status = 'booked'
-            elif i % 13 == 0:
+            # Mostly available, a few under maintenance (occupancy comes from bookings)
+            if i % 13 == 0:
                 status = 'maintenance'
             else:
                 status = 'available'
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seats', '0007_alter_seat_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seatbooking',
+            name='payment_screenshot_preview',
+            field=models.ImageField(blank=True, editable=False, help_text='Downscaled, EXIF-free copy of the payment screenshot', null=True, upload_to='payments/previews/'),
+        ),
+        migrations.AddField(
+            model_name='seatbooking',
+            name='payment_screenshot_thumbnail',
+            field=models.ImageField(blank=True, editable=False, help_text='Admin list thumbnail of the payment screenshot', null=True, upload_to='payments/thumbs/'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:56
+
+from django.db import migrations, models
+
+
+def clear_booked_status(apps, schema_editor):
+    # 'booked' was never a valid choice; occupancy is now derived from bookings
+    Seat = apps.get_model('seats', 'Seat')
+    Seat.objects.exclude(status__in=['available', 'maintenance']).update(status='available')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seats', '0008_screenshot_derivatives'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='seat',
+            name='status',
+            field=models.CharField(choices=[('available', 'Available'), ('maintenance', 'Under Maintenance')], default='available', help_text='Administrative status; occupancy comes from bookings', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='seatbooking',
+            index=models.Index(fields=['seat', 'status', 'start_time', 'end_time'], name='seatbook_conflict_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seatbooking',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'confirmed'])), fields=['end_time', 'start_time'], name='seatbook_live_range_idx'),
+        ),
+        migrations.RunPython(clear_booked_status, migrations.RunPython.noop),
+    ]
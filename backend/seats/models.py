@@ -1,5 +1,37 @@
 from django.db import models
+from django.db.models import OuterRef, Subquery
 from django.conf import settings
+from django.utils import timezone
+
+
+class SeatQuerySet(models.QuerySet):
+    def with_occupancy(self, start=None, end=None):
+        """
+        Annotate occupied_until: end of the live booking holding each seat at
+        `start` (default now), or overlapping start..end; None when free.
+        """
+        holding = SeatBooking.objects.live().filter(seat=OuterRef('pk'))
+        holding = holding.overlapping(start, end) if end else holding.at(start or timezone.now())
+        return self.annotate(
+            occupied_until=Subquery(holding.order_by('-end_time').values('end_time')[:1])
+        )
+
+    def free(self, start=None, end=None):
+        """Bookable seats (not under maintenance) with no live booking at that time"""
+        return self.filter(status='available').with_occupancy(start, end).filter(occupied_until__isnull=True)
+
+
+class SeatBookingQuerySet(models.QuerySet):
+    def live(self):
+        """Bookings that hold their seat"""
+        return self.filter(status__in=SeatBooking.LIVE_STATUSES)
+
+    def at(self, moment):
+        return self.filter(start_time__lte=moment, end_time__gt=moment)
+
+    def overlapping(self, start, end):
+        return self.filter(start_time__lt=end, end_time__gt=start)
+
 
 class Seat(models.Model):
     STATUS_CHOICES = [
@@ -12,7 +44,7 @@ class Seat(models.Model):
         max_length=20,
         choices=STATUS_CHOICES,
         default='available',
-        help_text="Current status of the seat"
+        help_text="Administrative status; occupancy comes from bookings"
     )
     photo = models.ImageField(
         upload_to='seats/',
@@ -23,6 +55,8 @@ class Seat(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = SeatQuerySet.as_manager()
+
     class Meta:
         ordering = ['number']
 
@@ -31,8 +65,13 @@ class Seat(models.Model):
 
     @property
     def is_available(self):
+        """Open for booking (not under maintenance); see is_free_at for occupancy"""
         return self.status == 'available'
 
+    def is_free_at(self, start, end=None):
+        bookings = self.bookings.live()
+        return not (bookings.overlapping(start, end) if end else bookings.at(start)).exists()
+
 
 class SeatBooking(models.Model):
     STATUS_CHOICES = [
@@ -42,6 +81,9 @@ class SeatBooking(models.Model):
         ('completed', 'Completed'),
     ]
 
+    # Statuses in which a booking holds its seat
+    LIVE_STATUSES = ('pending', 'confirmed')
+
     PAYMENT_METHOD_CHOICES = [
         ('online', 'Online'),
         ('offline', 'Offline'),
@@ -97,6 +139,20 @@ class SeatBooking(models.Model):
         null=True,
         help_text="Payment screenshot for online payments"
     )
+    payment_screenshot_preview = models.ImageField(
+        upload_to='payments/previews/',
+        blank=True,
+        null=True,
+        editable=False,
+        help_text="Downscaled, EXIF-free copy of the payment screenshot"
+    )
+    payment_screenshot_thumbnail = models.ImageField(
+        upload_to='payments/thumbs/',
+        blank=True,
+        null=True,
+        editable=False,
+        help_text="Admin list thumbnail of the payment screenshot"
+    )
     transaction_id = models.CharField(
         max_length=100,
         blank=True,
@@ -117,9 +173,21 @@ class SeatBooking(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = SeatBookingQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         # Removed unique_together constraint - using application-level validation instead
+        indexes = [
+            # Conflict checks and per-seat occupancy: seat + status + time range
+            models.Index(fields=['seat', 'status', 'start_time', 'end_time'], name='seatbook_conflict_idx'),
+            # Live bookings only (partial index where supported), for all-seat occupancy at a time
+            models.Index(
+                fields=['end_time', 'start_time'],
+                condition=models.Q(status__in=['pending', 'confirmed']),
+                name='seatbook_live_range_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"Booking for Seat {self.seat.number} by {self.user.username} ({self.status})"
@@ -5,6 +5,9 @@ from django.contrib.auth.models import User
 
 class SeatSerializer(serializers.ModelSerializer):
     photo = serializers.ImageField(required=False, allow_null=True)
+    # From SeatViewSet's occupancy annotation (bookings live at the requested time)
+    occupied_until = serializers.DateTimeField(read_only=True, allow_null=True)
+    is_occupied = serializers.SerializerMethodField()
 
     def get_photo(self, obj):
         if obj.photo:
@@ -15,9 +18,12 @@ class SeatSerializer(serializers.ModelSerializer):
         # Return a default placeholder URL using picsum.photos which is more reliable
         return f'https://picsum.photos/seed/seat{obj.number}/400/300.jpg'
 
+    def get_is_occupied(self, obj):
+        return getattr(obj, 'occupied_until', None) is not None
+
     class Meta:
         model = Seat
-        fields = ['id', 'number', 'status', 'photo']
+        fields = ['id', 'number', 'status', 'is_occupied', 'occupied_until', 'photo']
 
 
 class SeatBookingSerializer(serializers.ModelSerializer):
@@ -28,9 +34,20 @@ class SeatBookingSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'user', 'seat', 'seat_number', 'start_time', 'end_time',
             'plan', 'payment_method', 'status', 'payment_screenshot',
+            'payment_screenshot_thumbnail',
             'transaction_id', 'payment_id', 'total_amount', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'total_amount', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'payment_screenshot_thumbnail', 'total_amount', 'created_at', 'updated_at']
+
+    def to_representation(self, instance):
+        # Serve the downscaled preview; the original stays at payment_screenshot_original
+        data = super().to_representation(instance)
+        data['payment_screenshot_original'] = data['payment_screenshot']
+        if instance.payment_screenshot_preview:
+            data['payment_screenshot'] = self.fields['payment_screenshot'].to_representation(
+                instance.payment_screenshot_preview
+            )
+        return data
 
     def get_allowed_plan_choices(self):
         """Helper method to get all allowed plan choices"""
@@ -0,0 +1,5 @@
+from library_seat_booking.media_pipeline import track_derivatives
+from .models import SeatBooking
+
+# Preview and thumbnail are built off the request thread after commit
+track_derivatives(SeatBooking, 'payment_screenshot', 'payment_screenshot_preview', 'payment_screenshot_thumbnail')
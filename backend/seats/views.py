@@ -4,44 +4,91 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.db import transaction
+from rest_framework.exceptions import ValidationError
 from .models import Seat, SeatBooking
 from .serializers import SeatSerializer, SeatBookingSerializer, SeatBookingCreateSerializer
 
 
+def _query_time(request, name):
+    """Aware datetime from an ISO query parameter, or None when absent"""
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValidationError({name: 'Use an ISO 8601 date-time, e.g. 2026-01-18T10:00:00+05:30'})
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+def _create_booking(serializer, seat):
+    """
+    Save a validated booking for `seat`, or return an error Response.
+    Availability is derived from the seat's live bookings; the seat row is never written.
+    """
+    if not seat.is_available:
+        return Response(
+            {'error': 'Seat is not available for booking'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    start_time = serializer.validated_data['start_time']
+    end_time = serializer.validated_data['end_time']
+
+    with transaction.atomic():
+        # Check for booking conflicts
+        if not seat.is_free_at(start_time, end_time):
+            return Response(
+                {'error': 'Seat is already booked for this time slot'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        booking = serializer.save()
+
+    return booking
+
+
 class SeatViewSet(viewsets.ModelViewSet):
     queryset = Seat.objects.all()
     serializer_class = SeatSerializer
     permission_classes = [AllowAny]  # Allow anyone to view seats
     parser_classes = [MultiPartParser, FormParser, JSONParser]  # Support file uploads
 
+    def get_queryset(self):
+        """
+        Seats with occupancy at ?at= (default now) or over ?start=&end=;
+        ?available=true keeps only seats that are free then.
+        """
+        start = _query_time(self.request, 'start') or _query_time(self.request, 'at')
+        end = _query_time(self.request, 'end')
+        if end and (not start or end <= start):
+            raise ValidationError({'end': 'end must come after start'})
+
+        if self.request.query_params.get('available', '').lower() in ('1', 'true', 'yes'):
+            return Seat.objects.free(start, end)
+        return Seat.objects.with_occupancy(start, end)
+
     @action(detail=True, methods=['post'])
     def book(self, request, pk=None):
         """Book a specific seat"""
         seat = self.get_object()
 
-        if seat.status != 'available':
+        serializer = SeatBookingCreateSerializer(data=request.data, context={'request': request})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        if serializer.validated_data['seat'].pk != seat.pk:
             return Response(
-                {'error': 'Seat is not available for booking'},
+                {'error': 'Booking is for a different seat'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        serializer = SeatBookingCreateSerializer(data=request.data, context={'request': request})
-        if serializer.is_valid():
-            with transaction.atomic():
-                # Create booking
-                booking = serializer.save()
-
-                # Update seat status to booked
-                seat.status = 'booked'
-                seat.save()
-
-                return Response(
-                    SeatBookingSerializer(booking).data,
-                    status=status.HTTP_201_CREATED
-                )
-
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        booking = _create_booking(serializer, seat)
+        if isinstance(booking, Response):
+            return booking
+        return Response(
+            SeatBookingSerializer(booking).data,
+            status=status.HTTP_201_CREATED
+        )
 
 
 class SeatBookingViewSet(viewsets.ModelViewSet):
@@ -84,42 +131,14 @@ class SeatBookingViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        if seat.status != 'available':
-            return Response(
-                {'error': 'Seat is not available for booking'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # Check for booking conflicts
-        start_time = serializer.validated_data['start_time']
-        end_time = serializer.validated_data['end_time']
-
-        conflicting_bookings = SeatBooking.objects.filter(
-            seat=seat,
-            status__in=['pending', 'confirmed'],
-            start_time__lt=end_time,
-            end_time__gt=start_time
+        booking = _create_booking(serializer, seat)
+        if isinstance(booking, Response):
+            return booking
+        return Response(
+            self.get_serializer(booking).data,
+            status=status.HTTP_201_CREATED
         )
 
-        if conflicting_bookings.exists():
-            return Response(
-                {'error': 'Seat is already booked for this time slot'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        with transaction.atomic():
-            # Create booking
-            booking = serializer.save()
-
-            # Update seat status to booked
-            seat.status = 'booked'
-            seat.save()
-
-            return Response(
-                self.get_serializer(booking).data,
-                status=status.HTTP_201_CREATED
-            )
-
     @action(detail=True, methods=['post'])
     def cancel(self, request, pk=None):
         """Cancel a booking"""
@@ -131,23 +150,11 @@ class SeatBookingViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        with transaction.atomic():
-            # Update booking status
-            booking.status = 'cancelled'
-            booking.save()
-
-            # Check if seat has any other active bookings
-            active_bookings = SeatBooking.objects.filter(
-                seat=booking.seat,
-                status__in=['pending', 'confirmed']
-            ).exclude(id=booking.id)
-
-            if not active_bookings.exists():
-                # Make seat available again
-                booking.seat.status = 'available'
-                booking.seat.save()
+        # The seat frees up on its own: occupancy is computed from live bookings
+        booking.status = 'cancelled'
+        booking.save(update_fields=['status', 'updated_at'])
 
-            return Response({'message': 'Booking cancelled successfully'})
+        return Response({'message': 'Booking cancelled successfully'})
 
     @action(detail=False, methods=['get'])
     def history(self, request):
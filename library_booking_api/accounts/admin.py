@@ -5,8 +5,8 @@ from .models import User, UserProfile
 
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
-    list_display = ('email', 'username', 'student_id', 'membership_type', 'is_staff')
+    list_display = ('email', 'username', 'student_id', 'membership_type', 'membership_state', 'is_staff')
     search_fields = ('email', 'username', 'phone')
-    list_filter = ('membership_type', 'is_active')
+    list_filter = ('membership_type', 'membership_state', 'is_active')
 
 admin.site.register(UserProfile)
\ No newline at end of file
@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class AccountsConfig(AppConfig):
@@ -6,3 +7,7 @@ class AccountsConfig(AppConfig):
 
     def ready(self):
         import accounts.signals
+        from library_booking_api import scheduler
+        from .membership import sweep
+
+        scheduler.register('membership-sweep', getattr(settings, 'MEMBERSHIP_SWEEP_INTERVAL', 300), sweep)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from accounts import membership
+
+
+class Command(BaseCommand):
+    help = 'Mark lapsed memberships expired and send expiry reminders (run from cron every few minutes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--resync', action='store_true',
+            help='Also recompute every stored membership state from its expiry (after bulk imports)',
+        )
+
+    def handle(self, *args, **options):
+        if options['resync']:
+            self.stdout.write(f'Resynced {membership.sync_membership_states()} membership states')
+        result = membership.sweep()
+        reminded = ', '.join(f'{count} at {days}d' for days, count in result['reminded'].items())
+        self.stdout.write(self.style.SUCCESS(
+            f"Expired {result['expired']} memberships; reminders sent: {reminded or 'none due'}"
+        ))
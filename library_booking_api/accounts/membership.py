@@ -0,0 +1,107 @@
+"""
+Membership expiry sweeps.
+
+User.membership_state is kept in step with membership_expiry on every save,
+but a membership also lapses just by time passing. sweep() (run by the
+sweep_memberships command from cron, every few minutes) moves lapsed members
+to 'expired' with one set-based UPDATE and sends "expires in N days" reminders
+to whole cohorts at once: one Notification per expiry date and a bulk insert
+of its UserNotification rows. Reminders are idempotent per expiry, so running
+the sweep again (or after a missed run) never sends a reminder twice.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import User
+
+REMINDER_BATCH_SIZE = 1000
+
+
+def reminder_days():
+    """Days before expiry to remind at, largest first (MEMBERSHIP_REMINDER_DAYS)"""
+    return sorted({int(days) for days in getattr(settings, 'MEMBERSHIP_REMINDER_DAYS', (7, 3, 1))}, reverse=True)
+
+
+def sync_membership_states(now=None):
+    """Bring every stored membership_state in line with membership_expiry; returns rows changed"""
+    now = now or timezone.now()
+    changed = User.objects.filter(membership_expiry__isnull=True).exclude(membership_state='none').update(
+        membership_state='none',
+    )
+    changed += User.objects.filter(membership_expiry__gt=now).exclude(membership_state='active').update(
+        membership_state='active',
+    )
+    changed += expire_memberships(now)
+    return changed
+
+
+def expire_memberships(now=None):
+    """Mark every lapsed membership expired in one UPDATE; returns how many lapsed"""
+    now = now or timezone.now()
+    return User.objects.filter(membership_expiry__lte=now).exclude(membership_state='expired').update(
+        membership_state='expired',
+    )
+
+
+def _day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def send_expiry_reminders(now=None, days=None):
+    """
+    Remind active members whose membership expires on today + N (local date)
+    for each N in `days`. Returns {N: users reminded}.
+    """
+    from notifications.models import Notification, UserNotification
+
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    sent = {}
+    for n in days or reminder_days():
+        expiry_day = today + timedelta(days=n)
+        start, end = _day_bounds(expiry_day)
+        cohort = User.objects.filter(
+            membership_state='active', is_active=True,
+            membership_expiry__gte=max(start, now), membership_expiry__lt=end,
+        ).exclude(
+            # Already told about this same expiry at least this close to it
+            Q(membership_reminded_for=F('membership_expiry')) & Q(membership_reminder_days__lte=n),
+        )
+
+        with transaction.atomic():
+            user_ids = list(cohort.select_for_update().values_list('id', flat=True))
+            if not user_ids:
+                sent[n] = 0
+                continue
+            when = 'tomorrow' if n == 1 else f'in {n} days'
+            notification = Notification.objects.create(
+                title=f'Your membership expires {when}',
+                message=(
+                    f'Your library membership expires on {expiry_day:%d %b %Y}. '
+                    'Renew it from the Payments page to keep your seat bookings.'
+                ),
+                type='warning',
+                target_audience='direct',
+            )
+            UserNotification.objects.bulk_create(
+                [UserNotification(user_id=user_id, notification=notification) for user_id in user_ids],
+                batch_size=REMINDER_BATCH_SIZE,
+                ignore_conflicts=True,
+            )
+            User.objects.filter(id__in=user_ids).update(
+                membership_reminder_days=n, membership_reminded_for=F('membership_expiry'),
+            )
+        sent[n] = len(user_ids)
+    return sent
+
+
+def sweep(now=None):
+    """Expire lapsed memberships, then send due reminders"""
+    now = now or timezone.now()
+    return {'expired': expire_memberships(now), 'reminded': send_expiry_reminders(now)}
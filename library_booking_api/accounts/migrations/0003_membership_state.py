@@ -0,0 +1,42 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:52
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_membership_state(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    now = timezone.now()
+    User.objects.filter(membership_expiry__gt=now).update(membership_state='active')
+    User.objects.filter(membership_expiry__lte=now).update(membership_state='expired')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_address_user_document'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='membership_reminded_for',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='membership_reminder_days',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='membership_state',
+            field=models.CharField(choices=[('none', 'No Active Membership'), ('active', 'Active'), ('expired', 'Expired')], default='none', editable=False, max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['membership_state', 'membership_expiry'], name='user_membership_state_idx'),
+        ),
+        migrations.RunPython(backfill_membership_state, migrations.RunPython.noop),
+    ]
@@ -22,6 +22,21 @@ class User(AbstractUser):
         default='basic'
     )
     membership_expiry = models.DateTimeField(blank=True, null=True)
+    # Denormalized from membership_expiry on save; the sweep_memberships command
+    # moves lapsed memberships to 'expired' (see accounts/membership.py)
+    membership_state = models.CharField(
+        max_length=10,
+        choices=[
+            ('none', 'No Active Membership'),
+            ('active', 'Active'),
+            ('expired', 'Expired'),
+        ],
+        default='none',
+        editable=False,
+    )
+    # Smallest "expires in N days" reminder already sent for membership_reminded_for (an expiry)
+    membership_reminder_days = models.PositiveSmallIntegerField(blank=True, null=True, editable=False)
+    membership_reminded_for = models.DateTimeField(blank=True, null=True, editable=False)
 
     # Profile information
     avatar = models.URLField(blank=True, null=True)
@@ -47,6 +62,9 @@ class User(AbstractUser):
         db_table = 'users'
         verbose_name = 'User'
         verbose_name_plural = 'Users'
+        indexes = [
+            models.Index(fields=['membership_state', 'membership_expiry'], name='user_membership_state_idx'),
+        ]
 
     def __str__(self):
         return f"{self.email} - {self.get_full_name() or self.username}"
@@ -54,11 +72,24 @@ class User(AbstractUser):
     def get_full_name(self):
         return f"{self.first_name} {self.last_name}".strip()
 
+    @staticmethod
+    def membership_state_for(expiry, now=None):
+        if not expiry:
+            return 'none'
+        return 'active' if expiry > (now or timezone.now()) else 'expired'
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'membership_expiry' in update_fields:
+            self.membership_state = self.membership_state_for(self.membership_expiry)
+            if update_fields is not None:
+                kwargs['update_fields'] = [*update_fields, 'membership_state']
+        super().save(*args, **kwargs)
+
     def is_membership_active(self):
         """Check if user has active membership"""
-        if not self.membership_expiry:
-            return False
-        return self.membership_expiry > timezone.now()
+        # The stored state can lag the sweeper by a few minutes, so access checks also compare the time
+        return self.membership_state == 'active' and self.membership_expiry > timezone.now()
 
     def update_statistics(self):
         """Update user statistics based on bookings and attendance"""
@@ -8,7 +8,7 @@ class UserSerializer(serializers.ModelSerializer):
     """Serializer for User model - read-only, returns all user fields"""
 
     full_name = serializers.SerializerMethodField()
-    membership_status = serializers.SerializerMethodField()
+    membership_status = serializers.CharField(source='get_membership_state_display', read_only=True)
     days_until_expiry = serializers.SerializerMethodField()
 
     class Meta:
@@ -29,21 +29,13 @@ class UserSerializer(serializers.ModelSerializer):
         """Get full name of user"""
         return obj.get_full_name() or obj.username
 
-    def get_membership_status(self, obj):
-        """Get current membership status"""
-        if not obj.membership_expiry:
-            return 'No Active Membership'
-
-        now = timezone.now()
-        return 'Active' if obj.membership_expiry > now else 'Expired'
-
     def get_days_until_expiry(self, obj):
-        """Get days until membership expires"""
-        if not obj.membership_expiry:
+        """Get days until membership expires (from the stored membership state)"""
+        if obj.membership_state == 'none':
             return None
-
-        now = timezone.now()
-        return (obj.membership_expiry - now).days if obj.membership_expiry > now else 0
+        if obj.membership_state == 'expired':
+            return 0
+        return max((obj.membership_expiry - timezone.now()).days, 0)
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
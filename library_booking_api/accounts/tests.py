@@ -1,6 +1,77 @@
+from datetime import datetime, time, timedelta
+
 from django.test import TestCase
+from django.utils import timezone
+
+from notifications.models import UserNotification
+from .membership import sweep
+from .models import User
+from .serializers import UserSerializer
+
+
+class MembershipSweepTests(TestCase):
+    """Lapsed memberships expire in bulk and each expiry cohort is reminded once"""
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.today = timezone.localdate(self.now)
+        self.lapsed = self.member('lapsed', self.now + timedelta(hours=1))
+        # Lapsed since the last save, so the stored state still says active
+        User.objects.filter(id=self.lapsed.id).update(membership_expiry=self.now - timedelta(minutes=5))
+        self.week = [self.member(f'week{n}', self.expiring_in(7)) for n in range(2)]
+        self.soon = self.member('soon', self.expiring_in(3))
+        self.member('later', self.expiring_in(20))
+        self.member('none', None)
+
+    def member(self, name, expiry):
+        return User.objects.create_user(
+            username=name, email=f'{name}@example.com', password='pass', membership_expiry=expiry,
+        )
+
+    def expiring_in(self, days):
+        return timezone.make_aware(datetime.combine(self.today + timedelta(days=days), time(12)))
+
+    def reminders(self, user):
+        return list(UserNotification.objects.filter(user=user).values_list('notification__title', flat=True))
+
+    def test_sweep_is_idempotent(self):
+        self.assertEqual(sweep(self.now), {'expired': 1, 'reminded': {7: 2, 3: 1, 1: 0}})
+        self.assertEqual(sweep(self.now), {'expired': 0, 'reminded': {7: 0, 3: 0, 1: 0}})
+        for user in self.week:
+            self.assertEqual(self.reminders(user), ['Your membership expires in 7 days'])
+        self.assertEqual(self.reminders(self.soon), ['Your membership expires in 3 days'])
+        self.assertEqual(UserNotification.objects.count(), 3)
+
+        # Four days on the week cohort is due its 3-day reminder, once; "soon" has lapsed
+        later = self.now + timedelta(days=4)
+        self.assertEqual(sweep(later), {'expired': 1, 'reminded': {7: 0, 3: 2, 1: 0}})
+        self.assertEqual(sweep(later), {'expired': 0, 'reminded': {7: 0, 3: 0, 1: 0}})
+        for user in self.week:
+            self.assertEqual(sorted(self.reminders(user)), [
+                'Your membership expires in 3 days', 'Your membership expires in 7 days',
+            ])
+
+    def test_lapsed_members_are_expired(self):
+        sweep(self.now)
+        states = dict(User.objects.values_list('username', 'membership_state'))
+        self.assertEqual(states, {
+            'lapsed': 'expired', 'week0': 'active', 'week1': 'active', 'soon': 'active',
+            'later': 'active', 'none': 'none',
+        })
+
+    def test_serializer_reads_stored_state(self):
+        sweep(self.now)
+        users = {user.username: user for user in User.objects.all()}
+        with self.assertNumQueries(0):
+            lapsed = UserSerializer(users['lapsed']).data
+            week = UserSerializer(users['week0']).data
+            none = UserSerializer(users['none']).data
+        self.assertEqual((lapsed['membership_status'], lapsed['days_until_expiry']), ('Expired', 0))
+        self.assertEqual(week['membership_status'], 'Active')
+        self.assertIn(week['days_until_expiry'], (6, 7))
+        self.assertEqual((none['membership_status'], none['days_until_expiry']), ('No Active Membership', None))
+
 
-# Create your tests here.
 import requests
 
 BASE_URL = "http://127.0.0.1:8000/users/"
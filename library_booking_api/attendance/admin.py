@@ -1,3 +1,20 @@
 from django.contrib import admin
+from .models import AttendanceReport, DailyAttendanceSummary
 
-# Register your models here.
+
+@admin.register(DailyAttendanceSummary)
+class DailyAttendanceSummaryAdmin(admin.ModelAdmin):
+    list_display = ['user', 'date', 'sessions', 'present', 'late', 'minutes', 'updated_at']
+    list_filter = ['date']
+    search_fields = ['user__email', 'user__username']
+    ordering = ['-date']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(AttendanceReport)
+class AttendanceReportAdmin(admin.ModelAdmin):
+    list_display = ['title', 'report_type', 'start_date', 'end_date', 'status', 'generated_by', 'created_at', 'completed_at']
+    list_filter = ['status', 'report_type', 'created_at']
+    search_fields = ['title']
+    ordering = ['-created_at']
+    readonly_fields = ['params_hash', 'status', 'error', 'created_at', 'completed_at']
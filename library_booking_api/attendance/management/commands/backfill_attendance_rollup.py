@@ -0,0 +1,84 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from attendance.models import AttendanceRecord, DailyAttendanceSummary
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily attendance rollup table from raw attendance records'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--start-date',
+            help='First day to rebuild (YYYY-MM-DD, default: earliest record)',
+        )
+        parser.add_argument(
+            '--end-date',
+            help='Last day to rebuild (YYYY-MM-DD, default: latest record)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows written per bulk insert (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        start_date = self._parse_date(options['start_date'], '--start-date')
+        end_date = self._parse_date(options['end_date'], '--end-date')
+        batch_size = options['batch_size']
+
+        records = AttendanceRecord.objects.filter(check_in_time__isnull=False)
+        summaries = DailyAttendanceSummary.objects.all()
+        if start_date:
+            records = records.filter(check_in_time__gte=DailyAttendanceSummary.day_bounds(start_date)[0])
+            summaries = summaries.filter(date__gte=start_date)
+        if end_date:
+            records = records.filter(check_in_time__lt=DailyAttendanceSummary.day_bounds(end_date)[1])
+            summaries = summaries.filter(date__lte=end_date)
+
+        # One grouped pass over the raw records, streamed rather than materialised
+        rows = records.annotate(day=TruncDate('check_in_time')).values('user_id', 'day').annotate(
+            sessions=Count('id'),
+            present=Count('id', filter=Q(status='present')),
+            late=Count('id', filter=Q(status='late')),
+            minutes=Sum('duration_minutes'),
+        ).order_by()
+
+        written = 0
+        with transaction.atomic():
+            summaries.delete()
+
+            batch = []
+            for row in rows.iterator(chunk_size=batch_size):
+                batch.append(DailyAttendanceSummary(
+                    user_id=row['user_id'],
+                    date=row['day'],
+                    sessions=row['sessions'],
+                    present=row['present'],
+                    late=row['late'],
+                    minutes=row['minutes'] or 0,
+                ))
+                if len(batch) >= batch_size:
+                    DailyAttendanceSummary.objects.bulk_create(batch)
+                    written += len(batch)
+                    batch = []
+
+            if batch:
+                DailyAttendanceSummary.objects.bulk_create(batch)
+                written += len(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully wrote {written} daily attendance summaries')
+        )
+
+    def _parse_date(self, value, option):
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise CommandError(f'{option} must be in YYYY-MM-DD format')
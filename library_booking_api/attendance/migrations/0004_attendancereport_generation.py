@@ -0,0 +1,48 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0003_dailyattendancesummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendancereport',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='attendancereport',
+            name='error',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='attendancereport',
+            name='file_format',
+            field=models.CharField(choices=[('csv', 'CSV')], default='csv', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='attendancereport',
+            name='params_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='attendancereport',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='attendancereport',
+            name='report_data',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AlterField(
+            model_name='attendancereport',
+            name='summary',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0004_attendancereport_generation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendancerecord',
+            index=models.Index(fields=['-created_at', '-id'], name='att_rec_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0005_attendancerecord_att_rec_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendancerecord',
+            index=models.Index(fields=['user', 'check_in_time'], name='att_rec_user_checkin_idx'),
+        ),
+    ]
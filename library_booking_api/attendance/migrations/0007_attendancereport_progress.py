@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-19 15:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0006_query_shape_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendancereport',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='attendancereport',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
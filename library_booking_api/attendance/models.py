@@ -163,6 +163,10 @@ class AttendanceRecord(models.Model):
         db_table = 'attendance_records'
         unique_together = ['user', 'session']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='att_rec_created_id_idx'),
+            models.Index(fields=['user', 'check_in_time'], name='att_rec_user_checkin_idx'),
+        ]
         verbose_name = 'Attendance Record'
         verbose_name_plural = 'Attendance Records'
 
@@ -254,6 +258,17 @@ class AttendanceReport(models.Model):
         ('user', 'User Report'),
     ]
 
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+    ]
+
     title = models.CharField(max_length=200)
     report_type = models.CharField(max_length=20, choices=REPORT_TYPE_CHOICES)
     generated_by = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True)
@@ -265,14 +280,23 @@ class AttendanceReport(models.Model):
     user = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True, related_name='attendance_reports')
 
     # Report data (stored as JSON)
-    report_data = models.JSONField()
-    summary = models.JSONField()
+    report_data = models.JSONField(default=dict, blank=True)
+    summary = models.JSONField(default=dict, blank=True)
 
     # File storage
     pdf_file = models.FileField(upload_to='attendance_reports/', blank=True, null=True)
+    file_format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default='csv')
+
+    # Background generation
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    params_hash = models.CharField(max_length=64, db_index=True, blank=True)  # Identical parameter sets share a report
+    error = models.TextField(blank=True, null=True)
 
     # Timestamps
     created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(blank=True, null=True)  # Claimed by a worker
+    updated_at = models.DateTimeField(auto_now=True)  # Bumped by the worker while it makes progress
+    completed_at = models.DateTimeField(blank=True, null=True)
 
     class Meta:
         db_table = 'attendance_reports'
@@ -282,3 +306,86 @@ class AttendanceReport(models.Model):
 
     def __str__(self):
         return f"{self.title} - {self.report_type} ({self.start_date} to {self.end_date})"
+
+    @staticmethod
+    def hash_params(report_type, start_date, end_date, session_id=None, user_id=None, file_format='csv'):
+        """Stable hash of the parameters that determine a report's contents"""
+        import hashlib
+        import json
+        params = {
+            'report_type': report_type,
+            'start_date': str(start_date),
+            'end_date': str(end_date),
+            'session_id': session_id,
+            'user_id': user_id,
+            'file_format': file_format,
+        }
+        return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+
+class DailyAttendanceSummary(models.Model):
+    """Per-user, per-day attendance rollup maintained from AttendanceRecord saves"""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_attendance')
+    date = models.DateField()
+
+    # Aggregates for the day (records keyed by check-in date)
+    sessions = models.IntegerField(default=0)
+    present = models.IntegerField(default=0)
+    late = models.IntegerField(default=0)
+    minutes = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'attendance_daily_summaries'
+        unique_together = ['user', 'date']
+        ordering = ['-date']
+        indexes = [
+            models.Index(fields=['date'], name='att_daily_date_idx'),
+        ]
+        verbose_name = 'Daily Attendance Summary'
+        verbose_name_plural = 'Daily Attendance Summaries'
+
+    def __str__(self):
+        return f"{self.user.email} - {self.date} ({self.sessions} sessions)"
+
+    @staticmethod
+    def day_for(check_in_time):
+        """Rollup day for a check-in timestamp (local date, None if not checked in)"""
+        if check_in_time is None:
+            return None
+        return timezone.localdate(check_in_time)
+
+    @staticmethod
+    def day_bounds(day):
+        """Aware [start, end) datetimes covering a local date, usable by the check_in_time index"""
+        from datetime import datetime, time, timedelta
+        start = timezone.make_aware(datetime.combine(day, time.min))
+        end = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+        return start, end
+
+    @classmethod
+    def refresh(cls, user_id, day):
+        """Recompute the rollup row for one user and day from the raw records"""
+        from django.db.models import Count, Q, Sum
+
+        start, end = cls.day_bounds(day)
+        totals = AttendanceRecord.objects.filter(
+            user_id=user_id,
+            check_in_time__gte=start,
+            check_in_time__lt=end,
+        ).aggregate(
+            sessions=Count('id'),
+            present=Count('id', filter=Q(status='present')),
+            late=Count('id', filter=Q(status='late')),
+            minutes=Sum('duration_minutes'),
+        )
+
+        if not totals['sessions']:
+            cls.objects.filter(user_id=user_id, date=day).delete()
+            return None
+
+        totals['minutes'] = totals['minutes'] or 0
+        summary, _ = cls.objects.update_or_create(user_id=user_id, date=day, defaults=totals)
+        return summary
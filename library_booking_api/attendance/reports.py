@@ -0,0 +1,245 @@
+"""Background generation of stored AttendanceReport documents"""
+
+import csv
+import io
+import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from library_booking_api.db_pool import BACKGROUND_THREADS
+from .models import AttendanceRecord, AttendanceReport, DailyAttendanceSummary
+
+logger = logging.getLogger(__name__)
+
+# Records are streamed from the database in chunks of this size
+CHUNK_SIZE = 2000
+
+CSV_COLUMNS = [
+    'user_id', 'user_email', 'user_name', 'session_id', 'session_title',
+    'status', 'check_in_time', 'check_out_time', 'duration_minutes',
+]
+
+# What report_data['breakdown'] groups records by, per report type
+BREAKDOWNS = {
+    'daily': 'day',
+    'weekly': 'week',
+    'monthly': 'month',
+    'session': 'session',
+    'user': 'user',
+}
+
+# A single worker keeps report rendering off the request thread without
+# letting a burst of requests saturate the database
+_executor = ThreadPoolExecutor(max_workers=BACKGROUND_THREADS['attendance-reports'], thread_name_prefix='attendance-reports')
+
+
+def request_report(report_type, start_date, end_date, session_id=None, user_id=None,
+                   file_format='csv', requested_by=None, refresh=False):
+    """
+    Return the stored report for this parameter set, queueing generation if needed.
+    Identical parameters reuse the existing report unless refresh is requested
+    or the previous attempt failed. Jobs live on an in-process executor, so a
+    job can be lost to a restart. A running report that has made no progress for
+    ATTENDANCE_REPORT_STALE_MINUTES is treated as lost: it is marked failed and
+    a new one is queued. So is a pending report older than that, but only when
+    no report at all has made progress in that time. Otherwise it may just be
+    queued behind others.
+    """
+    params_hash = AttendanceReport.hash_params(
+        report_type, start_date, end_date, session_id, user_id, file_format
+    )
+    now = timezone.now()
+    cutoff = now - timedelta(minutes=getattr(settings, 'ATTENDANCE_REPORT_STALE_MINUTES', 30))
+
+    with transaction.atomic():
+        # Workers bump updated_at as they go, so a long report is never failed while it runs
+        stale = Q(status='running', updated_at__lt=cutoff)
+        if not AttendanceReport.objects.filter(started_at__isnull=False, updated_at__gte=cutoff).exists():
+            stale |= Q(status='pending', created_at__lt=cutoff)
+        AttendanceReport.objects.filter(stale, params_hash=params_hash).update(
+            status='failed', error='Abandoned: the worker stopped before finishing', completed_at=now,
+        )
+
+        if not refresh:
+            existing = AttendanceReport.objects.filter(
+                params_hash=params_hash,
+                status__in=['pending', 'running', 'ready'],
+            ).order_by('-created_at').first()
+            if existing:
+                return existing, False
+
+        report = AttendanceReport.objects.create(
+            title=f"{report_type.title()} attendance {start_date} to {end_date}",
+            report_type=report_type,
+            generated_by=requested_by,
+            start_date=start_date,
+            end_date=end_date,
+            session_id=session_id,
+            user_id=user_id,
+            file_format=file_format,
+            params_hash=params_hash,
+        )
+        transaction.on_commit(lambda: schedule_report(report.id))
+
+    return report, True
+
+
+def schedule_report(report_id):
+    """Hand a report to the background worker (or run inline when disabled)"""
+    if getattr(settings, 'ATTENDANCE_REPORTS_ASYNC', True):
+        _executor.submit(_run_in_worker, report_id)
+    else:
+        generate_report(report_id)
+
+
+def _run_in_worker(report_id):
+    close_old_connections()
+    try:
+        generate_report(report_id)
+    finally:
+        close_old_connections()
+
+
+def generate_report(report_id):
+    """Stream the matching records once to build report_data, summary and the file"""
+    now = timezone.now()
+    claimed = AttendanceReport.objects.filter(
+        id=report_id, status='pending'
+    ).update(status='running', started_at=now, updated_at=now)
+    if not claimed:
+        return None
+
+    report = AttendanceReport.objects.get(id=report_id)
+    try:
+        with tempfile.TemporaryFile(mode='w+b') as handle:
+            text = io.TextIOWrapper(handle, encoding='utf-8', newline='')
+            report_data, summary = _write_records(report, csv.writer(text))
+            text.flush()
+            handle.seek(0)
+
+            report.report_data = report_data
+            report.summary = summary
+            report.pdf_file.save(
+                f"attendance_{report.id}_{report.start_date}_{report.end_date}.{report.file_format}",
+                File(handle),
+                save=False,
+            )
+            text.detach()
+
+        report.status = 'ready'
+        report.error = None
+        report.completed_at = timezone.now()
+        report.save(update_fields=[
+            'report_data', 'summary', 'pdf_file', 'status', 'error', 'completed_at', 'updated_at',
+        ])
+    except Exception as e:
+        logger.exception('Attendance report %s failed', report_id)
+        now = timezone.now()
+        AttendanceReport.objects.filter(id=report_id).update(
+            status='failed', error=str(e), completed_at=now, updated_at=now
+        )
+        return None
+
+    return report
+
+
+def _breakdown_key(breakdown, user_id, session_id, session_title, check_in_time):
+    """(key, label) of the breakdown group a record belongs to"""
+    if breakdown == 'session':
+        return session_id, session_title
+    if breakdown == 'user':
+        return user_id, None
+    day = timezone.localtime(check_in_time).date()
+    if breakdown == 'week':
+        day -= timedelta(days=day.weekday())
+    elif breakdown == 'month':
+        day = day.replace(day=1)
+    return str(day), None
+
+
+def _write_records(report, writer):
+    """Write one CSV row per record while accumulating per-user and per-group statistics"""
+    records = AttendanceRecord.objects.filter(
+        check_in_time__gte=DailyAttendanceSummary.day_bounds(report.start_date)[0],
+        check_in_time__lt=DailyAttendanceSummary.day_bounds(report.end_date)[1],
+    )
+    if report.session_id:
+        records = records.filter(session_id=report.session_id)
+    if report.user_id:
+        records = records.filter(user_id=report.user_id)
+
+    rows = records.values_list(
+        'user_id', 'user__email', 'user__first_name', 'user__last_name',
+        'session_id', 'session__title', 'status',
+        'check_in_time', 'check_out_time', 'duration_minutes',
+    ).order_by('check_in_time', 'id')
+
+    writer.writerow(CSV_COLUMNS)
+
+    breakdown = BREAKDOWNS.get(report.report_type, 'day')
+    groups = {}
+    users = {}
+    totals = {'total_records': 0, 'present': 0, 'late': 0, 'absent': 0, 'excused': 0, 'total_minutes': 0}
+
+    for count, (user_id, email, first_name, last_name, session_id, session_title,
+                status, check_in_time, check_out_time, minutes) in enumerate(rows.iterator(chunk_size=CHUNK_SIZE), 1):
+        if count % CHUNK_SIZE == 0:
+            # Still alive: keeps request_report from treating this job as abandoned
+            AttendanceReport.objects.filter(id=report.id).update(updated_at=timezone.now())
+        name = f"{first_name} {last_name}".strip()
+        writer.writerow([
+            user_id, email, name, session_id, session_title, status,
+            check_in_time.isoformat() if check_in_time else '',
+            check_out_time.isoformat() if check_out_time else '',
+            minutes,
+        ])
+
+        stats = users.get(user_id)
+        if stats is None:
+            stats = users[user_id] = {
+                'user_id': user_id, 'user_email': email, 'user_name': name,
+                'total_sessions': 0, 'present': 0, 'late': 0, 'absent': 0, 'excused': 0,
+                'total_minutes': 0,
+            }
+        stats['total_sessions'] += 1
+        stats['total_minutes'] += minutes or 0
+        totals['total_records'] += 1
+        totals['total_minutes'] += minutes or 0
+        if status in totals:
+            stats[status] += 1
+            totals[status] += 1
+
+        key, label = _breakdown_key(breakdown, user_id, session_id, session_title, check_in_time)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {
+                'key': key, 'label': label if label is not None else (email if breakdown == 'user' else key),
+                'total_records': 0, 'present': 0, 'late': 0, 'absent': 0, 'excused': 0, 'total_minutes': 0,
+            }
+        group['total_records'] += 1
+        group['total_minutes'] += minutes or 0
+        if status in group:
+            group[status] += 1
+
+    attended = totals['present'] + totals['late']
+    summary = {
+        **totals,
+        'unique_users': len(users),
+        'attendance_rate': (attended / totals['total_records'] * 100) if totals['total_records'] else 0,
+    }
+    report_data = {
+        'user_statistics': sorted(users.values(), key=lambda s: s['total_sessions'], reverse=True),
+        'breakdown_by': breakdown,
+        'breakdown': (
+            sorted(groups.values(), key=lambda g: g['total_records'], reverse=True)
+            if breakdown in ('session', 'user') else [groups[key] for key in sorted(groups)]
+        ),
+        'date_range': {'start': str(report.start_date), 'end': str(report.end_date)},
+    }
+    return report_data, summary
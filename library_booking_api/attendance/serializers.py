@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import AttendanceSession, AttendanceRecord
+from accounts.models import User
+from .models import AttendanceSession, AttendanceRecord, AttendanceReport
 
 
 class AttendanceSessionSerializer(serializers.ModelSerializer):
@@ -38,18 +39,71 @@ class AttendanceRecordSerializer(serializers.ModelSerializer):
 
     user_name = serializers.CharField(source='user.get_full_name', read_only=True)
     session_title = serializers.CharField(source='session.title', read_only=True)
-    marked_by_name = serializers.CharField(source='marked_by.get_full_name', read_only=True)
 
     class Meta:
         model = AttendanceRecord
         fields = [
             'id', 'session', 'session_title', 'user', 'user_name',
-            'check_in_time', 'check_out_time', 'duration_minutes',
-            'method', 'marked_by', 'marked_by_name', 'notes'
+            'status', 'check_in_time', 'check_out_time', 'duration_minutes',
+            'verification_method', 'verified_by_qr', 'notes'
         ]
         read_only_fields = ['id', 'check_in_time', 'check_out_time', 'duration_minutes']
 
 
+class AttendanceReportSerializer(serializers.ModelSerializer):
+    """Serializer for stored attendance reports"""
+
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = AttendanceReport
+        fields = [
+            'id', 'title', 'report_type', 'start_date', 'end_date', 'session', 'user',
+            'file_format', 'status', 'error', 'summary', 'report_data',
+            'generated_by', 'created_at', 'completed_at', 'download_url'
+        ]
+        read_only_fields = fields
+
+    def get_download_url(self, obj):
+        if obj.status != 'ready' or not obj.pdf_file:
+            return None
+        from django.urls import reverse
+        url = reverse('attendance-report-download', args=[obj.id])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
+class AttendanceReportRequestSerializer(serializers.Serializer):
+    """Parameters accepted when requesting a stored report"""
+
+    report_type = serializers.ChoiceField(choices=AttendanceReport.REPORT_TYPE_CHOICES, default='daily')
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    session_id = serializers.IntegerField(required=False, allow_null=True)
+    user_id = serializers.IntegerField(required=False, allow_null=True)
+    file_format = serializers.ChoiceField(choices=AttendanceReport.FORMAT_CHOICES, default='csv')
+    refresh = serializers.BooleanField(default=False)
+
+    def validate_session_id(self, value):
+        if value is not None and not AttendanceSession.objects.filter(id=value).exists():
+            raise serializers.ValidationError("Session not found")
+        return value
+
+    def validate_user_id(self, value):
+        if value is not None and not User.objects.filter(id=value).exists():
+            raise serializers.ValidationError("User not found")
+        return value
+
+    def validate(self, data):
+        if data['start_date'] > data['end_date']:
+            raise serializers.ValidationError({"end_date": "End date must be on or after start date"})
+        if data['report_type'] == 'session' and not data.get('session_id'):
+            raise serializers.ValidationError({"session_id": "Session reports need a session_id"})
+        if data['report_type'] == 'user' and not data.get('user_id'):
+            raise serializers.ValidationError({"user_id": "User reports need a user_id"})
+        return data
+
+
 class AttendanceSessionCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating attendance sessions"""
 
@@ -0,0 +1,25 @@
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from .models import AttendanceRecord, DailyAttendanceSummary
+
+
+def _rollup_key(instance):
+    return instance.user_id, DailyAttendanceSummary.day_for(instance.check_in_time)
+
+
+@receiver(post_init, sender=AttendanceRecord)
+def remember_rollup_day(sender, instance, **kwargs):
+    """Remember the user and day a record was loaded with, so a moved record refreshes both rollup rows"""
+    instance._rollup_key = _rollup_key(instance)
+
+
+@receiver(post_save, sender=AttendanceRecord)
+@receiver(post_delete, sender=AttendanceRecord)
+def update_daily_attendance_summary(sender, instance, **kwargs):
+    """Keep the per-user daily rollup in step with the raw attendance records"""
+    keys = {getattr(instance, '_rollup_key', (None, None)), _rollup_key(instance)}
+    for user_id, day in keys:
+        if user_id is not None and day is not None:
+            DailyAttendanceSummary.refresh(user_id, day)
+
+    instance._rollup_key = _rollup_key(instance)
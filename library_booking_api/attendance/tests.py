@@ -1,3 +1,375 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import User
+from library_booking_api.db_router import REPLICA_DB_ALIAS, ReplicaRouter, _read_alias
+from payments.models import Payment
+from . import reports
+from .models import AttendanceRecord, AttendanceReport, AttendanceSession, DailyAttendanceSummary
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    """Primary/replica routing against two SQLite files"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Registered after the runner's database setup so the replica is a plain
+        # second file that only replicate() writes to
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.replica_path = os.path.join(cls.tmpdir, 'replica.sqlite3')
+        configured = connections.configure_settings({
+            'default': connections.settings['default'],
+            REPLICA_DB_ALIAS: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': cls.replica_path},
+        })
+        connections.settings[REPLICA_DB_ALIAS] = configured[REPLICA_DB_ALIAS]
+        cls.databases = cls.databases | {REPLICA_DB_ALIAS}
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA_DB_ALIAS].close()
+        del connections[REPLICA_DB_ALIAS]
+        del connections.settings[REPLICA_DB_ALIAS]
+        shutil.rmtree(cls.tmpdir, ignore_errors=True)
+        super().tearDownClass()
+
+    def replicate(self):
+        """Copy the primary into the replica file, as streaming replication would"""
+        connections[REPLICA_DB_ALIAS].close()
+        primary = connections['default']
+        primary.ensure_connection()
+        target = sqlite3.connect(self.replica_path)
+        try:
+            primary.connection.backup(target)
+        finally:
+            target.close()
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='pass', is_staff=True,
+        )
+        self.member = User.objects.create_user(
+            username='member', email='member@example.com', password='pass', first_name='Asha',
+        )
+        DailyAttendanceSummary.objects.create(user=self.member, date=date.today(), sessions=1, present=1)
+        self.replicate()
+
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.admin)}')
+
+    def report_emails(self):
+        response = self.client.get('/api/attendance/report/')
+        self.assertEqual(response.status_code, 200)
+        return {row['user__email'] for row in response.data['user_statistics']}
+
+    def test_report_reads_from_replica(self):
+        late = User.objects.create_user(username='late', email='late@example.com', password='pass')
+        DailyAttendanceSummary.objects.create(user=late, date=date.today(), sessions=1, present=1)
+
+        # Written to the primary only, so invisible until replicated
+        self.assertEqual(self.report_emails(), {'member@example.com'})
+        self.replicate()
+        self.assertEqual(self.report_emails(), {'member@example.com', 'late@example.com'})
+
+    def test_write_pins_user_to_primary(self):
+        now = timezone.now()
+        session = AttendanceSession.objects.create(
+            title='Morning', start_time=now - timedelta(hours=1), end_time=now + timedelta(hours=1),
+        )
+        walk_in = User.objects.create_user(username='walkin', email='walkin@example.com', password='pass')
+        self.replicate()
+
+        response = self.client.post(f'/api/attendance/admin-checkin/{session.id}/', {'user_id': walk_in.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('db_pin', response.cookies)
+
+        # Pinned by cookie, then by the cached user pin for clients that drop cookies
+        self.assertIn('walkin@example.com', self.report_emails())
+        self.client.cookies.clear()
+        self.assertIn('walkin@example.com', self.report_emails())
+
+        cache.clear()
+        self.assertNotIn('walkin@example.com', self.report_emails())
+
+    def test_payment_stats_are_computed_on_primary(self):
+        # Written to the primary only; a replica read would cache the stale totals.
+        # bulk_create skips the screenshot pipeline, which has no file to read here
+        Payment.objects.bulk_create([Payment(
+            user=self.member, description='Monthly', amount=Decimal('300.00'), status='paid',
+            transaction_id='TXN-REPLICA-1', account_holder_name='Asha',
+            screenshot='payment_proofs/proof.png', date=date.today(),
+        )])
+        response = self.client.get('/api/payments/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['paid_payments'], 1)
+
+        response = self.client.get('/api/payments/stats/revenue/')
+        self.assertEqual(response.data['series'][-1]['revenue'], Decimal('300.00'))
+
+    def test_reads_inside_atomic_use_primary(self):
+        router = ReplicaRouter()
+        token = _read_alias.set(REPLICA_DB_ALIAS)
+        try:
+            self.assertEqual(router.db_for_read(User), REPLICA_DB_ALIAS)
+            with transaction.atomic():
+                self.assertEqual(router.db_for_read(User), 'default')
+        finally:
+            _read_alias.reset(token)
+
+    def test_single_database_fallback(self):
+        router = ReplicaRouter()
+        token = _read_alias.set(REPLICA_DB_ALIAS)
+        replica = connections.settings.pop(REPLICA_DB_ALIAS)
+        try:
+            self.assertIsNone(router.db_for_read(User))
+        finally:
+            connections.settings[REPLICA_DB_ALIAS] = replica
+            _read_alias.reset(token)
+        self.assertEqual(router.db_for_write(User), 'default')
+        self.assertFalse(router.allow_migrate(REPLICA_DB_ALIAS, 'attendance'))
+
+
+@override_settings(ATTENDANCE_REPORTS_ASYNC=False, ATTENDANCE_REPORT_STALE_MINUTES=30)
+class StoredReportTests(TestCase):
+    """Stored report requests: dedup, stale jobs, validation and report types"""
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        self.override = override_settings(MEDIA_ROOT=self.media)
+        self.override.enable()
+        self.addCleanup(self.override.disable)
+
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='pass', is_staff=True,
+        )
+        self.member = User.objects.create_user(username='member', email='member@example.com', password='pass')
+        now = timezone.now()
+        self.session = AttendanceSession.objects.create(
+            title='Morning', start_time=now - timedelta(hours=1), end_time=now + timedelta(hours=1),
+        )
+        AttendanceRecord.objects.create(user=self.member, session=self.session, check_in_time=now, status='present')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.today = timezone.localdate()
+
+    def request(self, **params):
+        """POST a report request and run the generation it queues; returns the response"""
+        data = {'start_date': self.today, 'end_date': self.today, **params}
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/attendance/reports/', data, format='json')
+
+    def report_data(self, **params):
+        response = self.request(**params)
+        self.assertIn(response.status_code, (200, 202))
+        report = AttendanceReport.objects.get(id=response.data['id'])
+        self.assertEqual(report.status, 'ready')
+        return report.report_data
+
+    def test_identical_request_reuses_report(self):
+        first = self.request()
+        second = self.request()
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data['id'], first.data['id'])
+
+    def test_stale_pending_report_is_requeued(self):
+        params_hash = AttendanceReport.hash_params('daily', self.today, self.today)
+        stuck = AttendanceReport.objects.create(
+            title='stuck', report_type='daily', start_date=self.today, end_date=self.today,
+            params_hash=params_hash, created_at=timezone.now() - timedelta(hours=2),
+        )
+        response = self.request()
+        self.assertEqual(response.status_code, 202)
+        self.assertNotEqual(response.data['id'], stuck.id)
+        stuck.refresh_from_db()
+        self.assertEqual(stuck.status, 'failed')
+
+    def job(self, title, status, created_ago, progress_ago=None, **params):
+        """A stored report `created_ago`, last making progress `progress_ago` (never if None)"""
+        now = timezone.now()
+        report = AttendanceReport.objects.create(
+            title=title, report_type='daily', start_date=self.today, end_date=self.today, status=status,
+            params_hash=AttendanceReport.hash_params(params.get('report_type', 'daily'), self.today, self.today),
+            created_at=now - created_ago,
+        )
+        if progress_ago is not None:
+            AttendanceReport.objects.filter(id=report.id).update(
+                started_at=now - created_ago, updated_at=now - progress_ago,
+            )
+        return report
+
+    def test_long_running_report_is_not_abandoned(self):
+        running = self.job('running', 'running', timedelta(hours=2), progress_ago=timedelta(minutes=1))
+        report, created = reports.request_report('daily', self.today, self.today)
+        self.assertFalse(created)
+        self.assertEqual(report.id, running.id)
+        running.refresh_from_db()
+        self.assertEqual(running.status, 'running')
+
+    def test_running_report_without_progress_is_requeued(self):
+        stuck = self.job('stuck', 'running', timedelta(hours=2), progress_ago=timedelta(minutes=45))
+        response = self.request()
+        self.assertEqual(response.status_code, 202)
+        self.assertNotEqual(response.data['id'], stuck.id)
+        stuck.refresh_from_db()
+        self.assertEqual(stuck.status, 'failed')
+
+    def test_old_pending_report_behind_a_live_worker_is_reused(self):
+        self.job('other', 'running', timedelta(hours=1), progress_ago=timedelta(minutes=1), report_type='weekly')
+        queued = self.job('queued', 'pending', timedelta(hours=2))
+        report, created = reports.request_report('daily', self.today, self.today)
+        self.assertFalse(created)
+        self.assertEqual(report.id, queued.id)
+
+    def test_generation_records_start_and_progress(self):
+        response = self.request()
+        report = AttendanceReport.objects.get(id=response.data['id'])
+        self.assertEqual(report.status, 'ready')
+        self.assertLessEqual(report.created_at, report.started_at)
+        self.assertLessEqual(report.started_at, report.updated_at)
+
+    def test_recent_pending_report_is_reused(self):
+        params_hash = AttendanceReport.hash_params('daily', self.today, self.today)
+        queued = AttendanceReport.objects.create(
+            title='queued', report_type='daily', start_date=self.today, end_date=self.today,
+            params_hash=params_hash,
+        )
+        report, created = reports.request_report('daily', self.today, self.today)
+        self.assertFalse(created)
+        self.assertEqual(report.id, queued.id)
+
+    def test_unknown_session_or_user_is_rejected(self):
+        self.assertEqual(self.request(session_id=999999).status_code, 400)
+        self.assertEqual(self.request(user_id=999999).status_code, 400)
+        self.assertEqual(self.request(report_type='session').status_code, 400)
+
+    def test_report_type_sets_breakdown(self):
+        daily = self.report_data()
+        self.assertEqual(daily['breakdown_by'], 'day')
+        self.assertEqual(daily['breakdown'][0]['key'], str(self.today))
+
+        by_session = self.report_data(report_type='session', session_id=self.session.id)
+        self.assertEqual(by_session['breakdown_by'], 'session')
+        self.assertEqual(by_session['breakdown'][0]['label'], 'Morning')
+        self.assertEqual(by_session['breakdown'][0]['present'], 1)
+
+    def test_export_rejects_non_numeric_filters(self):
+        url = '/api/records/export/'
+        self.assertEqual(self.client.get(url, {'user_id': 'abc'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'session_id': 'abc'}).status_code, 400)
+        response = self.client.get(url, {'user_id': self.member.id, 'session_id': self.session.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 2)
+
+
+class DailyRollupTests(TestCase):
+    """The daily rollup follows record saves, moves and deletes, and matches a full backfill"""
+
+    def setUp(self):
+        self.member = User.objects.create_user(username='member', email='member@example.com', password='pass')
+        self.other = User.objects.create_user(username='other', email='other@example.com', password='pass')
+        self.day = date(2026, 3, 10)
+        self.noon = timezone.make_aware(datetime.combine(self.day, time(12)))
+        self.sessions = [
+            AttendanceSession.objects.create(
+                title=f'Session {n}', start_time=self.noon - timedelta(hours=4), end_time=self.noon + timedelta(hours=4),
+            )
+            for n in range(3)
+        ]
+
+    def record(self, session, user=None, status='present', minutes=60, at=None):
+        return AttendanceRecord.objects.create(
+            user=user or self.member, session=self.sessions[session], status=status,
+            check_in_time=at or self.noon, duration_minutes=minutes,
+        )
+
+    def rollup(self):
+        return {
+            (row.user_id, row.date): (row.sessions, row.present, row.late, row.minutes)
+            for row in DailyAttendanceSummary.objects.all()
+        }
+
+    def test_save_updates_rollup(self):
+        self.record(0)
+        late = self.record(1, status='late', minutes=30)
+        self.assertEqual(self.rollup(), {(self.member.id, self.day): (2, 1, 1, 90)})
+
+        late.status = 'present'
+        late.save()
+        self.assertEqual(self.rollup(), {(self.member.id, self.day): (2, 2, 0, 90)})
+
+    def test_moved_record_refreshes_both_rows(self):
+        self.record(0)
+        moved = self.record(1, minutes=30)
+
+        moved.check_in_time = self.noon - timedelta(days=1)
+        moved.save()
+        yesterday = self.day - timedelta(days=1)
+        self.assertEqual(self.rollup(), {
+            (self.member.id, self.day): (1, 1, 0, 60),
+            (self.member.id, yesterday): (1, 1, 0, 30),
+        })
+
+        # Loaded fresh, so the remembered key comes from the database
+        moved = AttendanceRecord.objects.get(id=moved.id)
+        moved.user = self.other
+        moved.save()
+        self.assertEqual(self.rollup(), {
+            (self.member.id, self.day): (1, 1, 0, 60),
+            (self.other.id, yesterday): (1, 1, 0, 30),
+        })
+
+    def test_delete_removes_empty_row(self):
+        kept = self.record(0)
+        self.record(1, user=self.other).delete()
+        self.assertEqual(self.rollup(), {(self.member.id, self.day): (1, 1, 0, 60)})
+        kept.delete()
+        self.assertEqual(self.rollup(), {})
+
+    def test_backfill_matches_incremental_rollup(self):
+        self.record(0)
+        self.record(1, status='late', minutes=45)
+        self.record(2, status='absent', minutes=0, at=self.noon - timedelta(days=2))
+        self.record(0, user=self.other, minutes=15, at=self.noon + timedelta(hours=11, minutes=30))
+        AttendanceRecord.objects.create(user=self.other, session=self.sessions[1], status='absent')
+        incremental = self.rollup()
+        self.assertEqual(len(incremental), 3)
+
+        DailyAttendanceSummary.objects.all().delete()
+        call_command('backfill_attendance_rollup', stdout=io.StringIO())
+        self.assertEqual(self.rollup(), incremental)
+
+
+class AdminCheckinTests(TestCase):
+    """Manual check-in writes and returns real AttendanceRecord fields"""
+
+    def test_admin_checkin(self):
+        admin = User.objects.create_user(username='admin', email='admin@example.com', password='pass', is_staff=True)
+        member = User.objects.create_user(username='member', email='member@example.com', password='pass')
+        now = timezone.now()
+        session = AttendanceSession.objects.create(
+            title='Morning', start_time=now - timedelta(hours=1), end_time=now + timedelta(hours=1),
+        )
+        client = APIClient()
+        client.force_authenticate(admin)
+
+        response = client.post(f'/api/attendance/admin-checkin/{session.id}/', {'user_id': member.id}, format='json')
+        self.assertEqual(response.status_code, 200)
+        record = AttendanceRecord.objects.get(session=session, user=member)
+        self.assertEqual((record.status, record.verification_method), ('present', 'admin'))
+        self.assertEqual(response.data['record']['status'], 'present')
+        self.assertEqual(response.data['record']['verification_method'], 'admin')
@@ -11,4 +11,7 @@ urlpatterns = [
     path('session-stats/<int:session_id>/', views.session_stats, name='session-stats'),
     path('admin-checkin/<int:session_id>/', views.admin_checkin, name='admin-checkin'),
     path('report/', views.attendance_report, name='attendance-report'),
+    path('reports/', views.stored_reports, name='attendance-reports'),
+    path('reports/<int:report_id>/', views.stored_report_detail, name='attendance-report-detail'),
+    path('reports/<int:report_id>/download/', views.stored_report_download, name='attendance-report-download'),
 ]
\ No newline at end of file
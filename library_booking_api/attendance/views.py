@@ -5,9 +5,16 @@ from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
-from .models import AttendanceSession, AttendanceRecord
-from .serializers import AttendanceSessionSerializer, AttendanceRecordSerializer
+from .models import AttendanceSession, AttendanceRecord, AttendanceReport, DailyAttendanceSummary
+from .serializers import (
+    AttendanceSessionSerializer, AttendanceRecordSerializer,
+    AttendanceReportSerializer, AttendanceReportRequestSerializer,
+)
+from library_booking_api.exports import date_range_filters, get_export_format, stream_export
+from library_booking_api.db_router import replica_read
+from library_booking_api.pagination import CreatedAtCursorPagination
 from .scanner import qr_scanner
+from . import reports
 
 
 class AttendanceSessionViewSet(viewsets.ModelViewSet):
@@ -38,6 +45,7 @@ class AttendanceRecordViewSet(viewsets.ModelViewSet):
     queryset = AttendanceRecord.objects.all()
     serializer_class = AttendanceRecordSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
         user = self.request.user
@@ -50,6 +58,37 @@ class AttendanceRecordViewSet(viewsets.ModelViewSet):
             return [IsAuthenticated()]
         return [IsAdminUser()]
 
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream attendance records as CSV or NDJSON (admin only)"""
+        file_format = get_export_format(request)
+        if not file_format:
+            return Response(
+                {'error': 'file_format must be csv or ndjson'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            records = self.get_queryset().filter(**date_range_filters(request, 'check_in_time'))
+            user_id = request.query_params.get('user_id')
+            session_id = request.query_params.get('session_id')
+            if user_id:
+                records = records.filter(user_id=int(user_id))
+            if session_id:
+                records = records.filter(session_id=int(session_id))
+        except ValueError:
+            return Response(
+                {'error': 'Dates must be in YYYY-MM-DD format; user_id and session_id must be numbers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        fields = [
+            'id', 'user_id', 'user__email', 'session_id', 'session__title', 'status',
+            'check_in_time', 'check_out_time', 'duration_minutes',
+            'verification_method', 'verified_by_qr', 'seat_booking_id', 'created_at',
+        ]
+        return stream_export(records.order_by('id'), fields, file_format, 'attendance_records')
+
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -250,8 +289,8 @@ def admin_checkin(request, session_id):
         session=session,
         user=user,
         check_in_time=timezone.now(),
-        method='admin',
-        marked_by=request.user
+        status='present',
+        verification_method='admin'
     )
 
     serializer = AttendanceRecordSerializer(record)
@@ -261,34 +300,106 @@ def admin_checkin(request, session_id):
     })
 
 
+@replica_read
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def attendance_report(request):
-    """Generate attendance report"""
+    """Generate attendance report from the daily rollup table"""
     start_date = request.query_params.get('start_date')
     end_date = request.query_params.get('end_date')
     user_id = request.query_params.get('user_id')
 
-    records = AttendanceRecord.objects.all()
+    summaries = DailyAttendanceSummary.objects.all()
 
     if start_date:
-        records = records.filter(check_in_time__date__gte=start_date)
+        summaries = summaries.filter(date__gte=start_date)
     if end_date:
-        records = records.filter(check_in_time__date__lte=end_date)
+        summaries = summaries.filter(date__lte=end_date)
     if user_id:
-        records = records.filter(user_id=user_id)
+        summaries = summaries.filter(user_id=user_id)
 
     # Group by user and calculate stats
-    from django.db.models import Count
-    user_stats = records.values('user__email', 'user__first_name', 'user__last_name').annotate(
-        total_sessions=Count('id')
+    from django.db.models import Sum
+    user_stats = summaries.values('user__email', 'user__first_name', 'user__last_name').annotate(
+        total_sessions=Sum('sessions'),
+        present=Sum('present'),
+        late=Sum('late'),
+        total_minutes=Sum('minutes')
     ).order_by('-total_sessions')
 
     return Response({
-        'total_records': records.count(),
+        'total_records': summaries.aggregate(total=Sum('sessions'))['total'] or 0,
         'user_statistics': list(user_stats),
         'date_range': {
             'start': start_date,
             'end': end_date
         }
     })
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAdminUser])
+def stored_reports(request):
+    """List stored reports, or request one (identical parameters reuse the stored report)"""
+    if request.method == 'GET':
+        queryset = AttendanceReport.objects.all()
+        status_filter = request.query_params.get('status')
+        if status_filter:
+            queryset = queryset.filter(status=status_filter)
+        serializer = AttendanceReportSerializer(
+            queryset[:100], many=True, context={'request': request}
+        )
+        return Response(serializer.data)
+
+    params = AttendanceReportRequestSerializer(data=request.data)
+    params.is_valid(raise_exception=True)
+    data = params.validated_data
+
+    report, created = reports.request_report(
+        report_type=data['report_type'],
+        start_date=data['start_date'],
+        end_date=data['end_date'],
+        session_id=data.get('session_id'),
+        user_id=data.get('user_id'),
+        file_format=data['file_format'],
+        requested_by=request.user,
+        refresh=data['refresh'],
+    )
+    if created:
+        report.refresh_from_db()
+
+    serializer = AttendanceReportSerializer(report, context={'request': request})
+    return Response(
+        serializer.data,
+        status=status.HTTP_200_OK if report.status == 'ready' else status.HTTP_202_ACCEPTED
+    )
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def stored_report_detail(request, report_id):
+    """Poll a stored report's generation status and results"""
+    report = get_object_or_404(AttendanceReport, id=report_id)
+    serializer = AttendanceReportSerializer(report, context={'request': request})
+    return Response(serializer.data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def stored_report_download(request, report_id):
+    """Download the rendered file of a ready report"""
+    from django.http import FileResponse
+
+    report = get_object_or_404(AttendanceReport, id=report_id)
+    if report.status != 'ready' or not report.pdf_file:
+        return Response(
+            {'error': 'Report is not ready yet'},
+            status=status.HTTP_409_CONFLICT
+        )
+
+    return FileResponse(
+        report.pdf_file.open('rb'),
+        as_attachment=True,
+        filename=report.pdf_file.name.rsplit('/', 1)[-1],
+        content_type='text/csv'
+    )
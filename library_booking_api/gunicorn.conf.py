@@ -0,0 +1,48 @@
+"""
+Gunicorn settings (picked up automatically from this directory).
+
+WEB_CONCURRENCY and GUNICORN_THREADS are also read by settings.py to size each
+worker's database connection pool, so change them here via the environment.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = max(1, int(os.environ.get('WEB_CONCURRENCY', 2)))
+threads = max(1, int(os.environ.get('GUNICORN_THREADS', 4)))
+worker_class = 'gthread'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+
+# Each worker opens its own pool lazily on first query; preloading the app in
+# the master would share pool sockets across forks
+preload_app = False
+
+
+def _metrics():
+    # The master never serves requests; it only needs settings for METRICS_DIR
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'library_booking_api.settings')
+    import django
+    django.setup()
+    from library_booking_api import metrics
+    return metrics
+
+
+def on_starting(server):
+    """Start request metrics from zero instead of merging files from a previous run"""
+    _metrics().reset_metrics_dir()
+
+
+def worker_exit(server, worker):
+    """Write the requests served since the last flush before the master retires the file"""
+    try:
+        _metrics().registry.flush()
+    except OSError:
+        server.log.exception('Could not flush metrics for worker %s', worker.pid)
+
+
+def child_exit(server, worker):
+    """Keep an exited worker's request counts in the metrics aggregate"""
+    try:
+        _metrics().retire_worker(worker.pid)
+    except OSError:
+        server.log.exception('Could not retire metrics for worker %s', worker.pid)
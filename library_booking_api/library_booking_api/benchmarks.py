@@ -0,0 +1,298 @@
+"""
+In-process benchmark suite for the key API endpoints.
+
+Seeds a realistic dataset with datagen.DataGenerator, then drives each
+scenario through Django's test client (full middleware, auth and serializer
+stack) and reports throughput, latency percentiles and SQL query counts as
+JSON. Run it with `python manage.py run_benchmarks`.
+
+run_connection_benchmark() compares connect-per-request, persistent and pooled
+database connections (`python manage.py benchmark_db_connections`).
+"""
+
+import threading
+import time
+from datetime import datetime, time as dt_time, timedelta
+
+from django.test import Client
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+from .datagen import DataGenerator
+from .db_pool import pool_available, pool_size
+from .query_budget import QueryRecorder
+
+BENCHMARK_PASSWORD = 'bench-pass-123'
+LIVE_SESSIONS = 5
+
+
+def seed_benchmark_data(users=2000, seats=300, days=90, seed=42, token_users=500, log=None):
+    """
+    Generate the dataset with DataGenerator, then add a few live QR sessions
+    and JWTs for the scenarios. Deterministic for a given seed.
+    """
+    from accounts.models import User
+    from attendance.models import AttendanceSession
+
+    rooms = max(1, seats // 50)
+    data = DataGenerator(
+        users=users, rooms=rooms, seats_per_room=max(1, seats // rooms), days=days, seed=seed,
+        prefix='bench', password=BENCHMARK_PASSWORD, log=log,
+    ).run()
+
+    # Sessions running right now, for the QR check-in scenario
+    now = timezone.now()
+    AttendanceSession.objects.bulk_create([
+        AttendanceSession(
+            title=f'Bench live session {n}', start_time=now - timedelta(hours=1),
+            end_time=now + timedelta(hours=3), room_id=data['room_ids'][n % len(data['room_ids'])],
+            qr_code_token=f'BENCHLIVE{n}', qr_code_data='',
+        )
+        for n in range(LIVE_SESSIONS)
+    ])
+
+    accounts = User.objects.in_bulk(data['user_ids'][:token_users])
+    return {
+        **data,
+        'emails': [f'bench_{i}@example.com' for i in range(users)],
+        'tokens': [str(RefreshToken.for_user(user).access_token) for user in accounts.values()],
+        'live_sessions': [f'BENCHLIVE{n}' for n in range(LIVE_SESSIONS)],
+        'seed': seed,
+    }
+
+
+class Scenario:
+    """One endpoint call, parameterised by the iteration number"""
+
+    def __init__(self, name, build, max_iterations=None):
+        self.name = name
+        self.build = build
+        self.max_iterations = max_iterations
+
+
+def _auth(ctx, i):
+    return {'HTTP_AUTHORIZATION': f"Bearer {ctx['tokens'][i % len(ctx['tokens'])]}"}
+
+
+def _login(ctx, i):
+    return 'post', '/api/accounts/login/', {
+        'data': {'email_or_phone': ctx['emails'][i % len(ctx['emails'])], 'password': BENCHMARK_PASSWORD},
+        'content_type': 'application/json',
+    }
+
+
+def _seat_list(ctx, i):
+    room_id = ctx['room_ids'][i % len(ctx['room_ids'])]
+    return 'get', f'/api/seats/?room={room_id}', _auth(ctx, i)
+
+
+def _availability(ctx, i):
+    day = timezone.localdate() + timedelta(days=1 + i % 7)
+    room_id = ctx['room_ids'][i % len(ctx['room_ids'])]
+    return 'get', (
+        f'/api/seats/available-seats/?date={day}&start_time=10:00&end_time=13:00&room={room_id}'
+    ), _auth(ctx, i)
+
+
+def _booking_create(ctx, i):
+    seat_ids = ctx['seat_ids']
+    day = timezone.localdate() + timedelta(days=30 + i // len(seat_ids))
+    start = timezone.make_aware(datetime.combine(day, dt_time(9)))
+    return 'post', '/api/bookings/', {
+        'data': {
+            'seat': seat_ids[i % len(seat_ids)],
+            'start_time': start.isoformat(),
+            'end_time': (start + timedelta(hours=3)).isoformat(),
+            'purpose': 'Benchmark',
+        },
+        'content_type': 'application/json',
+        **_auth(ctx, i),
+    }
+
+
+def _notifications(ctx, i):
+    return 'get', '/api/notifications/my-notifications/', _auth(ctx, i)
+
+
+def _qr_checkin(ctx, i):
+    # Every iteration uses a fresh (user, session) pair so each one is a real check-in
+    sessions = ctx['live_sessions']
+    token = sessions[(i // len(ctx['tokens'])) % len(sessions)]
+    return 'post', f'/api/attendance/qr-checkin/{token}/', {
+        'data': {'location': 'Benchmark'}, 'content_type': 'application/json', **_auth(ctx, i),
+    }
+
+
+SCENARIOS = [
+    # Password hashing dominates login by design, so it gets fewer iterations
+    Scenario('login', _login, max_iterations=20),
+    Scenario('seat_list', _seat_list),
+    Scenario('availability', _availability),
+    Scenario('booking_create', _booking_create),
+    Scenario('notifications', _notifications),
+    Scenario('qr_checkin', _qr_checkin),
+]
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(scenario, ctx, iterations, warmup=5):
+    """Drive one scenario and summarise latency, throughput and queries"""
+    client = Client()
+    if scenario.max_iterations:
+        iterations = min(iterations, scenario.max_iterations)
+        warmup = min(warmup, 1)
+
+    for i in range(warmup):
+        method, path, kwargs = scenario.build(ctx, iterations + i)
+        getattr(client, method)(path, **kwargs)
+
+    latencies, queries, statuses = [], [], {}
+    started = time.perf_counter()
+    for i in range(iterations):
+        method, path, kwargs = scenario.build(ctx, i)
+        recorder = QueryRecorder()
+        with recorder.record():
+            t0 = time.perf_counter()
+            response = getattr(client, method)(path, **kwargs)
+            latencies.append((time.perf_counter() - t0) * 1000)
+        queries.append(recorder.count)
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'iterations': iterations,
+        'errors': sum(n for code, n in statuses.items() if not code.startswith('2')),
+        'status_codes': statuses,
+        'throughput_rps': round(iterations / elapsed, 2) if elapsed else None,
+        'latency_ms': {
+            'p50': round(_percentile(latencies, 50), 2),
+            'p90': round(_percentile(latencies, 90), 2),
+            'p99': round(_percentile(latencies, 99), 2),
+            'mean': round(sum(latencies) / len(latencies), 2),
+            'max': round(latencies[-1], 2),
+        },
+        'queries': {
+            'mean': round(sum(queries) / len(queries), 2),
+            'max': max(queries),
+        },
+    }
+
+
+def run_benchmarks(ctx, iterations=200, warmup=5, only=None, log=None):
+    log = log or (lambda message: None)
+    results = {}
+    for scenario in SCENARIOS:
+        if only and scenario.name not in only:
+            continue
+        log(f'Running {scenario.name}')
+        results[scenario.name] = run_scenario(scenario, ctx, iterations, warmup)
+    return results
+
+
+def _connection_mode_settings(base, mode):
+    """DATABASES entry for one connection strategy, derived from an existing alias"""
+    settings_dict = {**base, 'OPTIONS': {k: v for k, v in base.get('OPTIONS', {}).items() if k != 'pool'}}
+    if mode == 'persistent':
+        settings_dict['CONN_MAX_AGE'] = 600
+    else:
+        settings_dict['CONN_MAX_AGE'] = 0
+    if mode == 'pooled':
+        min_size, max_size = pool_size()
+        settings_dict['OPTIONS']['pool'] = {'min_size': min_size, 'max_size': max_size}
+    return settings_dict
+
+
+def connection_modes(alias='default'):
+    """Strategies that can run against `alias` (pooling needs PostgreSQL and psycopg_pool)"""
+    from django.db import connections
+
+    modes = ['connect_per_request', 'persistent']
+    if connections[alias].vendor == 'postgresql' and pool_available():
+        modes.append('pooled')
+    return modes
+
+
+def run_connection_benchmark(alias='default', modes=None, requests=500, threads=4, log=None):
+    """
+    Simulate `threads` gunicorn threads each serving `requests` short requests
+    (one query, then Django's end-of-request connection handling) under each
+    connection strategy, and report latency plus how many connections were opened.
+    """
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+
+    log = log or (lambda message: None)
+    base = connections[alias].settings_dict
+    results = {}
+
+    for mode in modes or connection_modes(alias):
+        bench_alias = f'bench_{mode}'
+        connections.settings[bench_alias] = connections.configure_settings(
+            {'default': connections.settings['default'], bench_alias: _connection_mode_settings(base, mode)}
+        )[bench_alias]
+
+        opened = []
+        lock = threading.Lock()
+
+        def on_connect(sender, connection, **kwargs):
+            if connection.alias == bench_alias:
+                with lock:
+                    opened.append(1)
+
+        def worker(latencies):
+            connection = connections[bench_alias]
+            for _ in range(requests):
+                t0 = time.perf_counter()
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                    cursor.fetchone()
+                # What request_finished does via close_old_connections()
+                connection.close_if_unusable_or_obsolete()
+                latencies.append((time.perf_counter() - t0) * 1000)
+            connection.close()
+
+        log(f'Running {mode}')
+        connection_created.connect(on_connect)
+        per_thread = [[] for _ in range(threads)]
+        workers = [threading.Thread(target=worker, args=(per_thread[n],)) for n in range(threads)]
+        started = time.perf_counter()
+        try:
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            connection_created.disconnect(on_connect)
+            # Worker threads closed their own connections; only the pool is shared
+            pool = None
+            if mode == 'pooled':
+                pool = connections[bench_alias].pool
+                stats = pool.get_stats()
+                connections[bench_alias].close_pool()
+                del connections[bench_alias]
+            del connections.settings[bench_alias]
+
+        latencies = sorted(value for values in per_thread for value in values)
+        total = len(latencies)
+        results[mode] = {
+            'requests': total,
+            'threads': threads,
+            'throughput_rps': round(total / elapsed, 2) if elapsed else None,
+            'latency_ms': {
+                'p50': round(_percentile(latencies, 50), 3),
+                'p90': round(_percentile(latencies, 90), 3),
+                'p99': round(_percentile(latencies, 99), 3),
+                'mean': round(sum(latencies) / total, 3),
+                'max': round(latencies[-1], 3),
+            },
+            # A pooled checkout also fires connection_created, so count real connects from the pool
+            'connections_opened': stats.get('connections_num', 0) if pool is not None else len(opened),
+        }
+    return results
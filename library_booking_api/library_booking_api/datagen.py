@@ -0,0 +1,394 @@
+"""
+Deterministic synthetic data for scale testing.
+
+DataGenerator bulk-inserts users, rooms, seats, bookings that follow each
+user's MembershipPlan shift, attendance, payments and notifications. The
+same seed and end date always produce the same rows, so benchmark and
+EXPLAIN runs are comparable across machines: booking and payment statuses
+are decided as of the end of end_date, never the wall clock. Use it through the
+`generate_data` management command.
+"""
+
+import io
+import random
+from contextlib import contextmanager
+from datetime import datetime, time as dt_time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db import transaction
+from django.utils import timezone
+
+DEFAULT_PASSWORD = 'password123'
+
+# Relative popularity of each plan among generated members
+PLAN_WEIGHTS = {
+    'morning_shift': 25, 'afternoon_shift': 15, 'evening_shift': 25,
+    'full_day': 20, 'night_shift': 10, '24_7_access': 5,
+}
+
+FIRST_NAMES = ['Aarav', 'Vivaan', 'Aditya', 'Ananya', 'Diya', 'Ishaan', 'Kavya', 'Meera',
+               'Rohan', 'Saanvi', 'Arjun', 'Priya', 'Karan', 'Neha', 'Rahul', 'Sneha']
+LAST_NAMES = ['Sharma', 'Verma', 'Gupta', 'Singh', 'Kumar', 'Patel', 'Yadav', 'Mishra',
+              'Jain', 'Agarwal', 'Chauhan', 'Reddy']
+DEPARTMENTS = ['Engineering', 'Commerce', 'Arts', 'Science', 'Medical', 'Law', 'UPSC', 'SSC']
+
+
+@contextmanager
+def historical_timestamps(*fields):
+    """Let bulk_create keep explicit values for auto_now_add fields"""
+    previous = [field.auto_now_add for field in fields]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, value in zip(fields, previous):
+            field.auto_now_add = value
+
+
+class DataGenerator:
+    """Generate a coherent, seeded dataset with batched bulk_create"""
+
+    def __init__(self, users=1000, rooms=4, seats_per_room=50, days=90, seed=42,
+                 end_date=None, prefix='gen', batch_size=5000, password=DEFAULT_PASSWORD,
+                 notifications_per_week=2, log=None):
+        self.users = users
+        self.rooms = rooms
+        self.seats_per_room = seats_per_room
+        self.days = days
+        self.seed = seed
+        self.end_date = end_date or timezone.localdate()
+        self.start_date = self.end_date - timedelta(days=days - 1)
+        # "Now" for generated statuses: the end of the last generated day
+        self.as_of = self._aware(self.end_date + timedelta(days=1))
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.password = password
+        self.notifications_per_week = notifications_per_week
+        self.log = log or (lambda message: None)
+        self.rng = random.Random(seed)
+        self.counts = {}
+
+    def _aware(self, day, at=dt_time(0)):
+        return timezone.make_aware(datetime.combine(day, at))
+
+    def _bulk(self, model, rows):
+        created = model.objects.bulk_create(rows, batch_size=self.batch_size)
+        self.counts[model.__name__] = self.counts.get(model.__name__, 0) + len(rows)
+        return created
+
+    def exists(self):
+        from accounts.models import User
+        return User.objects.filter(username__startswith=f'{self.prefix}_').exists()
+
+    def run(self):
+        with transaction.atomic():
+            plans = self.ensure_plans()
+            members = self.create_users(plans)
+            seats = self.create_rooms_and_seats()
+            self.create_payments(members)
+            self.create_bookings_and_attendance(members, seats)
+            self.create_notifications(members)
+
+        call_command(
+            'backfill_attendance_rollup',
+            start_date=str(self.start_date), end_date=str(self.end_date + timedelta(days=1)),
+            stdout=io.StringIO(),
+        )
+        return {
+            'user_ids': [member['id'] for member in members],
+            'room_ids': sorted({room_id for _, room_id in seats}),
+            'seat_ids': [seat_id for seat_id, _ in seats],
+            'counts': dict(self.counts),
+        }
+
+    def ensure_plans(self):
+        from payments.models import MembershipPlan
+        from payments.plans import DEFAULT_PLANS
+
+        # Only created when the plan is missing
+        for plan in DEFAULT_PLANS:
+            MembershipPlan.objects.get_or_create(plan_type=plan['plan_type'], defaults=plan)
+        plans = list(MembershipPlan.objects.filter(plan_type__in=PLAN_WEIGHTS).order_by('plan_type'))
+        return plans
+
+    def create_users(self, plans):
+        """Members, each on one plan, with a home seat preference and a diligence factor"""
+        from accounts.models import User
+
+        self.log(f'Creating {self.users} users')
+        password = make_password(self.password)
+        weights = [PLAN_WEIGHTS[plan.plan_type] for plan in plans]
+
+        rows, profiles = [], []
+        for i in range(self.users):
+            plan = self.rng.choices(plans, weights=weights)[0]
+            first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            joined = self._aware(self.start_date - timedelta(days=self.rng.randint(0, 60)), dt_time(10))
+            rows.append(User(
+                username=f'{self.prefix}_{i}', email=f'{self.prefix}_{i}@example.com', password=password,
+                first_name=first, last_name=last, phone=f'9{self.seed % 10}{i:08d}'[:10],
+                department=self.rng.choice(DEPARTMENTS), year_of_study=self.rng.randint(1, 4),
+                membership_type=plan.plan_type, date_joined=joined,
+            ))
+            profiles.append({
+                'plan': plan,
+                'joined': joined.date(),
+                # Share of days this member actually shows up
+                'diligence': self.rng.uniform(0.35, 0.95),
+                # Members drop out at some point; None means still active
+                'churn_day': self.rng.randint(30, self.days) if self.rng.random() < 0.2 and self.days > 30 else None,
+            })
+        self._bulk(User, rows)
+
+        ids = User.objects.filter(username__startswith=f'{self.prefix}_').values_list('username', 'id')
+        id_by_username = dict(ids)
+        for i, profile in enumerate(profiles):
+            profile['id'] = id_by_username[f'{self.prefix}_{i}']
+        return profiles
+
+    def create_rooms_and_seats(self):
+        from seats.models import Room, Seat
+
+        self.log(f'Creating {self.rooms} rooms with {self.seats_per_room} seats each')
+        self._bulk(Room, [
+            Room(
+                name=f'{self.prefix.title()} Room {r + 1}', floor=r // 2 + 1, capacity=self.seats_per_room,
+                amenities=['wifi', 'ac', 'power', 'ro_water'],
+                operating_hours={'open': '00:00', 'close': '23:59'},
+            )
+            for r in range(self.rooms)
+        ])
+        room_ids = list(Room.objects.filter(
+            name__startswith=f'{self.prefix.title()} Room '
+        ).order_by('id').values_list('id', flat=True))
+
+        rows = []
+        for room_id in room_ids:
+            for s in range(self.seats_per_room):
+                rows.append(Seat(
+                    room_id=room_id, seat_number=f'{chr(65 + s // 20)}{s % 20 + 1:02d}', row=s // 20 + 1, column=s % 20 + 1,
+                    seat_type=self.rng.choices(['regular', 'premium', 'vip', 'group'], weights=[70, 18, 7, 5])[0],
+                    has_power_outlet=self.rng.random() < 0.7, has_monitor=self.rng.random() < 0.1,
+                    is_near_window=s % 20 in (0, 19), is_accessible=s < 2,
+                ))
+        self._bulk(Seat, rows)
+        return list(Seat.objects.filter(room_id__in=room_ids).order_by('id').values_list('id', 'room_id'))
+
+    def create_payments(self, members):
+        """Monthly renewals for each member while they are active"""
+        from accounts.models import User
+        from payments.models import Payment
+
+        self.log('Creating payments')
+        rows, expiries = [], []
+        serial = 0
+        for member in members:
+            plan = member['plan']
+            last_day = self.start_date + timedelta(days=member['churn_day']) if member['churn_day'] else self.end_date
+            pay_day = self.start_date - timedelta(days=self.rng.randint(0, plan.duration_days - 1))
+            expiry = None
+            while pay_day <= last_day:
+                serial += 1
+                status = 'pending' if pay_day > self.end_date - timedelta(days=2) else self.rng.choices(
+                    ['paid', 'rejected'], weights=[95, 5])[0]
+                created = self._aware(pay_day, dt_time(self.rng.randint(8, 21), self.rng.randint(0, 59)))
+                rows.append(Payment(
+                    user_id=member['id'], membership_plan=plan,
+                    description=f'{plan.name} membership', amount=plan.price,
+                    method=self.rng.choice(['online', 'online', 'offline']), status=status,
+                    transaction_id=f'{self.prefix.upper()}TXN{self.seed:04d}{serial:010d}',
+                    account_holder_name=f'Holder {member["id"]}',
+                    screenshot='payment_proofs/synthetic.png', date=pay_day, created_at=created,
+                ))
+                if status == 'paid':
+                    expiry = created + timedelta(days=plan.duration_days)
+                pay_day += timedelta(days=plan.duration_days)
+            expiries.append((member['id'], expiry))
+
+            if len(rows) >= self.batch_size:
+                with historical_timestamps(Payment._meta.get_field('created_at')):
+                    self._bulk(Payment, rows)
+                rows = []
+        with historical_timestamps(Payment._meta.get_field('created_at')):
+            self._bulk(Payment, rows)
+
+        # Group members by expiry so this is a handful of UPDATEs, not one per user
+        by_expiry = {}
+        for user_id, expiry in expiries:
+            if expiry:
+                by_expiry.setdefault(expiry.date(), []).append(user_id)
+        for day, user_ids in by_expiry.items():
+            expiry = self._aware(day, dt_time(23, 59))
+            User.objects.filter(id__in=user_ids).update(
+                membership_expiry=expiry, membership_state=User.membership_state_for(expiry),
+            )
+
+    def _shift_window(self, plan, day):
+        """Start and end of the member's visit on this day, following the plan shift"""
+        if plan.start_time is None:
+            # 24/7 members come for a 3-8 hour block at any time
+            start = self._aware(day, dt_time(self.rng.randint(0, 18)))
+            return start, start + timedelta(hours=self.rng.randint(3, 8))
+
+        start = self._aware(day, plan.start_time)
+        end = self._aware(day, plan.end_time)
+        if end <= start:
+            end += timedelta(days=1)
+        # Arrive a little late or leave a little early now and then
+        start += timedelta(minutes=self.rng.choice([0, 0, 0, 15, 30]))
+        end -= timedelta(minutes=self.rng.choice([0, 0, 0, 30, 60]))
+        return start, end
+
+    def create_bookings_and_attendance(self, members, seats):
+        """One booking per member per visit day, on their usual seat when it is free"""
+        from attendance.models import AttendanceSession
+        from seats.models import SeatBooking
+
+        self.log(f'Creating {self.days} days of bookings and attendance')
+        now = self.as_of
+        seat_ids = [seat_id for seat_id, _ in seats]
+        room_of = dict(seats)
+        for member in members:
+            member['home_seat'] = self.rng.choice(seat_ids)
+
+        # One all-day session per room per day, for QR attendance
+        room_ids = sorted(set(room_of.values()))
+        token_prefix = f'{self.prefix.upper()}{self.seed}D'
+        self._bulk(AttendanceSession, [
+            AttendanceSession(
+                title=f'Daily study {self.start_date + timedelta(days=d)}', session_type='study',
+                start_time=self._aware(self.start_date + timedelta(days=d)),
+                end_time=self._aware(self.start_date + timedelta(days=d + 1), dt_time(6)),
+                room_id=room_id, qr_code_token=f'{token_prefix}{d}R{room_id}', qr_code_data='',
+            )
+            for d in range(self.days)
+            for room_id in room_ids
+        ])
+        session_of = dict(AttendanceSession.objects.filter(
+            qr_code_token__startswith=token_prefix
+        ).values_list('qr_code_token', 'id'))
+
+        occupied = {}  # seat_id -> [(start, end)] for bookings that may still overlap
+        serial = 0
+        # booking_reference is unique and at most 20 characters: 9 of prefix, 2 of seed, 9 of serial
+        reference_prefix = f'{self.prefix.upper()[:9]}{self.seed % 100:02d}'
+        bookings, visits = [], []
+
+        for d in range(self.days):
+            day = self.start_date + timedelta(days=d)
+            day_start = self._aware(day)
+            weekend = day.weekday() >= 5
+            for seat_id in list(occupied):
+                occupied[seat_id] = [(s, e) for s, e in occupied[seat_id] if e > day_start]
+
+            for member in members:
+                if day < member['joined'] or (member['churn_day'] is not None and d >= member['churn_day']):
+                    continue
+                if self.rng.random() > member['diligence'] * (0.6 if weekend else 1.0):
+                    continue
+
+                start, end = self._shift_window(member['plan'], day)
+                seat_id = self._free_seat(member['home_seat'], seat_ids, occupied, start, end)
+                if seat_id is None:
+                    continue
+                occupied.setdefault(seat_id, []).append((start, end))
+
+                if start > now:
+                    status = 'confirmed'
+                elif end > now:
+                    status = 'active'
+                else:
+                    status = self.rng.choices(['completed', 'no_show', 'cancelled'], weights=[86, 6, 8])[0]
+
+                serial += 1
+                bookings.append(SeatBooking(
+                    user_id=member['id'], seat_id=seat_id, start_time=start, end_time=end,
+                    duration_hours=round((end - start).total_seconds() / 3600, 2), status=status,
+                    booking_reference=f'{reference_prefix}{serial:09d}', purpose='Self study',
+                    created_at=start - timedelta(hours=self.rng.randint(2, 96)),
+                    checked_in_at=start if status in ('completed', 'active') else None,
+                    checked_out_at=end if status == 'completed' else None,
+                ))
+                visits.append((member['id'], session_of[f'{token_prefix}{d}R{room_of[seat_id]}']))
+
+            if len(bookings) >= self.batch_size:
+                self._flush_bookings(bookings, visits, now)
+                bookings, visits = [], []
+        self._flush_bookings(bookings, visits, now)
+
+    def _free_seat(self, home_seat, seat_ids, occupied, start, end):
+        candidates = [home_seat] + [self.rng.choice(seat_ids) for _ in range(8)]
+        for seat_id in candidates:
+            if all(end <= s or start >= e for s, e in occupied.get(seat_id, ())):
+                return seat_id
+        return None
+
+    def _flush_bookings(self, bookings, visits, now):
+        from attendance.models import AttendanceRecord
+        from seats.models import SeatBooking
+
+        created = self._bulk(SeatBooking, bookings)
+        records = []
+        for booking, (user_id, session_id) in zip(created, visits):
+            if booking.status not in ('completed', 'active', 'no_show'):
+                continue
+            if booking.status == 'no_show':
+                records.append(AttendanceRecord(
+                    user_id=user_id, session_id=session_id, seat_booking_id=booking.pk,
+                    status='absent', created_at=booking.end_time,
+                ))
+                continue
+            check_in = booking.start_time + timedelta(minutes=self.rng.randint(-10, 25))
+            check_out = booking.end_time - timedelta(minutes=self.rng.randint(0, 20)) if booking.status == 'completed' else None
+            records.append(AttendanceRecord(
+                user_id=user_id, session_id=session_id, seat_booking_id=booking.pk,
+                status='late' if check_in - booking.start_time > timedelta(minutes=15) else 'present',
+                check_in_time=check_in, check_out_time=check_out,
+                duration_minutes=int((check_out - check_in).total_seconds() // 60) if check_out else 0,
+                scanned_at=check_in, verified_by_qr=True, verification_method='qr_code',
+                scan_confidence=1.0, created_at=check_in,
+            ))
+        self._bulk(AttendanceRecord, records)
+
+    def create_notifications(self, members):
+        """Broadcast notices, delivered to the members who were around at the time"""
+        from notifications.models import Notification, UserNotification
+
+        count = max(1, self.days * self.notifications_per_week // 7)
+        self.log(f'Creating {count} notifications')
+        created_field = Notification._meta.get_field('created_at')
+        delivered_field = UserNotification._meta.get_field('created_at')
+
+        notices = []
+        for n in range(count):
+            sent = self._aware(self.start_date + timedelta(days=n * self.days // count), dt_time(9))
+            notices.append(Notification(
+                title=f'{self.prefix.title()} notice {n + 1}', message='Library timings and announcements',
+                type=self.rng.choice(['info', 'info', 'success', 'warning']), target_audience='all',
+                created_at=sent,
+            ))
+        with historical_timestamps(created_field):
+            self._bulk(Notification, notices)
+        sent_at = dict(Notification.objects.filter(
+            title__startswith=f'{self.prefix.title()} notice '
+        ).order_by('id').values_list('id', 'created_at'))
+
+        rows = []
+        for member in members:
+            for notification_id, sent in sent_at.items():
+                if sent.date() < member['joined'] or self.rng.random() < 0.3:
+                    continue
+                read = self.rng.random() < 0.6
+                rows.append(UserNotification(
+                    user_id=member['id'], notification_id=notification_id, is_read=read,
+                    read_at=sent + timedelta(hours=self.rng.randint(1, 48)) if read else None,
+                    created_at=sent,
+                ))
+            if len(rows) >= self.batch_size:
+                with historical_timestamps(delivered_field):
+                    self._bulk(UserNotification, rows)
+                rows = []
+        with historical_timestamps(delivered_field):
+            self._bulk(UserNotification, rows)
@@ -0,0 +1,140 @@
+"""
+PostgreSQL connection pooling.
+
+database_config() turns a DATABASE_URL into a DATABASES entry. On PostgreSQL
+with psycopg 3 and psycopg_pool installed it uses Django's native pool
+(OPTIONS['pool'], which requires CONN_MAX_AGE=0); otherwise it keeps the
+previous persistent connections (conn_max_age=600). Pool sizes come from the
+gunicorn worker/thread counts (WEB_CONCURRENCY, GUNICORN_THREADS) that
+gunicorn.conf.py reads, so every worker process gets one slot per request
+thread plus headroom for background threads, and the total stays within
+DB_MAX_CONNECTIONS.
+"""
+
+import logging
+import os
+import time
+
+import dj_database_url
+
+logger = logging.getLogger('performance')
+
+POSTGRES_ENGINES = ('django.db.backends.postgresql',)
+
+# Threads in every worker process that use the database outside a request.
+# The executors read their sizes from here so the pool grows with them.
+BACKGROUND_THREADS = {
+    'attendance-reports': 1,  # attendance.reports executor
+    'media-pipeline': 1,  # media_pipeline executor
+    'scheduler': 1,  # scheduler thread (SCHEDULER_ENABLED)
+}
+BACKGROUND_CONNECTIONS = sum(BACKGROUND_THREADS.values())
+
+
+def gunicorn_workers():
+    return max(1, int(os.environ.get('WEB_CONCURRENCY', 2)))
+
+
+def gunicorn_threads():
+    return max(1, int(os.environ.get('GUNICORN_THREADS', 4)))
+
+
+def pool_available():
+    try:
+        import psycopg  # noqa: F401
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def pool_size(workers=None, threads=None, max_connections=None, reserved=5):
+    """
+    Per-process (min_size, max_size). max_size covers every request thread plus
+    background threads; if workers * max_size would exceed the server's
+    max_connections (minus `reserved` for admin/migrations) it is capped.
+    """
+    workers = workers or gunicorn_workers()
+    threads = threads or gunicorn_threads()
+    max_size = threads + BACKGROUND_CONNECTIONS
+
+    if max_connections:
+        per_worker = max(1, (max_connections - reserved) // workers)
+        if per_worker < max_size:
+            logger.warning(
+                'DB pool capped at %s connections per worker (%s workers, max_connections=%s); '
+                'requests may wait for a connection', per_worker, workers, max_connections,
+            )
+        max_size = min(max_size, per_worker)
+
+    return min(2, max_size), max_size
+
+
+def database_config(url, pool=True, workers=None, threads=None, max_connections=None,
+                    pool_timeout=10, ssl_require=False):
+    """DATABASES entry for `url`, pooled on PostgreSQL when psycopg_pool is installed"""
+    config = dj_database_url.parse(url, conn_max_age=600, conn_health_checks=True, ssl_require=ssl_require)
+    if not pool or config['ENGINE'] not in POSTGRES_ENGINES or not pool_available():
+        return config
+
+    min_size, max_size = pool_size(workers, threads, max_connections)
+    config['CONN_MAX_AGE'] = 0  # the pool replaces persistent connections
+    config.setdefault('OPTIONS', {})['pool'] = {
+        'min_size': min_size,
+        'max_size': max_size,
+        'timeout': pool_timeout,  # seconds a request waits for a free connection
+        'max_idle': 300,
+        'max_lifetime': 1800,
+    }
+    return config
+
+
+def check_database(alias):
+    """Readiness of one alias: a round trip through the pool plus its stats"""
+    from django.db import connections
+
+    connection = connections[alias]
+    status = {'alias': alias, 'vendor': connection.vendor, 'pooled': False}
+    started = time.perf_counter()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        status['ok'] = True
+    except Exception:
+        # Details go to the log only; the probe is reachable without authentication
+        logger.exception('Readiness check failed for database %s', alias)
+        status['ok'] = False
+    status['latency_ms'] = round((time.perf_counter() - started) * 1000, 2)
+
+    pool = getattr(connection, 'pool', None)
+    if pool is not None:
+        stats = pool.get_stats()
+        status['pooled'] = True
+        status['pool'] = {
+            'min_size': pool.min_size,
+            'max_size': pool.max_size,
+            'size': stats.get('pool_size', 0),
+            'available': stats.get('pool_available', 0),
+            'waiting': stats.get('requests_waiting', 0),
+            'timeouts': stats.get('requests_errors', 0),
+        }
+    else:
+        status['conn_max_age'] = connection.settings_dict.get('CONN_MAX_AGE')
+    return status
+
+
+def readiness_view(request):
+    """Load balancer readiness probe: 200 when every database answers, else 503"""
+    from django.db import connections
+    from django.http import JsonResponse
+
+    databases = [check_database(alias) for alias in connections]
+    ready = all(database['ok'] for database in databases)
+    return JsonResponse(
+        {
+            'status': 'ready' if ready else 'unavailable',
+            'databases': {database['alias']: 'ok' if database['ok'] else 'unavailable' for database in databases},
+        },
+        status=200 if ready else 503,
+    )
@@ -0,0 +1,150 @@
+"""
+Derivatives for uploaded photos (payment screenshots).
+
+Phone photos arrive as 3-8 MB JPEG/PNG files. After the upload's transaction
+commits, a background worker opens the original once, applies the EXIF
+orientation and drops all metadata (GPS, device), then writes:
+
+  * a preview, at most SCREENSHOT_PREVIEW_MAX_PX on its long side and at
+    most SCREENSHOT_PREVIEW_MAX_BYTES, for API responses and the admin
+  * a small thumbnail (SCREENSHOT_THUMBNAIL_PX) for admin list pages
+  * optionally, the perceptual hash used for duplicate detection (phash.py)
+
+Both are WebP when Pillow supports it, otherwise progressive JPEG. The
+original file is never modified and stays reachable for the rare case
+where full resolution is needed.
+"""
+
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps, features
+
+from . import phash
+from .db_pool import BACKGROUND_THREADS
+
+logger = logging.getLogger(__name__)
+
+# One worker: decoding large photos is CPU heavy and should not starve requests
+_executor = ThreadPoolExecutor(max_workers=BACKGROUND_THREADS['media-pipeline'], thread_name_prefix='media-pipeline')
+
+QUALITY_STEPS = (82, 72, 62, 50, 40)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def output_format():
+    return ('WEBP', 'webp') if features.check('webp') else ('JPEG', 'jpg')
+
+
+def _encode(image, max_px, max_bytes=None):
+    """Downscale to max_px and encode, lowering quality until it fits max_bytes"""
+    image = image.copy()
+    image.thumbnail((max_px, max_px), Image.Resampling.LANCZOS)
+    fmt, _ = output_format()
+    if fmt == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    for quality in QUALITY_STEPS:
+        buffer = io.BytesIO()
+        # No exif= argument, so no metadata is written
+        if fmt == 'WEBP':
+            image.save(buffer, 'WEBP', quality=quality, method=4)
+        else:
+            image.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+        if max_bytes is None or buffer.tell() <= max_bytes:
+            break
+    return buffer.getvalue()
+
+
+def make_derivatives(source):
+    """(preview_bytes, thumbnail_bytes, extension, dhash) for an open image file"""
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+
+        preview = _encode(
+            image,
+            _setting('SCREENSHOT_PREVIEW_MAX_PX', 1600),
+            _setting('SCREENSHOT_PREVIEW_MAX_BYTES', 400 * 1024),
+        )
+        thumbnail = _encode(image, _setting('SCREENSHOT_THUMBNAIL_PX', 160))
+        image_hash = phash.dhash(image)
+    return preview, thumbnail, output_format()[1], image_hash
+
+
+def process(model_label, pk, source_field, preview_field, thumbnail_field, hash_field=None):
+    """Build and attach the derivatives (and hash) for one row; a no-op if they already exist"""
+    model = apps.get_model(model_label)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return False
+
+    source = getattr(instance, source_field)
+    if not source or getattr(instance, thumbnail_field):
+        return False
+
+    try:
+        source.open('rb')
+        try:
+            preview, thumbnail, ext, image_hash = make_derivatives(source)
+        finally:
+            source.close()
+    except Exception:
+        logger.exception('Could not build derivatives for %s %s.%s', model_label, pk, source_field)
+        return False
+
+    stem = os.path.splitext(os.path.basename(source.name))[0]
+    names = {}
+    for field_name, content, suffix in (
+        (preview_field, preview, 'preview'),
+        (thumbnail_field, thumbnail, 'thumb'),
+    ):
+        field = model._meta.get_field(field_name)
+        filename = field.generate_filename(instance, f'{stem}_{suffix}.{ext}')
+        names[field_name] = field.storage.save(filename, ContentFile(content))
+
+    columns = phash.hash_columns(hash_field, image_hash) if hash_field else {}
+
+    # Only attach if the original was not replaced while we were working
+    updated = model.objects.filter(pk=pk, **{source_field: source.name}).update(**names, **columns)
+    if not updated:
+        for field_name, name in names.items():
+            model._meta.get_field(field_name).storage.delete(name)
+    return bool(updated)
+
+
+def _run_in_worker(*args):
+    close_old_connections()
+    try:
+        process(*args)
+    finally:
+        close_old_connections()
+
+
+def schedule(instance, source_field, preview_field, thumbnail_field, hash_field=None):
+    """Queue derivative generation for after the current transaction commits"""
+    args = (instance._meta.label, instance.pk, source_field, preview_field, thumbnail_field, hash_field)
+    if _setting('MEDIA_PIPELINE_ASYNC', True):
+        transaction.on_commit(lambda: _executor.submit(_run_in_worker, *args))
+    else:
+        transaction.on_commit(lambda: process(*args))
+
+
+def derivative_url(instance, field_names, request=None):
+    """URL of the first populated field in field_names (derivatives first, original last)"""
+    for name in field_names:
+        value = getattr(instance, name)
+        if value:
+            url = value.url
+            return request.build_absolute_uri(url) if request else url
+    return None
@@ -0,0 +1,313 @@
+"""
+Per-endpoint request metrics: latency histograms, status codes and slow requests.
+
+Each gunicorn worker keeps its own counters in memory and periodically writes
+them to METRICS_DIR/worker-<pid>-<token>.json; the random token keeps a
+reused pid from overwriting an exited worker's file. An exiting worker
+flushes one last time (worker_exit hook in gunicorn.conf.py), then the master
+folds its file into aggregate.json (child_exit), so counters never go
+backwards. The directory is cleared when the master starts. A
+scrape of /api/metrics/ flushes the serving worker and merges the aggregate
+and every live worker file into one Prometheus text payload.
+"""
+
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from bisect import bisect_left
+
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.renderers import BaseRenderer
+
+# HDR-style log-linear buckets: two sub-buckets per power of two from 1ms to ~65s,
+# so any recorded latency is within 50% of its bucket bound at a fixed memory cost
+BUCKET_BOUNDS_MS = tuple(
+    bound
+    for exponent in range(17)
+    for bound in (2 ** exponent, 2 ** exponent * 1.5)
+)
+
+UNMATCHED_VIEW = '<unmatched>'
+AGGREGATE_FILE = 'aggregate.json'
+
+
+def get_metrics_dir():
+    return getattr(settings, 'METRICS_DIR', None) or os.path.join(
+        tempfile.gettempdir(), 'library_booking_metrics'
+    )
+
+
+class MetricsRegistry:
+    """In-memory counters for one worker process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.pid = os.getpid()
+        self.worker_id = f'{self.pid}-{uuid.uuid4().hex[:12]}'
+        self.histograms = {}
+        self.statuses = {}
+        self.slow = {}
+        self.last_flush = time.monotonic()
+
+    def observe(self, method, view, status_code, duration_ms, slow_ms):
+        index = bisect_left(BUCKET_BOUNDS_MS, duration_ms)
+        key = (method, view)
+        status_key = (method, view, str(status_code))
+
+        with self._lock:
+            self._check_fork()
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [[0] * (len(BUCKET_BOUNDS_MS) + 1), 0.0]
+            histogram[0][index] += 1
+            histogram[1] += duration_ms
+
+            self.statuses[status_key] = self.statuses.get(status_key, 0) + 1
+            if duration_ms >= slow_ms:
+                self.slow[key] = self.slow.get(key, 0) + 1
+
+    def _check_fork(self):
+        if self.pid != os.getpid():
+            # Forked from a preloaded master: start this worker from zero
+            self._reset()
+
+    def snapshot(self):
+        with self._lock:
+            self._check_fork()
+            return {
+                'histograms': [[m, v, list(counts), total] for (m, v), (counts, total) in self.histograms.items()],
+                'statuses': [[m, v, s, n] for (m, v, s), n in self.statuses.items()],
+                'slow': [[m, v, n] for (m, v), n in self.slow.items()],
+            }
+
+    def maybe_flush(self, interval):
+        if time.monotonic() - self.last_flush >= interval:
+            self.flush()
+
+    def flush(self):
+        """Atomically replace this worker's file with its current counters"""
+        self.last_flush = time.monotonic()
+        directory = get_metrics_dir()
+        os.makedirs(directory, exist_ok=True)
+
+        snapshot = self.snapshot()
+        _write_json(os.path.join(directory, f'worker-{self.worker_id}.json'), snapshot)
+
+
+registry = MetricsRegistry()
+
+
+def _write_json(path, data):
+    """Atomically replace path with data as JSON"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.worker-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as handle:
+            json.dump(data, handle)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _read_json(path):
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def _worker_id(path):
+    return os.path.basename(path)[len('worker-'):-len('.json')]
+
+
+def _merge(totals, data):
+    """Add one snapshot into (histograms, statuses, slow) dicts"""
+    histograms, statuses, slow = totals
+    for method, view, counts, total in data.get('histograms', []):
+        merged = histograms.setdefault((method, view), [[0] * (len(BUCKET_BOUNDS_MS) + 1), 0.0])
+        if len(counts) != len(merged[0]):
+            continue
+        merged[0] = [a + b for a, b in zip(merged[0], counts)]
+        merged[1] += total
+    for method, view, status_code, n in data.get('statuses', []):
+        statuses[(method, view, status_code)] = statuses.get((method, view, status_code), 0) + n
+    for method, view, n in data.get('slow', []):
+        slow[(method, view)] = slow.get((method, view), 0) + n
+
+
+def _as_snapshot(histograms, statuses, slow):
+    return {
+        'histograms': [[m, v, counts, total] for (m, v), (counts, total) in histograms.items()],
+        'statuses': [[m, v, s, n] for (m, v, s), n in statuses.items()],
+        'slow': [[m, v, n] for (m, v), n in slow.items()],
+    }
+
+
+def collect():
+    """Merge the aggregate of exited workers with every live worker file"""
+    totals = ({}, {}, {})
+    directory = get_metrics_dir()
+
+    # Worker files are read before the aggregate: a worker retired in between is
+    # then listed in the aggregate's "workers" and its file is skipped, never counted twice
+    workers = {}
+    for path in glob.glob(os.path.join(directory, 'worker-*.json')):
+        data = _read_json(path)
+        if data is not None:
+            workers[_worker_id(path)] = data
+
+    aggregate = _read_json(os.path.join(directory, AGGREGATE_FILE)) or {}
+    _merge(totals, aggregate)
+    retired = set(aggregate.get('workers', []))
+    for worker_id, data in workers.items():
+        if worker_id not in retired:
+            _merge(totals, data)
+    return totals
+
+
+def retire_worker(pid):
+    """
+    Fold an exited worker's counters into the aggregate file and delete its
+    file. Called from the gunicorn master (child_exit), one worker at a time.
+    """
+    directory = get_metrics_dir()
+    paths = glob.glob(os.path.join(directory, f'worker-{pid}-*.json'))
+    if not paths:
+        return
+
+    aggregate_path = os.path.join(directory, AGGREGATE_FILE)
+    aggregate = _read_json(aggregate_path) or {}
+    totals = ({}, {}, {})
+    _merge(totals, aggregate)
+    already = set(aggregate.get('workers', []))
+    for path in paths:
+        # A file the aggregate already includes is only deleted
+        if _worker_id(path) not in already:
+            _merge(totals, _read_json(path) or {})
+
+    # Remember which files are already included until they are gone
+    retired = [_worker_id(path) for path in paths if _worker_id(path) not in already]
+    still_present = [
+        worker_id for worker_id in aggregate.get('workers', [])
+        if os.path.exists(os.path.join(directory, f'worker-{worker_id}.json'))
+    ]
+    _write_json(aggregate_path, {**_as_snapshot(*totals), 'workers': still_present + retired})
+    for path in paths:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def reset_metrics_dir():
+    """Remove every worker, aggregate and temporary file (gunicorn master start)"""
+    directory = get_metrics_dir()
+    patterns = ('worker-*.json', AGGREGATE_FILE, '.worker-*.tmp')
+    for pattern in patterns:
+        for path in glob.glob(os.path.join(directory, pattern)):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(histograms, statuses, slow):
+    """Prometheus text exposition format 0.0.4"""
+    lines = [
+        '# HELP http_request_duration_seconds Request latency by endpoint.',
+        '# TYPE http_request_duration_seconds histogram',
+    ]
+    for (method, view), (counts, total_ms) in sorted(histograms.items()):
+        labels = f'method="{_label(method)}",view="{_label(view)}"'
+        cumulative = 0
+        for bound, count in zip(BUCKET_BOUNDS_MS, counts):
+            cumulative += count
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound / 1000:g}"}} {cumulative}')
+        cumulative += counts[-1]
+        lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {cumulative}')
+        lines.append(f'http_request_duration_seconds_sum{{{labels}}} {total_ms / 1000:.6f}')
+        lines.append(f'http_request_duration_seconds_count{{{labels}}} {cumulative}')
+
+    lines += [
+        '# HELP http_responses_total Responses by endpoint and status code.',
+        '# TYPE http_responses_total counter',
+    ]
+    for (method, view, status_code), n in sorted(statuses.items()):
+        lines.append(
+            f'http_responses_total{{method="{_label(method)}",view="{_label(view)}",status="{status_code}"}} {n}'
+        )
+
+    lines += [
+        '# HELP http_slow_requests_total Requests slower than METRICS_SLOW_REQUEST_MS.',
+        '# TYPE http_slow_requests_total counter',
+    ]
+    for (method, view), n in sorted(slow.items()):
+        lines.append(f'http_slow_requests_total{{method="{_label(method)}",view="{_label(view)}"}} {n}')
+
+    return '\n'.join(lines) + '\n'
+
+
+class RequestMetricsMiddleware:
+    """Record the latency and status code of every request against its URL name"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        response = self.get_response(request)
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        match = getattr(request, 'resolver_match', None)
+        # URL names keep label cardinality bounded (ids never end up in labels)
+        view = (match.view_name or match.route) if match else UNMATCHED_VIEW
+
+        registry.observe(
+            request.method, view, response.status_code, duration_ms,
+            getattr(settings, 'METRICS_SLOW_REQUEST_MS', 1000),
+        )
+        try:
+            registry.maybe_flush(getattr(settings, 'METRICS_FLUSH_INTERVAL', 10))
+        except OSError:
+            pass
+        return response
+
+
+class PrometheusRenderer(BaseRenderer):
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data if isinstance(data, str) else json.dumps(data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+@renderer_classes([PrometheusRenderer])
+def metrics_view(request):
+    """Prometheus scrape endpoint (admin only)"""
+    registry.flush()
+    return HttpResponse(
+        render_prometheus(*collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
@@ -0,0 +1,133 @@
+"""
+Perceptual hashes for near-duplicate screenshot detection.
+
+Each screenshot gets a 64-bit difference hash (dHash): the image is reduced
+to 9x8 grey pixels and every bit records whether a pixel is brighter than its
+right-hand neighbour. Re-encoded, resized or slightly cropped copies of the
+same picture land within a few bits of each other, so "possible duplicate"
+means a Hamming distance of at most PHASH_DUPLICATE_DISTANCE.
+
+Lookups use a multi-index hash table kept in the database: the hash is
+split into BANDS 16-bit bands stored in their own indexed columns. Two hashes
+within distance d must agree on at least one band to within d // BANDS bits
+(pigeonhole), so a search is a handful of index probes
+(band_i IN <values within that radius>) followed by an exact Hamming check
+on the few rows they return, independent of table size.
+"""
+
+from itertools import combinations
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Q
+from PIL import Image, ImageOps
+
+HASH_BITS = 64
+BANDS = 4
+BAND_BITS = HASH_BITS // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def max_distance():
+    return _setting('PHASH_DUPLICATE_DISTANCE', 6)
+
+
+def dhash(image):
+    """64-bit difference hash of a PIL image, as an unsigned int"""
+    grey = image.convert('L').resize((9, 8), Image.Resampling.LANCZOS)
+    pixels = np.asarray(grey, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int(np.packbits(bits).view('>u8')[0])
+
+
+def hash_file(source):
+    """dHash of an image file (path or file object), EXIF orientation applied"""
+    with Image.open(source) as original:
+        return dhash(ImageOps.exif_transpose(original))
+
+
+def to_signed(value):
+    """Unsigned 64-bit hash -> value that fits a BigIntegerField"""
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def to_unsigned(value):
+    return value + (1 << HASH_BITS) if value < 0 else value
+
+
+def bands(value):
+    return [(value >> (band * BAND_BITS)) & BAND_MASK for band in range(BANDS)]
+
+
+def hash_columns(prefix, value):
+    """Column values for a hash field named `prefix` and its band columns `prefix_0..3`"""
+    split = bands(value) if value is not None else [None] * BANDS
+    columns = {prefix: to_signed(value) if value is not None else None}
+    columns.update({f'{prefix}_{band}': split[band] for band in range(BANDS)})
+    return columns
+
+
+def distance(a, b):
+    return (to_unsigned(a) ^ to_unsigned(b)).bit_count()
+
+
+def _band_variants(band_value, radius):
+    """Every 16-bit value within `radius` bit flips of band_value"""
+    variants = [band_value]
+    for flips in range(1, radius + 1):
+        for positions in combinations(range(BAND_BITS), flips):
+            flipped = band_value
+            for position in positions:
+                flipped ^= 1 << position
+            variants.append(flipped)
+    return variants
+
+
+def candidate_q(prefix, value, within=None):
+    """Q matching every row that could be within `within` bits of value"""
+    within = max_distance() if within is None else within
+    radius = within // BANDS
+    query = Q()
+    for band, band_value in enumerate(bands(to_unsigned(value))):
+        query |= Q(**{f'{prefix}_{band}__in': _band_variants(band_value, radius)})
+    return query
+
+
+def find_duplicates(queryset, prefix, instances, fields, within=None, limit=None):
+    """
+    {instance pk: [row, ...]} of rows in `queryset` whose hash is within
+    `within` bits of each instance's, closest first. Rows are dicts of
+    `fields` plus 'distance'. One query covers all instances (e.g. a page).
+    """
+    within = max_distance() if within is None else within
+    limit = _setting('PHASH_DUPLICATE_LIMIT', 10) if limit is None else limit
+    hashed = {obj.pk: getattr(obj, prefix) for obj in instances if getattr(obj, prefix) is not None}
+    if not hashed:
+        return {}
+
+    query = Q()
+    for value in hashed.values():
+        query |= candidate_q(prefix, value, within)
+    # Band matches are only candidates: check the full hash before loading any details
+    candidates = list(queryset.filter(query).order_by().values_list('pk', prefix))
+
+    distances = {}
+    for pk, value in hashed.items():
+        close = [
+            (bits, other) for other, other_value in candidates
+            if other != pk and (bits := distance(value, other_value)) <= within
+        ]
+        distances[pk] = sorted(close)[:limit]
+
+    wanted = {other for close in distances.values() for _, other in close}
+    details = {
+        row['pk']: row for row in queryset.filter(pk__in=wanted).order_by().values('pk', *fields)
+    } if wanted else {}
+    return {
+        pk: [{**{field: details[other][field] for field in fields}, 'distance': bits} for bits, other in close]
+        for pk, close in distances.items()
+    }
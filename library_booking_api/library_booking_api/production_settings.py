@@ -27,8 +27,8 @@ CSRF_COOKIE_HTTPONLY = True
 CSRF_COOKIE_SAMESITE = 'Lax'
 
 # Database configuration (use Render's PostgreSQL)
-import dj_database_url
 from decouple import config
+from .db_pool import database_config
 
 # Parse DATABASE_URL with proper error handling and fallback
 try:
@@ -49,14 +49,16 @@ try:
             raise ValueError("DATABASE_URL contains literal 'port' - must be numeric port like 5432")
         
         DATABASES = {
-            'default': dj_database_url.config(
-                default=database_url,
-                conn_max_age=600,
-                conn_health_checks=True,
+            'default': database_config(
+                database_url, pool=DB_POOL, max_connections=DB_MAX_CONNECTIONS,
+                pool_timeout=DB_POOL_TIMEOUT,
                 ssl_require=True,  # Required for Render PostgreSQL
             )
         }
         print("✅ PostgreSQL database configured successfully")
+        pool_options = DATABASES['default'].get('OPTIONS', {}).get('pool')
+        if pool_options:
+            print(f"✅ Connection pool: {pool_options['min_size']}-{pool_options['max_size']} connections per worker")
     else:
         # Fallback to SQLite for local development
         DATABASES = {
@@ -80,6 +82,16 @@ except Exception as e:
         }
     }
 
+# Optional read replica (see settings.py); replaced DATABASES above drops it
+replica_url = config('DATABASE_REPLICA_URL', default='')
+if replica_url.startswith('postgresql://') and DATABASES['default']['ENGINE'] != 'django.db.backends.sqlite3':
+    DATABASES['replica'] = database_config(
+        replica_url, pool=DB_POOL, max_connections=DB_MAX_CONNECTIONS,
+        pool_timeout=DB_POOL_TIMEOUT, ssl_require=True,
+    )
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+    print("✅ PostgreSQL read replica configured")
+
 # Static files configuration for production
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
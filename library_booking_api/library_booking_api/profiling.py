@@ -0,0 +1,234 @@
+"""
+Per-request profiling for staff users.
+
+Add ?_profile=1 (or the X-Profile: 1 header) to any request made as a staff
+user to run it under a profiler. pyinstrument's sampling profiler is used when
+installed, otherwise cProfile. The profile is stored in a bounded on-disk ring
+(PROFILING_DIR, newest PROFILING_MAX_FILES kept) and its id is returned in the
+X-Profile-Id header. ?_profile=text returns the report instead of the response.
+"""
+
+import io
+import json
+import os
+import pstats
+import re
+import tempfile
+import time
+import uuid
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils import timezone
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from .query_budget import QueryRecorder
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+except ImportError:
+    SamplingProfiler = None
+
+PROFILE_PARAM = '_profile'
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_ID_RE = re.compile(r'^[0-9]{8}T[0-9]{12}-[0-9a-f]{6}$')
+TOP_FUNCTIONS = 25
+
+
+def get_profiling_dir():
+    return getattr(settings, 'PROFILING_DIR', None) or os.path.join(
+        tempfile.gettempdir(), 'library_booking_profiles'
+    )
+
+
+def _requested_mode(request):
+    value = request.GET.get(PROFILE_PARAM) or request.META.get(PROFILE_HEADER)
+    if not value or value in ('0', 'false'):
+        return None
+    return 'text' if value == 'text' else 'save'
+
+
+def _is_staff(request):
+    """Session users are already on the request; API clients send a JWT"""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except Exception:
+        return False
+    return bool(result and result[0].is_staff)
+
+
+class _CProfileRunner:
+    name = 'cprofile'
+    extension = 'prof'
+
+    def __init__(self):
+        import cProfile
+        self.profiler = cProfile.Profile()
+
+    def start(self):
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+
+    def save(self, path):
+        self.profiler.dump_stats(path)
+
+    def text(self):
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profiler, stream=stream)
+        stats.sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+        return stream.getvalue()
+
+
+class _SamplingRunner:
+    name = 'pyinstrument'
+    extension = 'html'
+
+    def __init__(self):
+        self.profiler = SamplingProfiler(interval=0.001)
+
+    def start(self):
+        self.profiler.start()
+
+    def stop(self):
+        self.profiler.stop()
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(self.profiler.output_html())
+
+    def text(self):
+        return self.profiler.output_text(unicode=True)
+
+
+def _make_runner():
+    return _SamplingRunner() if SamplingProfiler is not None else _CProfileRunner()
+
+
+def _trim_ring(directory, keep):
+    """Delete the oldest profiles beyond the ring size"""
+    metas = sorted(name for name in os.listdir(directory) if name.endswith('.json'))
+    for name in metas[:-keep] if keep else metas:
+        profile_id = name[:-len('.json')]
+        for stale in os.listdir(directory):
+            if stale.startswith(profile_id):
+                try:
+                    os.unlink(os.path.join(directory, stale))
+                except OSError:
+                    pass
+
+
+class ProfilingMiddleware:
+    """Profile a single request when a staff user asks for it"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = _requested_mode(request)
+        if mode is None or not getattr(settings, 'PROFILING_ENABLED', True) or not _is_staff(request):
+            return self.get_response(request)
+
+        runner = _make_runner()
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        try:
+            runner.start()
+        except ValueError:
+            # Another profiler is already active in this thread
+            return self.get_response(request)
+        try:
+            with recorder.record():
+                response = self.get_response(request)
+        finally:
+            runner.stop()
+        total_ms = (time.perf_counter() - start) * 1000
+
+        meta = {
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status_code': response.status_code,
+            'profiler': runner.name,
+            'total_ms': round(total_ms, 2),
+            'db_ms': round(recorder.duration_ms, 2),
+            'python_ms': round(total_ms - recorder.duration_ms, 2),
+            'query_count': recorder.count,
+            'duplicated_queries': sum(n - 1 for _, n in recorder.duplicates()),
+            'created_at': timezone.now().isoformat(),
+        }
+
+        if mode == 'text':
+            header = '\n'.join(f'{key}: {value}' for key, value in meta.items())
+            return HttpResponse(f'{header}\n\n{runner.text()}', content_type='text/plain; charset=utf-8')
+
+        profile_id = f"{timezone.now().strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:6]}"
+        meta['id'] = profile_id
+        meta['file'] = f'{profile_id}.{runner.extension}'
+
+        directory = get_profiling_dir()
+        try:
+            os.makedirs(directory, exist_ok=True)
+            runner.save(os.path.join(directory, meta['file']))
+            with open(os.path.join(directory, f'{profile_id}.json'), 'w') as handle:
+                json.dump(meta, handle)
+            _trim_ring(directory, getattr(settings, 'PROFILING_MAX_FILES', 50))
+        except OSError:
+            return response
+
+        response['X-Profile-Id'] = profile_id
+        response['X-Profile-Timing'] = (
+            f"total={meta['total_ms']}ms; db={meta['db_ms']}ms; queries={meta['query_count']}"
+        )
+        return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def profile_list(request):
+    """Stored request profiles, newest first (admin only)"""
+    directory = get_profiling_dir()
+    if not os.path.isdir(directory):
+        return Response([])
+
+    profiles = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as handle:
+                meta = json.load(handle)
+        except (OSError, ValueError):
+            continue
+        meta['download_url'] = request.build_absolute_uri(f"/api/profiles/{meta['id']}/")
+        profiles.append(meta)
+    return Response(profiles)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def profile_download(request, profile_id):
+    """Download one stored profile (.prof for cProfile/snakeviz, .html for pyinstrument)"""
+    if not PROFILE_ID_RE.match(profile_id):
+        raise Http404
+    directory = get_profiling_dir()
+    try:
+        with open(os.path.join(directory, f'{profile_id}.json')) as handle:
+            meta = json.load(handle)
+    except (OSError, ValueError):
+        raise Http404
+
+    # Only the profile's own file in the ring, whatever the metadata says
+    name = str(meta.get('file', ''))
+    if os.path.basename(name) != name or not name.startswith(f'{profile_id}.'):
+        raise Http404
+    path = os.path.join(directory, name)
+    if not os.path.exists(path):
+        raise Http404
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=name)
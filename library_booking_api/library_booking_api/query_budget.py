@@ -0,0 +1,167 @@
+"""Per-request SQL query budget: counting, timing and duplicate-shape detection"""
+
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('performance')
+
+# Literals are stripped so "WHERE id = 1" and "WHERE id = 2" count as the same shape
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def query_shape(sql):
+    """Normalise a SQL statement so queries that differ only in parameters compare equal"""
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    """execute_wrapper that records every statement run on the wrapped connections"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - start))
+
+    @contextmanager
+    def record(self, using=None):
+        """Install the recorder on one alias, or on every configured database"""
+        aliases = [using] if using else list(connections)
+        with ExitStack() as stack:
+            for alias in aliases:
+                stack.enter_context(connections[alias].execute_wrapper(self))
+            yield self
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def duration_ms(self):
+        return sum(duration for _, duration in self.queries) * 1000
+
+    def duplicates(self):
+        """Query shapes executed more than once, most frequent first"""
+        shapes = Counter(query_shape(sql) for sql, _ in self.queries)
+        return [(shape, n) for shape, n in shapes.most_common() if n > 1]
+
+
+def query_budget(max_queries):
+    """
+    Set the query budget for a view. Apply it above @api_view so the
+    attribute lands on the function Django actually resolves.
+    """
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+def get_query_budget(request):
+    """Budget for the resolved view: view attribute, then QUERY_BUDGETS by URL name, then the default"""
+    match = getattr(request, 'resolver_match', None)
+    if match is not None:
+        budget = getattr(match.func, 'query_budget', None)
+        if budget is None and hasattr(match.func, 'cls'):
+            budget = getattr(match.func.cls, 'query_budget', None)
+        if budget is not None:
+            return budget
+
+        budgets = getattr(settings, 'QUERY_BUDGETS', {})
+        for name in (match.view_name, match.url_name):
+            if name in budgets:
+                return budgets[name]
+
+    return getattr(settings, 'QUERY_BUDGET_DEFAULT', None)
+
+
+class QueryBudgetMiddleware:
+    """
+    Count queries, database time and duplicated query shapes for every request.
+    Requests over their budget are logged to the "performance" logger; in DEBUG
+    the numbers are also sent back in a Server-Timing header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'QUERY_BUDGET_ENABLED', True):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with recorder.record():
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        # Shape normalisation is regex work per statement, so it only runs when reported
+        budget = get_query_budget(request)
+        over_budget = budget is not None and recorder.count > budget
+        if over_budget or settings.DEBUG:
+            duplicates = recorder.duplicates()
+            duplicate_count = sum(n - 1 for _, n in duplicates)
+
+        if over_budget:
+            match = getattr(request, 'resolver_match', None)
+            logger.warning(
+                'Query budget exceeded: %s %s (%s) ran %d queries, budget %d, %.1fms in db, %d duplicated%s',
+                request.method, request.path, match.view_name if match else '-',
+                recorder.count, budget, recorder.duration_ms, duplicate_count,
+                ''.join(f'\n  {n}x {shape[:200]}' for shape, n in duplicates[:5]),
+            )
+
+        if settings.DEBUG:
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={recorder.duration_ms:.1f};desc="{recorder.count} queries"',
+                f'dup;desc="{duplicate_count} duplicated"',
+                f'total;dur={total_ms:.1f}',
+            ])
+            response['X-Query-Count'] = str(recorder.count)
+
+        return response
+
+
+@contextmanager
+def assert_max_queries(max_queries=None, max_duplicates=None, using=None):
+    """
+    Test helper: fail if the block runs more than max_queries statements or
+    repeats the same query shape more than max_duplicates extra times.
+
+        with assert_max_queries(5, max_duplicates=0):
+            client.get('/api/seats/available-seats/?...')
+    """
+    recorder = QueryRecorder()
+    with recorder.record(using):
+        yield recorder
+
+    problems = []
+    if max_queries is not None and recorder.count > max_queries:
+        problems.append(f'{recorder.count} queries executed, budget is {max_queries}')
+
+    duplicates = recorder.duplicates()
+    duplicate_count = sum(n - 1 for _, n in duplicates)
+    if max_duplicates is not None and duplicate_count > max_duplicates:
+        problems.append(f'{duplicate_count} duplicated queries, allowed {max_duplicates}')
+
+    if problems:
+        detail = '\n'.join(f'  {n}x {shape}' for shape, n in duplicates) or '  (no duplicated shapes)'
+        queries = '\n'.join(f'  {i}. {sql}' for i, (sql, _) in enumerate(recorder.queries, 1))
+        raise AssertionError('; '.join(problems) + f'\nDuplicated shapes:\n{detail}\nQueries:\n{queries}')
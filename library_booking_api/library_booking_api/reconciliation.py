@@ -0,0 +1,282 @@
+"""
+Bank/UPI statement reconciliation.
+
+A statement CSV is read one line at a time and hash-joined against the
+pending payments, which are loaded once into a dict keyed by normalised
+transaction id (the build side is the small one: pending payments, not the
+statement). Lines whose reference is unknown fall back to a fuzzy match on
+amount (exact), date (within PAYMENT_RECONCILE_DATE_TOLERANCE days) and
+account holder name; those are reported for review, never auto-approved.
+
+Only exact matches (same transaction id and amount) are approved, all
+together by the caller's approve() in one transaction. Every other line,
+and every pending payment the statement does not mention, goes into the
+mismatch report.
+"""
+
+import csv
+import io
+import re
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from difflib import SequenceMatcher
+
+from django.conf import settings
+
+MATCHED = 'matched'
+AMOUNT_MISMATCH = 'amount_mismatch'
+POSSIBLE_MATCH = 'possible_match'
+AMBIGUOUS = 'ambiguous'
+DUPLICATE = 'duplicate_in_statement'
+UNMATCHED = 'unmatched'
+INVALID = 'invalid'
+IGNORED = 'ignored'
+NOT_IN_STATEMENT = 'not_in_statement'
+
+# Accepted spellings of each statement column (compared lowercased, spaces as underscores)
+COLUMN_ALIASES = {
+    'transaction_id': ('transaction_id', 'txn_id', 'utr', 'utr_number', 'utr_no', 'reference',
+                       'reference_no', 'ref_no', 'transaction_reference', 'upi_ref_no', 'rrn'),
+    'amount': ('amount', 'credit', 'credit_amount', 'deposit', 'deposit_amount', 'amount_(inr)'),
+    'date': ('date', 'txn_date', 'transaction_date', 'value_date', 'posting_date'),
+    'account_holder_name': ('account_holder_name', 'name', 'payer', 'payer_name', 'remitter',
+                            'remitter_name', 'sender', 'sender_name', 'description', 'narration'),
+}
+
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d-%b-%Y', '%d %b %Y', '%d/%m/%y', '%d-%m-%y', '%d.%m.%Y')
+
+REPORT_FIELDS = [
+    'line', 'result', 'transaction_id', 'amount', 'date', 'account_holder_name',
+    'payment_id', 'payment_amount', 'payment_date', 'payment_account_holder_name', 'detail',
+]
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def normalize_reference(value):
+    return re.sub(r'[\s\-]', '', value or '').upper()
+
+
+def normalize_name(value):
+    return ' '.join(re.sub(r'[^a-z ]', ' ', (value or '').lower()).split())
+
+
+def parse_amount(value):
+    cleaned = re.sub(r'[^\d.\-]', '', value or '')
+    try:
+        return Decimal(cleaned).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        return None
+
+
+def parse_date(value, formats=DATE_FORMATS):
+    """
+    Statement date, trying each format (and the date part of a timestamp).
+    When `formats` is a list, the format that worked moves to the front, so a
+    long statement in one format costs a single strptime() per line.
+    """
+    value = (value or '').strip()
+    for candidate in dict.fromkeys((value, value.split(' ')[0])):
+        for fmt in formats:
+            try:
+                parsed = datetime.strptime(candidate, fmt).date()
+            except ValueError:
+                continue
+            if isinstance(formats, list) and formats[0] != fmt:
+                formats.remove(fmt)
+                formats.insert(0, fmt)
+            return parsed
+    return None
+
+
+def _column_map(header):
+    """Statement column index for each field we understand"""
+    normalized = [(column or '').strip().lower().replace(' ', '_') for column in header]
+    columns = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized:
+                columns[field] = normalized.index(alias)
+                break
+    return columns
+
+
+def read_statement(source):
+    """
+    Yield (line_number, entry, error) for each statement line, streaming from
+    a text or binary file. entry has transaction_id, amount, date and
+    account_holder_name; error is set (and entry partial) when a line can't be used.
+    """
+    if not isinstance(source, io.TextIOBase):
+        source = io.TextIOWrapper(source, encoding='utf-8-sig', newline='')
+    reader = csv.reader(source)
+    header = next(reader, None)
+    if header is None:
+        raise ValueError('Statement is empty')
+    columns = _column_map(header)
+    missing = {'amount', 'date'} - columns.keys()
+    if missing or not ({'transaction_id', 'account_holder_name'} & columns.keys()):
+        raise ValueError(
+            'Statement needs amount and date columns plus a transaction id or name column '
+            f"(found: {', '.join(column for column in header if column)})"
+        )
+
+    def cell(row, field):
+        index = columns.get(field)
+        return row[index].strip() if index is not None and index < len(row) else ''
+
+    formats = list(DATE_FORMATS)
+    for row in reader:
+        if not any(row):
+            continue
+        line_number = reader.line_num
+        entry = {
+            'transaction_id': cell(row, 'transaction_id'),
+            'amount': parse_amount(cell(row, 'amount')),
+            'date': parse_date(cell(row, 'date'), formats),
+            'account_holder_name': cell(row, 'account_holder_name'),
+        }
+        if entry['amount'] is None or entry['date'] is None:
+            yield line_number, entry, 'unreadable amount or date'
+        elif entry['amount'] <= 0:
+            yield line_number, entry, 'not a credit'
+        else:
+            yield line_number, entry, None
+
+
+class Reconciler:
+    """
+    Hash join of statement lines against pending payments.
+
+    `pending` yields (id, transaction_id, amount, date, account_holder_name).
+    """
+
+    def __init__(self, pending, date_tolerance=None, name_threshold=None):
+        self.date_tolerance = timedelta(days=(
+            _setting('PAYMENT_RECONCILE_DATE_TOLERANCE', 2) if date_tolerance is None else date_tolerance
+        ))
+        self.name_threshold = (
+            _setting('PAYMENT_RECONCILE_NAME_THRESHOLD', 0.8) if name_threshold is None else name_threshold
+        )
+        self.payments = {}
+        self.by_reference = {}
+        self.by_amount = {}
+        for payment_id, reference, amount, paid_on, name in pending:
+            self.payments[payment_id] = (reference, amount, paid_on, name, normalize_name(name))
+            if reference:
+                self.by_reference.setdefault(normalize_reference(reference), []).append(payment_id)
+            self.by_amount.setdefault(amount, []).append(payment_id)
+        self.claimed = set()
+        self.seen_references = set()
+
+    def _names_match(self, statement_name, payment_name):
+        if not statement_name or not payment_name:
+            return False
+        # UPI narrations often wrap the payer's name in other text
+        if f' {payment_name} ' in f' {statement_name} ':
+            return True
+        matcher = SequenceMatcher(None, statement_name, payment_name)
+        return matcher.quick_ratio() >= self.name_threshold and matcher.ratio() >= self.name_threshold
+
+    def _fuzzy(self, entry):
+        name = normalize_name(entry['account_holder_name'])
+        return [
+            payment_id for payment_id in self.by_amount.get(entry['amount'], ())
+            if payment_id not in self.claimed
+            and abs(self.payments[payment_id][2] - entry['date']) <= self.date_tolerance
+            and self._names_match(name, self.payments[payment_id][4])
+        ]
+
+    def match(self, entry):
+        """(result, payment_id or None, detail) for one parsed statement line"""
+        reference = normalize_reference(entry['transaction_id'])
+        if reference:
+            if reference in self.seen_references:
+                return DUPLICATE, None, 'transaction id already appeared in this statement'
+            self.seen_references.add(reference)
+
+            candidates = self.by_reference.get(reference, [])
+            if len(candidates) > 1:
+                return AMBIGUOUS, None, f'{len(candidates)} pending payments share this transaction id'
+            if candidates:
+                payment_id = candidates[0]
+                self.claimed.add(payment_id)
+                if self.payments[payment_id][1] != entry['amount']:
+                    return AMOUNT_MISMATCH, payment_id, 'transaction id matches but amount differs'
+                return MATCHED, payment_id, ''
+
+        candidates = self._fuzzy(entry)
+        if len(candidates) == 1:
+            self.claimed.add(candidates[0])
+            return POSSIBLE_MATCH, candidates[0], 'amount, date and name match; transaction id does not'
+        if candidates:
+            return AMBIGUOUS, None, f'{len(candidates)} pending payments match amount, date and name'
+        return UNMATCHED, None, 'no pending payment matches'
+
+    def unclaimed(self):
+        return [payment_id for payment_id in self.payments if payment_id not in self.claimed]
+
+    def report_row(self, line, result, entry, payment_id, detail):
+        row = {
+            'line': line,
+            'result': result,
+            'transaction_id': entry.get('transaction_id', ''),
+            'amount': entry.get('amount'),
+            'date': entry.get('date'),
+            'account_holder_name': entry.get('account_holder_name', ''),
+            'payment_id': payment_id,
+            'detail': detail,
+        }
+        if payment_id is not None:
+            reference, amount, paid_on, name, _ = self.payments[payment_id]
+            row.update(payment_amount=amount, payment_date=paid_on, payment_account_holder_name=name)
+            if not row['transaction_id']:
+                row['transaction_id'] = reference or ''
+        return row
+
+
+def reconcile(source, pending, approve, dry_run=False, date_tolerance=None):
+    """
+    Reconcile a statement file against `pending` (see Reconciler) and approve
+    the exact matches with approve(ids) unless dry_run; approve() returns the
+    ids it actually changed. Returns a dict with 'summary', 'approved' (those
+    ids) and 'report' (every line that is not an exact match, plus pending
+    payments missing from the statement).
+    """
+    reconciler = Reconciler(pending, date_tolerance=date_tolerance)
+    summary = {'lines': 0}
+    matched = []
+    report = []
+
+    for line, entry, error in read_statement(source):
+        summary['lines'] += 1
+        if error:
+            result, payment_id, detail = (IGNORED if error == 'not a credit' else INVALID), None, error
+        else:
+            result, payment_id, detail = reconciler.match(entry)
+        summary[result] = summary.get(result, 0) + 1
+        if result == MATCHED:
+            matched.append(payment_id)
+        elif result != IGNORED:
+            report.append(reconciler.report_row(line, result, entry, payment_id, detail))
+
+    unclaimed = reconciler.unclaimed()
+    for payment_id in unclaimed:
+        report.append(reconciler.report_row('', NOT_IN_STATEMENT, {}, payment_id, 'pending payment not in statement'))
+    summary[NOT_IN_STATEMENT] = len(unclaimed)
+
+    approved = [] if dry_run or not matched else list(approve(matched))
+    summary['approved'] = len(approved)
+    return {'summary': summary, 'approved': approved, 'report': report}
+
+
+def write_report(report, out):
+    """Write report rows as CSV to a text file object"""
+    writer = csv.DictWriter(out, fieldnames=REPORT_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    for row in report:
+        writer.writerow({
+            key: value.isoformat() if isinstance(value, date) else value for key, value in row.items()
+        })
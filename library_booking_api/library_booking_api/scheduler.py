@@ -0,0 +1,77 @@
+"""
+In-process periodic jobs.
+
+Apps register jobs in AppConfig.ready(); wsgi.py starts one daemon thread
+per web process when SCHEDULER_ENABLED is set, as an alternative to running
+the equivalent management commands from cron. Every gunicorn worker runs the
+thread, so each tick is claimed through a cache lease (cache.add) and only
+one process does the work when the cache is shared (Redis/Memcached). With
+a per-process cache every worker runs the job, so jobs must be idempotent.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+_jobs = {}
+_started = False
+_lock = threading.Lock()
+
+
+def register(name, interval, func):
+    """Run func() every `interval` seconds while the scheduler is running"""
+    _jobs[name] = {'interval': interval, 'func': func, 'next_run': 0.0}
+
+
+def _claim(name, interval):
+    # Slightly shorter than the interval so the next tick can claim it again
+    return cache.add(f'scheduler:lease:{name}', os.getpid(), max(1, int(interval * 0.9)))
+
+
+def run_pending(now=None):
+    """Run every job that is due; returns the names that ran in this process"""
+    now = time.monotonic() if now is None else now
+    ran = []
+    for name, job in list(_jobs.items()):
+        if job['next_run'] > now:
+            continue
+        job['next_run'] = now + job['interval']
+        if not _claim(name, job['interval']):
+            continue
+        close_old_connections()
+        try:
+            job['func']()
+            ran.append(name)
+        except Exception:
+            logger.exception('Scheduled job %s failed', name)
+        finally:
+            close_old_connections()
+    return ran
+
+
+def _loop(stop):
+    while not stop.wait(getattr(settings, 'SCHEDULER_TICK_SECONDS', 5)):
+        run_pending()
+
+
+def start():
+    """Start the scheduler thread once per process (no-op unless SCHEDULER_ENABLED)"""
+    global _started
+    if not getattr(settings, 'SCHEDULER_ENABLED', False):
+        return None
+    with _lock:
+        if _started:
+            return None
+        _started = True
+    stop = threading.Event()
+    thread = threading.Thread(target=_loop, args=(stop,), name='scheduler', daemon=True)
+    thread.start()
+    logger.info('Scheduler started with jobs: %s', ', '.join(sorted(_jobs)) or 'none')
+    return stop
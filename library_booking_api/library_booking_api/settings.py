@@ -63,16 +63,21 @@ INSTALLED_APPS = [
     'attendance',
     'payments',
     'notifications',
+    'performance',
 ]
 
 MIDDLEWARE = [
+    'library_booking_api.metrics.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'library_booking_api.query_budget.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'library_booking_api.profiling.ProfilingMiddleware',
+    'library_booking_api.db_router.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -100,15 +105,21 @@ WSGI_APPLICATION = 'library_booking_api.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
-import dj_database_url
+from .db_pool import database_config
+
+# PostgreSQL connections come from psycopg's pool (sized from WEB_CONCURRENCY x
+# GUNICORN_THREADS, capped by DB_MAX_CONNECTIONS) when psycopg[pool] is
+# installed and DB_POOL is on; otherwise persistent connections are reused
+DB_POOL = config('DB_POOL', default=True, cast=bool)
+DB_MAX_CONNECTIONS = config('DB_MAX_CONNECTIONS', default=0, cast=int)
+DB_POOL_TIMEOUT = config('DB_POOL_TIMEOUT', default=10, cast=int)
 
 # Use DATABASE_URL if available (production), otherwise SQLite (development)
 if config('DATABASE_URL', default=''):
     DATABASES = {
-        'default': dj_database_url.config(
-            default=config('DATABASE_URL'),
-            conn_max_age=600,
-            conn_health_checks=True,
+        'default': database_config(
+            config('DATABASE_URL'), pool=DB_POOL, max_connections=DB_MAX_CONNECTIONS,
+            pool_timeout=DB_POOL_TIMEOUT,
         )
     }
 else:
@@ -119,6 +130,19 @@ else:
         }
     }
 
+# Optional read replica: safe GETs and reporting views read from it, writes
+# and users who wrote in the last REPLICA_PIN_SECONDS stay on the primary
+if config('DATABASE_REPLICA_URL', default=''):
+    DATABASES['replica'] = database_config(
+        config('DATABASE_REPLICA_URL'), pool=DB_POOL, max_connections=DB_MAX_CONNECTIONS,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['library_booking_api.db_router.ReplicaRouter']
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=10, cast=int)
+REPLICA_ROUTE_SAFE_GETS = config('REPLICA_ROUTE_SAFE_GETS', default=True, cast=bool)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -259,6 +283,100 @@ MEDIA_ROOT = BASE_DIR / 'media'
 RAZORPAY_KEY_ID = config('RAZORPAY_KEY_ID', default='')
 RAZORPAY_KEY_SECRET = config('RAZORPAY_KEY_SECRET', default='')
 
+# Attendance reports are rendered on a background worker thread (False renders inline).
+# A running report with no progress for ATTENDANCE_REPORT_STALE_MINUTES (or a pending
+# one that old while no report is progressing) was lost to a restart and is regenerated
+# on the next identical request.
+ATTENDANCE_REPORTS_ASYNC = config('ATTENDANCE_REPORTS_ASYNC', default=True, cast=bool)
+ATTENDANCE_REPORT_STALE_MINUTES = config('ATTENDANCE_REPORT_STALE_MINUTES', default=30, cast=int)
+
+# Payment screenshots: uploads above SCREENSHOT_UPLOAD_MAX_MB are rejected; a
+# background worker writes an EXIF-free preview (capped in pixels and bytes)
+# and an admin thumbnail next to the untouched original
+MEDIA_PIPELINE_ASYNC = config('MEDIA_PIPELINE_ASYNC', default=True, cast=bool)
+SCREENSHOT_UPLOAD_MAX_MB = config('SCREENSHOT_UPLOAD_MAX_MB', default=15, cast=int)
+SCREENSHOT_PREVIEW_MAX_PX = config('SCREENSHOT_PREVIEW_MAX_PX', default=1600, cast=int)
+SCREENSHOT_PREVIEW_MAX_BYTES = config('SCREENSHOT_PREVIEW_MAX_BYTES', default=400 * 1024, cast=int)
+SCREENSHOT_THUMBNAIL_PX = config('SCREENSHOT_THUMBNAIL_PX', default=160, cast=int)
+
+# Screenshots within PHASH_DUPLICATE_DISTANCE bits (of 64) of another payment's
+# perceptual hash are listed as possible duplicates (at most PHASH_DUPLICATE_LIMIT)
+PHASH_DUPLICATE_DISTANCE = config('PHASH_DUPLICATE_DISTANCE', default=6, cast=int)
+PHASH_DUPLICATE_LIMIT = config('PHASH_DUPLICATE_LIMIT', default=10, cast=int)
+
+# Statement reconciliation: lines without a known transaction id are suggested
+# (never approved) when amount matches, the date is within the tolerance in days
+# and the payer name is at least this similar (0-1)
+PAYMENT_RECONCILE_DATE_TOLERANCE = config('PAYMENT_RECONCILE_DATE_TOLERANCE', default=2, cast=int)
+PAYMENT_RECONCILE_NAME_THRESHOLD = config('PAYMENT_RECONCILE_NAME_THRESHOLD', default=0.8, cast=float)
+
+# Uploads are stored once per distinct content under MEDIA_ROOT/<MEDIA_BLOB_PREFIX>/ab/cd/<sha256>
+# with reference counts; `manage.py gc_media_blobs` removes blobs nothing references
+MEDIA_DEDUP = config('MEDIA_DEDUP', default=True, cast=bool)
+MEDIA_BLOB_PREFIX = config('MEDIA_BLOB_PREFIX', default='blobs')
+MEDIA_BLOB_GC_GRACE_HOURS = config('MEDIA_BLOB_GC_GRACE_HOURS', default=24, cast=int)
+
+# Booking lifecycle: confirmed bookings not checked in this many minutes after
+# their start become no_show, active ones past their end become completed
+BOOKING_NO_SHOW_GRACE_MINUTES = config('BOOKING_NO_SHOW_GRACE_MINUTES', default=15, cast=int)
+
+# Next-available-slot search (seats/next-available/) looks this many days ahead by default
+SLOT_SEARCH_DAYS = config('SLOT_SEARCH_DAYS', default=7, cast=int)
+
+# Free/busy calendar (seats/free-busy/): default slot length, longest range,
+# server-side cache of computed grids and client max-age, in seconds
+FREE_BUSY_SLOT_MINUTES = config('FREE_BUSY_SLOT_MINUTES', default=60, cast=int)
+FREE_BUSY_MAX_DAYS = config('FREE_BUSY_MAX_DAYS', default=62, cast=int)
+FREE_BUSY_CACHE_SECONDS = config('FREE_BUSY_CACHE_SECONDS', default=300, cast=int)
+FREE_BUSY_MAX_AGE = config('FREE_BUSY_MAX_AGE', default=60, cast=int)
+
+# Seat analytics (seats/analytics/): bookings are read in chunks of this many
+# rows; results are cached per period, for longer once the period has ended
+ANALYTICS_CHUNK_SIZE = config('ANALYTICS_CHUNK_SIZE', default=20000, cast=int)
+ANALYTICS_CACHE_SECONDS = config('ANALYTICS_CACHE_SECONDS', default=900, cast=int)
+ANALYTICS_CLOSED_PERIOD_CACHE_SECONDS = config('ANALYTICS_CLOSED_PERIOD_CACHE_SECONDS', default=86400, cast=int)
+
+# Sweeps run either from cron (manage.py sweep_bookings / sweep_memberships) or,
+# with SCHEDULER_ENABLED, on a background thread in each web process
+SCHEDULER_ENABLED = config('SCHEDULER_ENABLED', default=False, cast=bool)
+BOOKING_SWEEP_INTERVAL = config('BOOKING_SWEEP_INTERVAL', default=60, cast=int)
+MEMBERSHIP_SWEEP_INTERVAL = config('MEMBERSHIP_SWEEP_INTERVAL', default=300, cast=int)
+
+# Membership sweeper (manage.py sweep_memberships, from cron): members are
+# reminded this many days before their membership expires
+MEMBERSHIP_REMINDER_DAYS = config(
+    'MEMBERSHIP_REMINDER_DAYS', default='7,3,1', cast=lambda value: [int(days) for days in value.split(',') if days.strip()],
+)
+
+# Admin dashboard statistics are cached this many seconds (payment saves expire them)
+DASHBOARD_STATS_TTL = config('DASHBOARD_STATS_TTL', default=60, cast=int)
+
+# Query budget middleware: requests running more SQL statements than their
+# budget are logged to the "performance" logger. Per-view budgets are keyed by
+# URL name; views can also set a query_budget attribute.
+QUERY_BUDGET_ENABLED = config('QUERY_BUDGET_ENABLED', default=True, cast=bool)
+QUERY_BUDGET_DEFAULT = config('QUERY_BUDGET_DEFAULT', default=50, cast=int)
+QUERY_BUDGETS = {
+    'available-seats': 10,
+    'my-notifications': 10,
+    'seat-list': 5,
+    'my-bookings': 5,
+    'payment-stats': 3,
+}
+
+# Request metrics (/api/metrics/): per-worker counters are flushed to
+# METRICS_DIR every METRICS_FLUSH_INTERVAL seconds and merged on scrape
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_DIR = config('METRICS_DIR', default='')
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=10, cast=int)
+METRICS_SLOW_REQUEST_MS = config('METRICS_SLOW_REQUEST_MS', default=1000, cast=int)
+
+# Staff-only request profiling (?_profile=1 or X-Profile: 1); the newest
+# PROFILING_MAX_FILES profiles are kept in PROFILING_DIR
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=True, cast=bool)
+PROFILING_DIR = config('PROFILING_DIR', default='')
+PROFILING_MAX_FILES = config('PROFILING_MAX_FILES', default=50, cast=int)
+
 # Email Settings (for notifications)
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
@@ -310,6 +428,11 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': False,
         },
+        'performance': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 
     
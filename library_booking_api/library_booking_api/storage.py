@@ -0,0 +1,244 @@
+"""
+Content-addressed media storage.
+
+The same payment screenshot is often uploaded twice (once with the booking,
+again from the payments screen) and re-uploaded after a rejection. Files
+stored through ContentAddressedStorage are named by the SHA-256 of their
+bytes, sharded as blobs/ab/cd/<sha256>.<ext>, so a duplicate upload is only
+hashed: nothing is written and no disk is used for it.
+
+Every save of a blob takes a reference (payments.MediaBlob.refcount) and
+delete() releases one; the file is removed when the last reference goes.
+Rows deleted without releasing their files (queryset.delete(), cascades) are
+reconciled by the gc_media_blobs command, which recounts references from the
+database and removes orphaned blobs.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _blob_model():
+    from payments.models import MediaBlob
+    return MediaBlob
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that stores each distinct file once, named by its hash"""
+
+    def __init__(self, prefix=None, **kwargs):
+        super().__init__(**kwargs)
+        self.prefix = (prefix or _setting('MEDIA_BLOB_PREFIX', 'blobs')).strip('/')
+
+    def deconstruct(self):
+        path, args, kwargs = super().deconstruct()
+        kwargs['prefix'] = self.prefix
+        return path, args, kwargs
+
+    def digest(self, content):
+        """(sha256 hex digest, size) of a File, read in chunks"""
+        sha256 = hashlib.sha256()
+        size = 0
+        for chunk in content.chunks(HASH_CHUNK_SIZE):
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            sha256.update(chunk)
+            size += len(chunk)
+        return sha256.hexdigest(), size
+
+    def blob_name(self, digest, original_name=''):
+        """blobs/ab/cd/<digest>.<ext>; the extension keeps Content-Type guessing working"""
+        ext = os.path.splitext(original_name)[1].lower()
+        return f'{self.prefix}/{digest[:2]}/{digest[2:4]}/{digest}{ext}'
+
+    def is_blob(self, name):
+        return bool(name) and name.startswith(f'{self.prefix}/')
+
+    def get_available_name(self, name, max_length=None):
+        # The final name comes from the content in _save(); equal names mean equal files
+        return name
+
+    def _write(self, name, content):
+        """Write through a temporary file and rename, so readers never see a partial blob"""
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                for chunk in content.chunks(HASH_CHUNK_SIZE):
+                    tmp.write(chunk.encode() if isinstance(chunk, str) else chunk)
+            # mkstemp creates 0600; apply FILE_UPLOAD_PERMISSIONS like a normal upload
+            os.chmod(tmp_path, self.file_permissions_mode or 0o644)
+            os.replace(tmp_path, full_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _save(self, name, content):
+        digest, size = self.digest(content)
+        name = self.blob_name(digest, name)
+        MediaBlob = _blob_model()
+
+        with transaction.atomic():
+            # The row lock serialises this against a concurrent delete() of the last reference
+            blob, _ = MediaBlob.objects.select_for_update().get_or_create(
+                name=name, defaults={'digest': digest, 'size': size},
+            )
+            if not self.exists(name):
+                self._write(name, content)
+            MediaBlob.objects.filter(pk=blob.pk).update(
+                refcount=F('refcount') + 1, last_referenced_at=timezone.now(),
+            )
+        return name
+
+    def delete(self, name):
+        if not self.is_blob(name):
+            # Files stored before deduplication are owned by a single row
+            return super().delete(name)
+
+        MediaBlob = _blob_model()
+        with transaction.atomic():
+            blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+            if blob is not None and blob.refcount > 1:
+                MediaBlob.objects.filter(pk=blob.pk).update(refcount=F('refcount') - 1)
+                return
+            if blob is not None:
+                blob.delete()
+            # Unlink while still holding the lock, so a concurrent _save() of the same
+            # content re-creates the file instead of counting on the one being removed
+            super().delete(name)
+
+
+_dedup_storage = None
+
+
+def dedup_storage():
+    """
+    Storage for upload fields (used as a callable so migrations don't depend on
+    settings). MEDIA_DEDUP=False falls back to the default storage.
+    """
+    global _dedup_storage
+    if not _setting('MEDIA_DEDUP', True):
+        return default_storage
+    if _dedup_storage is None:
+        _dedup_storage = ContentAddressedStorage()
+    return _dedup_storage
+
+
+def release(field_file_name, storage):
+    """Drop one reference held by a deleted/replaced field value (no-op for other storages)"""
+    if field_file_name and isinstance(storage, ContentAddressedStorage):
+        try:
+            storage.delete(field_file_name)
+        except OSError:
+            logger.exception('Could not release media file %s', field_file_name)
+
+
+def content_addressed_fields():
+    """(model, field) for every FileField stored through ContentAddressedStorage"""
+    from django.apps import apps
+    from django.db.models import FileField
+
+    return [
+        (model, field)
+        for model in apps.get_models()
+        for field in model._meta.concrete_fields
+        if isinstance(field, FileField) and isinstance(field.storage, ContentAddressedStorage)
+    ]
+
+
+def referenced_names():
+    """Counter of blob name -> number of field values that point at it"""
+    refs = Counter()
+    for model, field in content_addressed_fields():
+        names = model._base_manager.exclude(**{f'{field.attname}__isnull': True}).exclude(
+            **{field.attname: ''},
+        ).values_list(field.attname, flat=True)
+        refs.update(name for name in names.iterator(chunk_size=5000) if field.storage.is_blob(name))
+    return refs
+
+
+def collect_garbage(grace_hours=None, dry_run=False):
+    """
+    Reconcile reference counts with the database and remove unreferenced blobs.
+
+    Only blobs not referenced within the last `grace_hours` are touched, so an
+    upload whose row has not committed yet is never counted as an orphan.
+    Returns a dict of counts.
+    """
+    storage = dedup_storage()
+    if not isinstance(storage, ContentAddressedStorage):
+        return {'recounted': 0, 'deleted_blobs': 0, 'deleted_files': 0, 'freed_bytes': 0}
+
+    MediaBlob = _blob_model()
+    grace_hours = _setting('MEDIA_BLOB_GC_GRACE_HOURS', 24) if grace_hours is None else grace_hours
+    cutoff = timezone.now() - timedelta(hours=grace_hours)
+    refs = referenced_names()
+    stats = Counter(recounted=0, deleted_blobs=0, deleted_files=0, freed_bytes=0)
+
+    # Rows and references deleted without releasing (bulk deletes, cascades)
+    known = set()
+    stale = MediaBlob.objects.filter(last_referenced_at__lt=cutoff).values_list('id', 'name', 'refcount', 'size')
+    for blob_id, name, refcount, size in stale.iterator(chunk_size=5000):
+        known.add(name)
+        actual = refs.get(name, 0)
+        if actual == refcount and actual:
+            continue
+        if dry_run:
+            stats['recounted' if actual else 'deleted_blobs'] += 1
+            stats['freed_bytes'] += 0 if actual else size
+            continue
+        with transaction.atomic():
+            # Re-checked under the row lock: a concurrent save bumps last_referenced_at
+            locked = MediaBlob.objects.select_for_update().filter(
+                pk=blob_id, refcount=refcount, last_referenced_at__lt=cutoff,
+            ).exists()
+            if not locked:
+                continue
+            if actual:
+                MediaBlob.objects.filter(pk=blob_id).update(refcount=actual)
+                stats['recounted'] += 1
+            else:
+                MediaBlob.objects.filter(pk=blob_id).delete()
+                FileSystemStorage.delete(storage, name)
+                stats['deleted_blobs'] += 1
+                stats['freed_bytes'] += size
+
+    # Files without a row: uploads rolled back after the write, interrupted temp files
+    root = storage.path(storage.prefix)
+    known.update(MediaBlob.objects.filter(last_referenced_at__gte=cutoff).values_list('name', flat=True))
+    cutoff_ts = time.time() - grace_hours * 3600
+    for directory, _, files in os.walk(root):
+        for filename in files:
+            path = os.path.join(directory, filename)
+            name = os.path.relpath(path, storage.location).replace(os.sep, '/')
+            if name in known or refs.get(name) or os.path.getmtime(path) >= cutoff_ts:
+                continue
+            if MediaBlob.objects.filter(name=name).exists():
+                continue
+            stats['deleted_files'] += 1
+            stats['freed_bytes'] += os.path.getsize(path)
+            if not dry_run:
+                os.remove(path)
+    return dict(stats)
@@ -12,6 +12,9 @@ from accounts.views import UserViewSet
 from seats.views import RoomViewSet, SeatViewSet, SeatBookingViewSet
 from attendance.views import AttendanceSessionViewSet, AttendanceRecordViewSet
 from payments.views import MembershipPlanViewSet, PaymentViewSet
+from .db_pool import readiness_view
+from .metrics import metrics_view
+from .profiling import profile_download, profile_list
 
 # Create a single router to avoid converter conflicts
 router = DefaultRouter()
@@ -40,6 +43,8 @@ def home(request):
             'attendance': '/api/attendance/',
             'payments': '/api/payments/',
             'notifications': '/api/notifications/',
+            'metrics': '/api/metrics/',
+            'readiness': '/api/health/ready/',
             'admin_panel': '/admin/',
         },
         'documentation': '/api/docs/'
@@ -56,15 +61,26 @@ urlpatterns = [
     path('api/auth/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     
-    # API Router (all endpoints in one place to avoid converter conflicts)
-    path('api/', include(router.urls)),
-    
-    # Additional custom endpoints from individual apps
+    # Readiness probe with database/pool health (unauthenticated)
+    path('api/health/ready/', readiness_view, name='readiness'),
+
+    # Prometheus metrics (admin only)
+    path('api/metrics/', metrics_view, name='metrics'),
+
+    # Stored request profiles (admin only)
+    path('api/profiles/', profile_list, name='profile-list'),
+    path('api/profiles/<str:profile_id>/', profile_download, name='profile-download'),
+
+    # Additional custom endpoints from individual apps. These come before the
+    # router so paths like seats/available-seats/ aren't taken as a detail pk
     path('api/accounts/', include('accounts.urls')),
     path('api/seats/', include('seats.urls')),
     path('api/attendance/', include('attendance.urls')),
     path('api/payments/', include('payments.urls')),
     path('api/notifications/', include('notifications.urls')),
+
+    # API Router (all endpoints in one place to avoid converter conflicts)
+    path('api/', include(router.urls)),
 ]
 
 # Development के दौरान Media (Screenshots) और Static फाइल्स सर्व करने के लिए
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'library_booking_api.settings')
 
 application = get_wsgi_application()
+
+# Periodic sweeps (bookings, memberships) when SCHEDULER_ENABLED; see scheduler.py
+from library_booking_api import scheduler  # noqa: E402
+
+scheduler.start()
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usernotification',
+            index=models.Index(fields=['user', 'is_read', '-created_at'], name='user_notif_unread_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_query_shape_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='target_audience',
+            field=models.CharField(choices=[('all', 'All Users'), ('students', 'Students Only'), ('staff', 'Staff Only'), ('direct', 'Selected Users')], default='all', max_length=20),
+        ),
+    ]
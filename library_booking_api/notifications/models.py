@@ -18,6 +18,7 @@ class Notification(models.Model):
         ('all', 'All Users'),
         ('students', 'Students Only'),
         ('staff', 'Staff Only'),
+        ('direct', 'Selected Users'),  # only users given a UserNotification row
     ]
     
     title = models.CharField(max_length=200)
@@ -47,6 +48,8 @@ class Notification(models.Model):
             return True
         elif self.target_audience == 'staff' and user.is_staff:
             return True
+        elif self.target_audience == 'direct':
+            return self.user_notifications.filter(user=user).exists()
         
         return False
 
@@ -65,6 +68,9 @@ class UserNotification(models.Model):
         verbose_name = 'User Notification'
         verbose_name_plural = 'User Notifications'
         unique_together = ['user', 'notification']
+        indexes = [
+            models.Index(fields=['user', 'is_read', '-created_at'], name='user_notif_unread_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.notification.title}"
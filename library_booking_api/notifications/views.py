@@ -23,8 +23,8 @@ class NotificationViewSet(viewsets.ModelViewSet):
         if user.is_staff:
             return Notification.objects.all()
         else:
-            # Non-staff users can only see active notifications
-            return Notification.objects.filter(is_active=True)
+            # Non-staff users can only see active notifications (direct ones via my_notifications)
+            return Notification.objects.filter(is_active=True).exclude(target_audience='direct')
 
 class UserNotificationViewSet(viewsets.ModelViewSet):
     """ViewSet for UserNotification model"""
@@ -47,7 +47,7 @@ class UserNotificationViewSet(viewsets.ModelViewSet):
         
         # Get all active notifications that apply to this user
         applicable_notifications = []
-        for notification in Notification.objects.filter(is_active=True):
+        for notification in Notification.objects.filter(is_active=True).exclude(target_audience='direct'):
             if notification.get_for_user(user):
                 # Get or create UserNotification for this user and notification
                 user_notification, created = UserNotification.objects.get_or_create(
@@ -55,6 +55,13 @@ class UserNotificationViewSet(viewsets.ModelViewSet):
                     notification=notification
                 )
                 applicable_notifications.append(user_notification)
+
+        # Reminders addressed to this user (e.g. membership expiry) already have their rows
+        applicable_notifications.extend(
+            UserNotification.objects.filter(
+                user=user, notification__is_active=True, notification__target_audience='direct',
+            ).select_related('notification')
+        )
         
         # Sort by creation date
         applicable_notifications.sort(key=lambda x: x.created_at, reverse=True)
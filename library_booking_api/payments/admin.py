@@ -18,19 +18,34 @@ class PaymentAdmin(admin.ModelAdmin):
     search_fields = ('transaction_id', 'account_holder_name', 'user__username', 'user__email')
     
     # readonly_fields: जिन्हें एडमिन नहीं बदल सकता
-    readonly_fields = ('created_at', 'screenshot_tag')
+    readonly_fields = ('created_at', 'screenshot_tag', 'screenshot_preview', 'screenshot_thumbnail')
     
     ordering = ('-created_at',)
     list_editable = ('status',) # लिस्ट पेज से ही Approve/Reject करने के लिए
+    actions = ['approve_selected', 'reject_selected']
 
-    # एडमिन पैनल में इमेज दिखाने का फंक्शन
+    # एडमिन पैनल में इमेज दिखाने का फंक्शन (थंबनेल, क्लिक पर ओरिजिनल)
     def screenshot_tag(self, obj):
+        if obj.screenshot_thumbnail:
+            return format_html('<a href="{0}" target="_blank"><img src="{1}" width="50" height="50" style="border:1px solid #d1d1d1; border-radius:5px; object-fit:cover;"/></a>', obj.screenshot.url, obj.screenshot_thumbnail.url)
         if obj.screenshot:
-            return format_html('<a href="{0}" target="_blank"><img src="{0}" width="50" height="50" style="border:1px solid #d1d1d1; border-radius:5px;"/></a>', obj.screenshot.url)
+            # थंबनेल अभी बन रहा है; पूरी इमेज लोड न करें
+            return format_html('<a href="{0}" target="_blank">View proof</a>', obj.screenshot.url)
         return "No Proof"
     
     screenshot_tag.short_description = 'Proof'
 
+    # चुने हुए पेमेंट्स को एक ही UPDATE में Approve/Reject करें
+    @admin.action(description='Approve selected payments')
+    def approve_selected(self, request, queryset):
+        updated = queryset.set_status('paid')
+        self.message_user(request, f'{updated} payment(s) approved')
+
+    @admin.action(description='Reject selected payments')
+    def reject_selected(self, request, queryset):
+        updated = queryset.set_status('rejected')
+        self.message_user(request, f'{updated} payment(s) rejected')
+
     def get_queryset(self, request):
         # डेटाबेस पर लोड कम करने के लिए select_related
         return super().get_queryset(request).select_related('user', 'membership_plan')
\ No newline at end of file
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from library_booking_api import phash
+from payments.models import Payment
+
+
+class Command(BaseCommand):
+    help = 'Compute perceptual hashes for payment screenshots that do not have one yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, help='Hash at most this many distinct screenshot files')
+
+    def handle(self, *args, **options):
+        # Deduplicated uploads share a file name, so each file is decoded once for all its payments
+        pending = Payment.objects.exclude(screenshot='').filter(
+            screenshot_phash__isnull=True,
+        ).order_by('screenshot').values_list('screenshot', flat=True).distinct()
+        if options['limit']:
+            pending = pending[:options['limit']]
+
+        storage = Payment._meta.get_field('screenshot').storage
+        hashed = failed = payments = 0
+        for name in pending.iterator():
+            try:
+                with storage.open(name, 'rb') as source:
+                    value = phash.hash_file(source)
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f'Could not hash {name}: {exc}')
+                continue
+            payments += Payment.objects.filter(screenshot=name, screenshot_phash__isnull=True).update(
+                **phash.hash_columns('screenshot_phash', value),
+            )
+            hashed += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Hashed {hashed} screenshots for {payments} payments ({failed} unreadable)'
+        ))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from library_booking_api import storage
+
+
+class Command(BaseCommand):
+    help = 'Recount references to deduplicated uploads and delete blobs nothing references'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours', type=int,
+            help='Leave blobs referenced within this many hours alone (default: MEDIA_BLOB_GC_GRACE_HOURS)',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be removed without deleting')
+
+    def handle(self, *args, **options):
+        if options['grace_hours'] is not None and options['grace_hours'] < 0:
+            raise CommandError('--grace-hours cannot be negative')
+
+        stats = storage.collect_garbage(options['grace_hours'], dry_run=options['dry_run'])
+        prefix = 'Would remove' if options['dry_run'] else 'Removed'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {stats['deleted_blobs']} orphaned blobs and {stats['deleted_files']} untracked files "
+            f"({stats['freed_bytes'] / 1024 / 1024:.1f} MB); corrected {stats['recounted']} reference counts"
+        ))
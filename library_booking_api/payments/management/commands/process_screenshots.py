@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from library_booking_api import media_pipeline
+from payments.models import Payment
+
+
+class Command(BaseCommand):
+    help = 'Build missing previews and thumbnails for payment screenshots'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, help='Process at most this many payments')
+
+    def handle(self, *args, **options):
+        pending = Payment.objects.exclude(screenshot='').filter(
+            screenshot_thumbnail__isnull=True,
+        ).order_by('id').values_list('id', flat=True)
+        if options['limit']:
+            pending = pending[:options['limit']]
+
+        done = failed = 0
+        for payment_id in pending.iterator():
+            if media_pipeline.process(
+                'payments.Payment', payment_id, 'screenshot', 'screenshot_preview', 'screenshot_thumbnail',
+                'screenshot_phash',
+            ):
+                done += 1
+            else:
+                failed += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {done} screenshots ({failed} skipped or unreadable)'))
@@ -0,0 +1,42 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from library_booking_api.reconciliation import write_report
+from payments.reconcile import reconcile_statement
+
+
+class Command(BaseCommand):
+    help = 'Approve pending payments found in a bank/UPI statement CSV and report everything else'
+
+    def add_arguments(self, parser):
+        parser.add_argument('statement', help='Path to the statement CSV')
+        parser.add_argument('--report', help='Write the mismatch report CSV here (default: stdout)')
+        parser.add_argument('--dry-run', action='store_true', help='Match and report without approving')
+        parser.add_argument('--date-tolerance', type=int, help='Days between statement and payment dates for fuzzy matches')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            with open(options['statement'], 'rb') as source:
+                result = reconcile_statement(
+                    source, dry_run=options['dry_run'], date_tolerance=options['date_tolerance'],
+                )
+        except OSError as exc:
+            raise CommandError(f'Could not read statement: {exc}')
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        if options['report']:
+            with open(options['report'], 'w', newline='', encoding='utf-8') as out:
+                write_report(result['report'], out)
+        else:
+            write_report(result['report'], sys.stdout)
+
+        summary = result['summary']
+        counts = ', '.join(f'{key}={value}' for key, value in summary.items() if key not in ('lines', 'approved'))
+        self.stderr.write(self.style.SUCCESS(
+            f"{summary['lines']} statement lines in {time.perf_counter() - started:.2f}s: "
+            f"{'would approve' if options['dry_run'] else 'approved'} "
+            f"{summary.get('matched', 0) if options['dry_run'] else summary['approved']} payments ({counts})"
+        ))
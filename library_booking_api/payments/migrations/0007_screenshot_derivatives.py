@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0006_query_shape_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='screenshot_preview',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='payment_proofs/previews/'),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='screenshot_thumbnail',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='payment_proofs/thumbs/'),
+        ),
+    ]
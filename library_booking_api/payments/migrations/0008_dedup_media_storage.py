@@ -0,0 +1,47 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:38
+
+import django.utils.timezone
+import library_booking_api.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0007_screenshot_derivatives'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('digest', models.CharField(db_index=True, max_length=64)),
+                ('size', models.PositiveBigIntegerField()),
+                ('refcount', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_referenced_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Media Blob',
+                'verbose_name_plural': 'Media Blobs',
+                'db_table': 'media_blobs',
+            },
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='screenshot',
+            field=models.ImageField(storage=library_booking_api.storage.dedup_storage, upload_to='payment_proofs/'),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='screenshot_preview',
+            field=models.ImageField(blank=True, editable=False, null=True, storage=library_booking_api.storage.dedup_storage, upload_to='payment_proofs/previews/'),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='screenshot_thumbnail',
+            field=models.ImageField(blank=True, editable=False, null=True, storage=library_booking_api.storage.dedup_storage, upload_to='payment_proofs/thumbs/'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0008_dedup_media_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='screenshot_phash',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='screenshot_phash_0',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='screenshot_phash_1',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='screenshot_phash_2',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='screenshot_phash_3',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['screenshot_phash_0'], name='payment_phash_0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['screenshot_phash_1'], name='payment_phash_1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['screenshot_phash_2'], name='payment_phash_2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['screenshot_phash_3'], name='payment_phash_3_idx'),
+        ),
+    ]
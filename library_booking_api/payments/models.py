@@ -1,7 +1,10 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.fields.files import FieldFile
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from django.conf import settings
+from library_booking_api import phash
+from library_booking_api.storage import dedup_storage, release
 
 class MembershipPlan(models.Model):
     """लाइब्रेरी एक्सेस के लिए सदस्यता योजनाएं"""
@@ -53,6 +56,73 @@ class MembershipPlan(models.Model):
         return f"{self.name} - ₹{self.price}"
 
 
+class MediaBlob(models.Model):
+    """Content-addressed upload (see library_booking_api.storage) and how many fields reference it"""
+    name = models.CharField(max_length=255, unique=True)
+    digest = models.CharField(max_length=64, db_index=True)
+    size = models.PositiveBigIntegerField()
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped with every new reference; GC leaves recently referenced blobs alone
+    last_referenced_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'media_blobs'
+        verbose_name = 'Media Blob'
+        verbose_name_plural = 'Media Blobs'
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount} refs)"
+
+
+class PaymentQuerySet(models.QuerySet):
+    def set_status(self, status):
+        """
+        एक ही UPDATE में कई पेमेंट्स का स्टेटस बदलें (bulk approve/reject).
+        Payments that become 'paid' extend their users' memberships as
+        Payment.save() would, with one UPDATE per plan rather than per user.
+        Returns the number of payments whose status changed.
+        """
+        from accounts.models import User
+        from .stats import invalidate_payment_stats
+
+        with transaction.atomic():
+            changing = list(
+                self.exclude(status=status).select_for_update(of=('self',)).order_by('created_at', 'id').values_list(
+                    'id', 'user_id', 'membership_plan__plan_type', 'membership_plan__duration_days',
+                )
+            )
+            if not changing:
+                return 0
+            Payment.objects.filter(id__in=[row[0] for row in changing]).update(status=status)
+
+            if status == 'paid':
+                # Oldest first, so each user's newest payment decides the plan, as sequential saves would
+                latest_plan = {
+                    user_id: (plan_type, duration_days)
+                    for _, user_id, plan_type, duration_days in changing
+                    if plan_type is not None
+                }
+                by_plan = {}
+                for user_id, plan in latest_plan.items():
+                    by_plan.setdefault(plan, []).append(user_id)
+                now = timezone.now()
+                for (plan_type, duration_days), user_ids in by_plan.items():
+                    User.objects.filter(id__in=user_ids).update(
+                        membership_type=plan_type,
+                        membership_expiry=now + timezone.timedelta(days=duration_days),
+                        membership_state='active',
+                    )
+
+        # queryset.update() skips the post_save signal that normally expires these
+        invalidate_payment_stats()
+        return len(changing)
+
+
+# Fields of each match returned by Payment.possible_duplicates()
+DUPLICATE_FIELDS = ['id', 'user_id', 'user__username', 'transaction_id', 'amount', 'status', 'created_at']
+
+
 class Payment(models.Model):
     """सदस्यता और बुकिंग के लिए पेमेंट रिकॉर्ड (Screenshot और Admin Approval के साथ)"""
     
@@ -75,15 +145,39 @@ class Payment(models.Model):
     # प्रूफ और ट्रांजैक्शन विवरण (मैनुअल पेमेंट के लिए)
     transaction_id = models.CharField(max_length=100, unique=True)
     account_holder_name = models.CharField(max_length=100)
-    screenshot = models.ImageField(upload_to='payment_proofs/')
+    # एक जैसी फाइलें (बुकिंग और पेमेंट पेज से दोबारा अपलोड) डिस्क पर एक ही बार रखी जाती हैं
+    screenshot = models.ImageField(upload_to='payment_proofs/', storage=dedup_storage)
+    # छोटे derivatives (EXIF हटाकर, बैकग्राउंड में बनते हैं); ओरिजिनल ऊपर सुरक्षित रहता है
+    screenshot_preview = models.ImageField(
+        upload_to='payment_proofs/previews/', storage=dedup_storage, blank=True, null=True, editable=False,
+    )
+    screenshot_thumbnail = models.ImageField(
+        upload_to='payment_proofs/thumbs/', storage=dedup_storage, blank=True, null=True, editable=False,
+    )
+    # डुप्लिकेट स्क्रीनशॉट पहचानने के लिए perceptual hash (dHash) और उसके 16-bit bands (देखें phash.py)
+    screenshot_phash = models.BigIntegerField(blank=True, null=True, editable=False)
+    screenshot_phash_0 = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    screenshot_phash_1 = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    screenshot_phash_2 = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    screenshot_phash_3 = models.PositiveIntegerField(blank=True, null=True, editable=False)
     
     # तिथियां
     date = models.DateField() # यूजर द्वारा भरी गई पेमेंट की तारीख
     created_at = models.DateTimeField(auto_now_add=True) # सिस्टम एंट्री टाइम
 
+    objects = PaymentQuerySet.as_manager()
+
     class Meta:
         db_table = 'payments'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='payment_created_id_idx'),
+            models.Index(fields=['status', '-created_at'], name='payment_status_created_idx'),
+            models.Index(fields=['screenshot_phash_0'], name='payment_phash_0_idx'),
+            models.Index(fields=['screenshot_phash_1'], name='payment_phash_1_idx'),
+            models.Index(fields=['screenshot_phash_2'], name='payment_phash_2_idx'),
+            models.Index(fields=['screenshot_phash_3'], name='payment_phash_3_idx'),
+        ]
         verbose_name = 'Payment'
         verbose_name_plural = 'Payments'
 
@@ -95,17 +189,81 @@ class Payment(models.Model):
         if self.amount <= 0:
             raise ValidationError("Payment amount must be positive")
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # लोड के समय की वैल्यूज़ याद रखें, ताकि save() बिना SELECT के बदलाव पहचान सके
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def changed_fields(self):
+        """Fields whose value differs from what was loaded (None for unsaved instances)"""
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return None
+        return [
+            field.name for field in self._meta.concrete_fields
+            if field.attname in loaded and getattr(self, field.attname) != loaded[field.attname]
+        ]
+
     def save(self, *args, **kwargs):
-        # अगर एडमिन स्टेटस 'paid' करता है और प्लान जुड़ा है, तो यूजर की एक्सपायरी अपडेट करें
-        if self.pk:
-            old_status = Payment.objects.get(pk=self.pk).status
-            if old_status != 'paid' and self.status == 'paid' and self.membership_plan:
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is not None and not self._state.adding:
+            # सिर्फ बदले हुए कॉलम लिखें
+            if kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+                kwargs['update_fields'] = self.changed_fields()
+
+            # नया स्क्रीनशॉट: पुराने derivatives अब मान्य नहीं
+            if self.screenshot != loaded.get('screenshot', self.screenshot):
+                self.release_files_on_commit(
+                    loaded['screenshot'], loaded.get('screenshot_preview'), loaded.get('screenshot_thumbnail'),
+                )
+                self.screenshot_preview = None
+                self.screenshot_thumbnail = None
+                stale_hash = phash.hash_columns('screenshot_phash', None)
+                for name, value in stale_hash.items():
+                    setattr(self, name, value)
+                if kwargs.get('update_fields') is not None:
+                    kwargs['update_fields'] = [
+                        *kwargs['update_fields'], 'screenshot_preview', 'screenshot_thumbnail', *stale_hash,
+                    ]
+
+            # अगर एडमिन स्टेटस 'paid' करता है और प्लान जुड़ा है, तो यूजर की एक्सपायरी अपडेट करें
+            old_status = loaded['status'] if 'status' in loaded else (
+                Payment.objects.filter(pk=self.pk).values_list('status', flat=True).first()
+            )
+            if old_status != 'paid' and self.status == 'paid' and self.membership_plan_id:
                 self.update_user_membership()
+
         super().save(*args, **kwargs)
 
+        update_fields = kwargs.get('update_fields')
+        saved = [
+            field for field in self._meta.concrete_fields
+            if update_fields is None or field.name in update_fields or field.attname in update_fields
+        ]
+        self._loaded_values = {**(loaded or {}), **{field.attname: self._db_value(field) for field in saved}}
+
+    def _db_value(self, field):
+        # from_db() जैसी वैल्यू: फाइल फील्ड के लिए FieldFile नहीं, उसका नाम
+        value = getattr(self, field.attname)
+        return value.name if isinstance(value, FieldFile) else value
+
+    def possible_duplicates(self, within=None):
+        """Other payments whose screenshot looks like this one, closest first"""
+        return phash.find_duplicates(
+            Payment.objects.all(), 'screenshot_phash', [self], DUPLICATE_FIELDS, within,
+        ).get(self.pk, [])
+
+    def release_files_on_commit(self, *names):
+        """Drop this row's references to replaced/deleted files once the change is committed"""
+        storage = self._meta.get_field('screenshot').storage
+        names = [name for name in names if name]
+        transaction.on_commit(lambda: [release(name, storage) for name in names])
+
     def update_user_membership(self):
         """यूजर की सदस्यता अपडेट करें"""
         user = self.user
         user.membership_type = self.membership_plan.plan_type
         user.membership_expiry = timezone.now() + timezone.timedelta(days=self.membership_plan.duration_days)
-        user.save()
\ No newline at end of file
+        user.save(update_fields=['membership_type', 'membership_expiry'])
\ No newline at end of file
@@ -0,0 +1,39 @@
+"""
+डिफ़ॉल्ट मेंबरशिप प्लान्स (create_plans.py और synthetic data दोनों यहीं से पढ़ते हैं).
+"""
+
+from datetime import time
+from decimal import Decimal
+
+# सभी प्लान्स में सारी सुविधाएँ शामिल हैं
+ALL_AMENITIES = {
+    'includes_personal_charging': True,
+    'includes_led_lighting': True,
+    'includes_ro_water': True,
+    'includes_wifi': True,
+    'includes_ac': True,
+    'includes_comfortable_chairs': True,
+}
+
+
+def _plan(name, plan_type, price, description, start_time, end_time):
+    return {
+        'name': name,
+        'plan_type': plan_type,
+        'price': Decimal(price),
+        'duration_days': 30,
+        'description': description,
+        'start_time': start_time,
+        'end_time': end_time,
+        **ALL_AMENITIES,
+    }
+
+
+DEFAULT_PLANS = [
+    _plan('Morning Shift', 'morning_shift', '300.00', '6 AM - 11 AM access with all amenities', time(6), time(11)),
+    _plan('Afternoon Shift', 'afternoon_shift', '350.00', '11 AM - 4 PM access with all amenities', time(11), time(16)),
+    _plan('Evening Shift', 'evening_shift', '300.00', '4 PM - 9 PM access with all amenities', time(16), time(21)),
+    _plan('Full Day', 'full_day', '500.00', '12 hours access with all amenities', time(6), time(18)),
+    _plan('Night Shift', 'night_shift', '350.00', '7 PM - 6 AM access with all amenities', time(19), time(6)),
+    _plan('24/7 Access', '24_7_access', '800.00', 'Unlimited 24/7 access with all amenities', None, None),
+]
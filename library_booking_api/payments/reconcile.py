@@ -0,0 +1,37 @@
+"""
+बैंक/UPI स्टेटमेंट से पेंडिंग पेमेंट्स का मिलान (see library_booking_api.reconciliation).
+"""
+
+from django.db import transaction
+
+from library_booking_api import reconciliation
+from .models import Payment
+
+# Ids per UPDATE while approving, below every backend's bind-parameter limit
+APPROVE_BATCH_SIZE = 5000
+
+
+def approve_payments(ids):
+    """
+    Approve exact matches in one transaction; memberships are extended as on a
+    manual approve. Returns the ids that were approved.
+    """
+    ids = sorted(ids)
+    approved = []
+    with transaction.atomic():
+        for start in range(0, len(ids), APPROVE_BATCH_SIZE):
+            # status='pending' again: skip anything an admin handled while the statement was read
+            batch = list(Payment.objects.filter(
+                id__in=ids[start:start + APPROVE_BATCH_SIZE], status='pending',
+            ).select_for_update().values_list('id', flat=True))
+            Payment.objects.filter(id__in=batch).set_status('paid')
+            approved += batch
+    return approved
+
+
+def reconcile_statement(source, dry_run=False, date_tolerance=None):
+    """Match a statement file against pending payments; see reconciliation.reconcile()"""
+    pending = Payment.objects.filter(status='pending').order_by().values_list(
+        'id', 'transaction_id', 'amount', 'date', 'account_holder_name',
+    ).iterator(chunk_size=5000)
+    return reconciliation.reconcile(source, pending, approve_payments, dry_run=dry_run, date_tolerance=date_tolerance)
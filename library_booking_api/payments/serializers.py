@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import serializers
 from .models import MembershipPlan, Payment
 
@@ -22,13 +23,17 @@ class PaymentSerializer(serializers.ModelSerializer):
     username = serializers.ReadOnlyField(source='user.username')
     user_email = serializers.ReadOnlyField(source='user.email')
     plan_name = serializers.ReadOnlyField(source='membership_plan.name')
+    screenshot_original = serializers.ImageField(source='screenshot', read_only=True)
+    screenshot_thumbnail = serializers.ImageField(read_only=True)
+    possible_duplicates = serializers.SerializerMethodField()
 
     class Meta:
         model = Payment
         fields = [
             'id', 'user', 'username', 'user_email', 'membership_plan', 'plan_name',
             'description', 'amount', 'method', 'status', 'transaction_id', 
-            'account_holder_name', 'screenshot', 'date', 'created_at'
+            'account_holder_name', 'screenshot', 'screenshot_original', 'screenshot_thumbnail',
+            'possible_duplicates', 'date', 'created_at'
         ]
         # user, status को read_only रखें - user automatically set होगा view में
         read_only_fields = ['id', 'user', 'status', 'created_at']
@@ -39,4 +44,27 @@ class PaymentSerializer(serializers.ModelSerializer):
     def validate_amount(self, value):
         if value <= 0:
             raise serializers.ValidationError("Amount must be a positive number.")
-        return value
\ No newline at end of file
+        return value
+
+    def validate_screenshot(self, value):
+        max_mb = getattr(settings, 'SCREENSHOT_UPLOAD_MAX_MB', 15)
+        if value and value.size > max_mb * 1024 * 1024:
+            raise serializers.ValidationError(f"Screenshot must be smaller than {max_mb} MB.")
+        return value
+
+    def get_possible_duplicates(self, obj):
+        """मिलते-जुलते स्क्रीनशॉट वाले दूसरे पेमेंट्स (सिर्फ एडमिन के लिए)"""
+        request = self.context.get('request')
+        if not request or not request.user.is_staff:
+            return None
+        # List views precompute every row of the page in one query
+        if 'duplicates' in self.context:
+            return self.context['duplicates'].get(obj.pk, [])
+        return obj.possible_duplicates()
+
+    def to_representation(self, instance):
+        # 'screenshot' में हल्का preview भेजें (तैयार होने पर); ओरिजिनल screenshot_original में
+        data = super().to_representation(instance)
+        if instance.screenshot_preview:
+            data['screenshot'] = self.fields['screenshot'].to_representation(instance.screenshot_preview)
+        return data
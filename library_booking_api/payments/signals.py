@@ -0,0 +1,29 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Payment
+from .stats import invalidate_payment_stats
+from library_booking_api import media_pipeline
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+def expire_payment_stats(sender, instance, **kwargs):
+    """Approve/reject (API or admin list_editable) changes the dashboard numbers"""
+    invalidate_payment_stats()
+
+
+@receiver(post_save, sender=Payment)
+def build_screenshot_derivatives(sender, instance, **kwargs):
+    """Preview and thumbnail are generated off the request thread after commit"""
+    if instance.screenshot and not instance.screenshot_thumbnail:
+        media_pipeline.schedule(
+            instance, 'screenshot', 'screenshot_preview', 'screenshot_thumbnail', hash_field='screenshot_phash',
+        )
+
+
+@receiver(post_delete, sender=Payment)
+def release_screenshot_files(sender, instance, **kwargs):
+    """Deduplicated files are shared; the blob is removed with its last reference"""
+    instance.release_files_on_commit(
+        instance.screenshot.name, instance.screenshot_preview.name, instance.screenshot_thumbnail.name,
+    )
@@ -0,0 +1,111 @@
+"""
+एडमिन डैशबोर्ड के लिए पेमेंट स्टेटिस्टिक्स (cached).
+
+Each set is a single conditional-aggregate query. Results are cached for
+DASHBOARD_STATS_TTL seconds under a generation number that
+invalidate_payment_stats() bumps, so one increment expires the summary and
+every cached revenue series together. Payment saves/deletes call it from
+signals; bulk queryset.update() callers must call it themselves.
+
+Cache misses are always computed on the primary: a lagging replica read just
+after an invalidation would otherwise be cached for the whole TTL.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncWeek
+from django.utils import timezone
+
+from .models import Payment
+
+VERSION_KEY = 'dashboard:payments:version'
+PERIODS = ('daily', 'weekly')
+MAX_SERIES_DAYS = 366
+
+
+def _ttl():
+    return getattr(settings, 'DASHBOARD_STATS_TTL', 60)
+
+
+def _version():
+    return cache.get_or_set(VERSION_KEY, 1, None)
+
+
+def invalidate_payment_stats():
+    """Expire every cached payment statistic"""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def _cached(name, compute):
+    key = f'dashboard:payments:{_version()}:{name}'
+    result = cache.get(key)
+    if result is None:
+        result = compute()
+        cache.set(key, result, _ttl())
+    return result
+
+
+def payment_summary():
+    """Totals by status and paid revenue in one query"""
+    def compute():
+        totals = Payment.objects.using(DEFAULT_DB_ALIAS).aggregate(
+            total_payments=Count('id'),
+            paid_payments=Count('id', filter=Q(status='paid')),
+            pending_payments=Count('id', filter=Q(status='pending')),
+            rejected_payments=Count('id', filter=Q(status='rejected')),
+            total_revenue=Sum('amount', filter=Q(status='paid')),
+        )
+        totals['total_revenue'] = totals['total_revenue'] or 0
+        return totals
+
+    return _cached('summary', compute)
+
+
+def revenue_series(period='daily', start_date=None, end_date=None):
+    """
+    Paid revenue per day or per ISO week (Monday) of the payment date, with
+    empty buckets filled in. Defaults to the last 30 days / 12 weeks.
+    """
+    if period not in PERIODS:
+        raise ValueError(f"period must be one of: {', '.join(PERIODS)}")
+
+    end_date = end_date or timezone.localdate()
+    if start_date is None:
+        start_date = end_date - (timedelta(days=29) if period == 'daily' else timedelta(weeks=11))
+    if start_date > end_date:
+        raise ValueError('start_date must be on or before end_date')
+    if (end_date - start_date).days >= MAX_SERIES_DAYS:
+        raise ValueError(f'Date range can be at most {MAX_SERIES_DAYS} days')
+
+    if period == 'weekly':
+        start_date -= timedelta(days=start_date.weekday())
+    step = timedelta(days=1 if period == 'daily' else 7)
+
+    def compute():
+        payments = Payment.objects.using(DEFAULT_DB_ALIAS).filter(status='paid', date__gte=start_date, date__lte=end_date)
+        bucket = F('date') if period == 'daily' else TruncWeek('date')
+        rows = payments.annotate(bucket=bucket).values('bucket').annotate(
+            revenue=Sum('amount'), payments=Count('id'),
+        ).order_by('bucket')
+        by_bucket = {row['bucket']: row for row in rows}
+
+        series = []
+        day = start_date
+        while day <= end_date:
+            row = by_bucket.get(day, {})
+            series.append({
+                'period_start': day.isoformat(),
+                'revenue': row.get('revenue') or 0,
+                'payments': row.get('payments', 0),
+            })
+            day += step
+        return series
+
+    return _cached(f'revenue:{period}:{start_date}:{end_date}', compute)
@@ -0,0 +1,512 @@
+import io
+import os
+import random
+import shutil
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+import numpy as np
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import ExifTags, Image
+
+from accounts.models import User
+from library_booking_api import media_pipeline, phash, reconciliation
+from library_booking_api.storage import collect_garbage, dedup_storage
+from payments.models import MediaBlob, MembershipPlan, Payment
+from payments.reconcile import approve_payments, reconcile_statement
+
+
+def png(color):
+    """A small PNG upload of one colour"""
+    buffer = io.BytesIO()
+    Image.new('RGB', (40, 30), color).save(buffer, 'PNG')
+    return ContentFile(buffer.getvalue(), name='proof.png')
+
+
+def photo(seed, size=(2400, 1200), exif=None):
+    """A JPEG upload that looks like a phone photo: smooth shapes plus sensor noise"""
+    rng = np.random.default_rng(seed)
+    width, height = size
+    coarse = Image.fromarray(rng.integers(0, 256, (max(height // 100, 2), max(width // 100, 2), 3), dtype=np.uint8))
+    pixels = np.asarray(coarse.resize(size, Image.Resampling.BICUBIC), dtype=np.int16)
+    pixels = pixels + rng.integers(-20, 21, pixels.shape)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels.clip(0, 255).astype(np.uint8)).save(
+        buffer, 'JPEG', quality=90, exif=exif.tobytes() if exif is not None else b'',
+    )
+    return ContentFile(buffer.getvalue(), name='proof.jpg')
+
+
+def reencoded(upload, scale, quality):
+    """The same picture resized and saved again, as when a screenshot is re-shared"""
+    upload.seek(0)
+    with Image.open(upload) as image:
+        image = image.resize((int(image.width * scale), int(image.height * scale)), Image.Resampling.BILINEAR)
+        buffer = io.BytesIO()
+        image.save(buffer, 'JPEG', quality=quality)
+    return ContentFile(buffer.getvalue(), name='copy.jpg')
+
+
+def use_temp_media(test):
+    """Point MEDIA_ROOT at a throwaway directory for one test"""
+    media = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, media, ignore_errors=True)
+    override = override_settings(MEDIA_ROOT=media)
+    override.enable()
+    test.addCleanup(override.disable)
+
+
+def statement(*lines):
+    """A bank statement CSV as a binary file"""
+    return io.BytesIO('\n'.join(('Date,UTR,Amount,Name',) + lines).encode())
+
+
+class ReconcileStatementTests(TestCase):
+    """Statement lines against pending payments: what is approved and what is reported"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='member', email='member@example.com', password='pass')
+        self.day = date(2026, 3, 10)
+        self.exact = self.payment('TXN001', '300.00', 'Asha Verma')
+        self.mismatch = self.payment('TXN002', '350.00', 'Asha Verma')
+        self.fuzzy = self.payment('TXN003', '500.00', 'Ravi Kumar')
+        self.missing = self.payment('TXN004', '400.00', 'Meera Jain')
+
+    def payment(self, reference, amount, name, status='pending'):
+        return Payment.objects.create(
+            user=self.user, description='Monthly', amount=Decimal(amount), status=status,
+            transaction_id=reference, account_holder_name=name,
+            screenshot=f'payment_proofs/{reference}.png', date=self.day,
+        )
+
+    def reconcile(self, dry_run=False):
+        day = self.day.strftime('%d/%m/%Y')
+        next_day = (self.day + timedelta(days=1)).strftime('%d/%m/%Y')
+        return reconcile_statement(statement(
+            f'{day},TXN001,300.00,ASHA VERMA',
+            f'{day},TXN002,300.00,Asha Verma',
+            f'{day},TXN-001,300.00,ASHA VERMA',
+            f'{next_day},UPI998877,500.00,UPI/RAVI KUMAR/library fee',
+        ), dry_run=dry_run)
+
+    def rows(self, result, kind):
+        return [row for row in result['report'] if row['result'] == kind]
+
+    def status_of(self, payment):
+        payment.refresh_from_db()
+        return payment.status
+
+    def test_exact_match_is_approved(self):
+        result = self.reconcile()
+        self.assertEqual(result['approved'], [self.exact.id])
+        self.assertEqual(result['summary']['approved'], 1)
+        self.assertEqual(self.status_of(self.exact), 'paid')
+
+    def test_amount_mismatch_is_reported(self):
+        result = self.reconcile()
+        [row] = self.rows(result, reconciliation.AMOUNT_MISMATCH)
+        self.assertEqual(row['payment_id'], self.mismatch.id)
+        self.assertEqual(row['payment_amount'], Decimal('350.00'))
+        self.assertEqual(self.status_of(self.mismatch), 'pending')
+
+    def test_duplicate_reference_in_statement(self):
+        result = self.reconcile()
+        [row] = self.rows(result, reconciliation.DUPLICATE)
+        self.assertEqual(row['line'], 4)
+        self.assertIsNone(row['payment_id'])
+        self.assertEqual(result['approved'], [self.exact.id])
+
+    def test_fuzzy_possible_match_is_not_approved(self):
+        result = self.reconcile()
+        [row] = self.rows(result, reconciliation.POSSIBLE_MATCH)
+        self.assertEqual(row['payment_id'], self.fuzzy.id)
+        self.assertEqual(self.status_of(self.fuzzy), 'pending')
+
+    def test_pending_payment_missing_from_statement(self):
+        result = self.reconcile()
+        [row] = self.rows(result, reconciliation.NOT_IN_STATEMENT)
+        self.assertEqual(row['payment_id'], self.missing.id)
+        self.assertEqual(result['summary'][reconciliation.NOT_IN_STATEMENT], 1)
+
+    def test_dry_run_changes_nothing(self):
+        result = self.reconcile(dry_run=True)
+        self.assertEqual(result['approved'], [])
+        self.assertEqual(result['summary']['approved'], 0)
+        self.assertEqual(result['summary'][reconciliation.MATCHED], 1)
+        self.assertEqual(self.status_of(self.exact), 'pending')
+
+    def test_approved_lists_only_payments_still_pending(self):
+        # Read as pending, then approved by an admin before the statement was applied
+        handled = self.payment('TXN005', '250.00', 'Asha Verma', status='paid')
+        pending = [
+            (payment.id, payment.transaction_id, payment.amount, payment.date, payment.account_holder_name)
+            for payment in (self.exact, handled)
+        ]
+        day = self.day.isoformat()
+        result = reconciliation.reconcile(
+            statement(f'{day},TXN001,300.00,Asha', f'{day},TXN005,250.00,Asha'), pending, approve_payments,
+        )
+        self.assertEqual(result['summary'][reconciliation.MATCHED], 2)
+        self.assertEqual(result['approved'], [self.exact.id])
+        self.assertEqual(result['summary']['approved'], 1)
+
+
+@override_settings(MEDIA_DEDUP=True, MEDIA_PIPELINE_ASYNC=False)
+class PaymentSaveTests(TestCase):
+    """Payment.save(): changed columns only, screenshot replacement and membership extension"""
+
+    def setUp(self):
+        use_temp_media(self)
+        self.user = User.objects.create_user(username='member', email='member@example.com', password='pass')
+        self.other = User.objects.create_user(username='other', email='other@example.com', password='pass')
+        self.monthly = MembershipPlan.objects.create(
+            name='Morning Shift', plan_type='morning_shift', price=Decimal('300.00'), duration_days=30,
+        )
+        self.yearly = MembershipPlan.objects.create(
+            name='1 Year', plan_type='1_year', price=Decimal('3000.00'), duration_days=365,
+        )
+        self.serial = 0
+
+    def payment(self, user=None, plan=None, status='pending', screenshot=None):
+        self.serial += 1
+        return Payment.objects.create(
+            user=user or self.user, membership_plan=plan, description='Membership', amount=Decimal('300.00'),
+            status=status, transaction_id=f'TXN{self.serial}', account_holder_name='Asha Verma',
+            screenshot=screenshot or f'payment_proofs/{self.serial}.png', date=date(2026, 3, 10),
+        )
+
+    def test_update_fields_are_the_changed_columns(self):
+        payment = Payment.objects.get(pk=self.payment().pk)
+        payment.description = 'Renewal'
+        with CaptureQueriesContext(connection) as queries:
+            payment.save()
+        [update] = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "payments"')]
+        self.assertIn('"description"', update)
+        self.assertNotIn('"amount"', update)
+
+        # Nothing changed: nothing to write
+        with CaptureQueriesContext(connection) as queries:
+            payment.save()
+        self.assertFalse([query for query in queries if query['sql'].startswith('UPDATE "payments"')])
+
+    def test_changed_screenshot_releases_the_old_files(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            created = self.payment(screenshot=png('red'))
+        payment = Payment.objects.get(pk=created.pk)
+        old = [payment.screenshot.name, payment.screenshot_preview.name, payment.screenshot_thumbnail.name]
+        self.assertTrue(all(old))
+
+        payment.screenshot = png('blue')
+        with self.captureOnCommitCallbacks(execute=True):
+            payment.save()
+        self.assertFalse(MediaBlob.objects.filter(name__in=old).exists())
+        payment.refresh_from_db()
+        self.assertNotIn(payment.screenshot_thumbnail.name, old)
+
+    def test_screenshot_replaced_on_a_new_instance(self):
+        # _loaded_values of a just-created row hold file names, as from_db() would
+        payment = self.payment(screenshot=png('red'))
+        old = payment.screenshot.name
+        payment.screenshot = png('blue')
+        with self.captureOnCommitCallbacks(execute=True):
+            payment.save()
+        self.assertFalse(MediaBlob.objects.filter(name=old).exists())
+
+    def test_paid_status_extends_membership(self):
+        payment = Payment.objects.get(pk=self.payment(plan=self.monthly).pk)
+        payment.status = 'paid'
+        payment.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.membership_type, 'morning_shift')
+        self.assertAlmostEqual(
+            self.user.membership_expiry, timezone.now() + timedelta(days=30), delta=timedelta(minutes=1),
+        )
+
+        # Saving an already paid payment again does not extend it further
+        User.objects.filter(pk=self.user.pk).update(membership_expiry=None)
+        payment.description = 'Edited'
+        payment.save()
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.membership_expiry)
+
+    def test_set_status_uses_each_users_newest_plan(self):
+        self.payment(plan=self.yearly)
+        self.payment(plan=self.monthly)
+        self.payment(user=self.other, plan=self.yearly)
+        self.payment(plan=None, status='paid')
+
+        self.assertEqual(Payment.objects.all().set_status('paid'), 3)
+        self.user.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual(self.user.membership_type, 'morning_shift')
+        self.assertAlmostEqual(
+            self.user.membership_expiry, timezone.now() + timedelta(days=30), delta=timedelta(minutes=1),
+        )
+        self.assertEqual(self.other.membership_type, '1_year')
+        self.assertEqual(self.other.membership_state, 'active')
+
+
+@override_settings(MEDIA_DEDUP=True, MEDIA_PIPELINE_ASYNC=False)
+class DedupStorageTests(TestCase):
+    """Content-addressed screenshots: one file per content, reference counted"""
+
+    def setUp(self):
+        use_temp_media(self)
+        self.user = User.objects.create_user(username='member', email='member@example.com', password='pass')
+        self.serial = 0
+
+    def payment(self, upload):
+        self.serial += 1
+        return Payment.objects.create(
+            user=self.user, description='Monthly', amount=Decimal('300.00'), transaction_id=f'TXN{self.serial}',
+            account_holder_name='Asha Verma', screenshot=upload, date=date(2026, 3, 10),
+        )
+
+    def blob(self, name):
+        return MediaBlob.objects.filter(name=name).first()
+
+    def exists(self, name):
+        return os.path.exists(dedup_storage().path(name))
+
+    def age(self, name, hours):
+        MediaBlob.objects.filter(name=name).update(last_referenced_at=timezone.now() - timedelta(hours=hours))
+
+    def test_duplicate_upload_shares_one_blob(self):
+        first = self.payment(png('red'))
+        second = self.payment(png('red'))
+        self.assertEqual(first.screenshot.name, second.screenshot.name)
+        self.assertTrue(first.screenshot.name.startswith('blobs/'))
+        self.assertEqual(self.blob(first.screenshot.name).refcount, 2)
+        self.assertEqual(MediaBlob.objects.count(), 1)
+
+    def test_replace_and_delete_release_references(self):
+        first = self.payment(png('red'))
+        second = self.payment(png('red'))
+        shared = first.screenshot.name
+
+        first.screenshot = png('blue')
+        with self.captureOnCommitCallbacks(execute=True):
+            first.save()
+        self.assertEqual(self.blob(shared).refcount, 1)
+        self.assertEqual(self.blob(first.screenshot.name).refcount, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertIsNone(self.blob(first.screenshot.name))
+        self.assertEqual(self.blob(shared).refcount, 1)
+        self.assertTrue(self.exists(second.screenshot.name))
+
+    def test_last_release_unlinks_file(self):
+        payment = self.payment(png('red'))
+        name = payment.screenshot.name
+        self.assertTrue(self.exists(name))
+        with self.captureOnCommitCallbacks(execute=True):
+            payment.delete()
+        self.assertIsNone(self.blob(name))
+        self.assertFalse(self.exists(name))
+
+    def test_gc_recounts_after_queryset_delete(self):
+        first = self.payment(png('red'))
+        second = self.payment(png('red'))
+        name = first.screenshot.name
+
+        # The post-commit releases are dropped, as when a bulk delete skips them
+        Payment.objects.filter(pk=first.pk).delete()
+        self.age(name, 48)
+        self.assertEqual(collect_garbage()['recounted'], 1)
+        self.assertEqual(self.blob(name).refcount, 1)
+
+        Payment.objects.filter(pk=second.pk).delete()
+        self.age(name, 48)
+        self.assertEqual(collect_garbage()['deleted_blobs'], 1)
+        self.assertIsNone(self.blob(name))
+        self.assertFalse(self.exists(name))
+
+    def test_grace_period_protects_fresh_uploads(self):
+        payment = self.payment(png('red'))
+        name = payment.screenshot.name
+        Payment.objects.filter(pk=payment.pk).delete()
+        # A file written before its row existed (upload still in flight)
+        orphan = dedup_storage().path('blobs/00/00/in-flight.png')
+        os.makedirs(os.path.dirname(orphan))
+        with open(orphan, 'wb') as handle:
+            handle.write(b'partial')
+
+        stats = collect_garbage(grace_hours=24)
+        self.assertEqual((stats['deleted_blobs'], stats['deleted_files']), (0, 0))
+        self.assertEqual(self.blob(name).refcount, 1)
+        self.assertTrue(self.exists(name))
+        self.assertTrue(os.path.exists(orphan))
+
+
+@override_settings(
+    MEDIA_DEDUP=True, MEDIA_PIPELINE_ASYNC=False,
+    SCREENSHOT_PREVIEW_MAX_PX=1600, SCREENSHOT_PREVIEW_MAX_BYTES=64 * 1024, SCREENSHOT_THUMBNAIL_PX=160,
+)
+class ScreenshotPipelineTests(TestCase):
+    """Preview and thumbnail: oriented, bounded in size, stripped of metadata"""
+
+    def setUp(self):
+        use_temp_media(self)
+        self.user = User.objects.create_user(username='member', email='member@example.com', password='pass')
+
+    def payment(self, upload):
+        return Payment.objects.create(
+            user=self.user, description='Monthly', amount=Decimal('300.00'), transaction_id='TXN1',
+            account_holder_name='Asha Verma', screenshot=upload, date=date(2026, 3, 10),
+        )
+
+    def camera_exif(self):
+        exif = Image.Exif()
+        exif[ExifTags.Base.Orientation] = 6  # stored landscape, shown rotated to portrait
+        exif[ExifTags.Base.Make] = 'Phone'
+        exif[ExifTags.IFD.GPSInfo] = {1: 'N', 2: (28.0, 36.0, 0.0), 3: 'E', 4: (77.0, 12.0, 0.0)}
+        return exif
+
+    def open(self, field):
+        field.open('rb')
+        try:
+            image = Image.open(io.BytesIO(field.read()))
+            image.load()
+        finally:
+            field.close()
+        return image
+
+    def test_derivatives_are_oriented_bounded_and_stripped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            created = self.payment(photo(1, exif=self.camera_exif()))
+        payment = Payment.objects.get(pk=created.pk)
+        self.assertIsNotNone(payment.screenshot_phash)
+
+        original = self.open(payment.screenshot)
+        self.assertEqual(original.getexif().get(ExifTags.Base.Orientation), 6)
+        self.assertTrue(original.getexif().get_ifd(ExifTags.IFD.GPSInfo))
+
+        preview = self.open(payment.screenshot_preview)
+        self.assertEqual(preview.size, (800, 1600))
+        self.assertLessEqual(payment.screenshot_preview.size, 64 * 1024)
+
+        thumbnail = self.open(payment.screenshot_thumbnail)
+        self.assertEqual(thumbnail.size, (80, 160))
+
+        for image in (preview, thumbnail):
+            exif = image.getexif()
+            self.assertNotIn(ExifTags.Base.Orientation, exif)
+            self.assertFalse(exif.get_ifd(ExifTags.IFD.GPSInfo))
+            self.assertFalse(image.info.get('exif'))
+
+    def test_small_upload_is_not_enlarged(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            created = self.payment(photo(2, size=(120, 90)))
+        payment = Payment.objects.get(pk=created.pk)
+        self.assertEqual(self.open(payment.screenshot_preview).size, (120, 90))
+        self.assertEqual(self.open(payment.screenshot_thumbnail).size, (120, 90))
+
+    def test_nothing_attached_if_original_replaced_mid_run(self):
+        payment = self.payment(photo(3))
+        blobs = set(MediaBlob.objects.values_list('name', flat=True))
+        build = media_pipeline.make_derivatives
+
+        def replace_then_build(source):
+            # A new upload lands while the worker is still decoding the old one
+            Payment.objects.filter(pk=payment.pk).update(screenshot='payment_proofs/replaced.jpg')
+            return build(source)
+
+        with patch.object(media_pipeline, 'make_derivatives', replace_then_build):
+            attached = media_pipeline.process(
+                'payments.Payment', payment.pk, 'screenshot', 'screenshot_preview', 'screenshot_thumbnail',
+                hash_field='screenshot_phash',
+            )
+        self.assertFalse(attached)
+
+        payment.refresh_from_db()
+        self.assertEqual(payment.screenshot.name, 'payment_proofs/replaced.jpg')
+        self.assertFalse(payment.screenshot_preview)
+        self.assertFalse(payment.screenshot_thumbnail)
+        self.assertIsNone(payment.screenshot_phash)
+        # The derivatives written for the old original were released again
+        self.assertEqual(set(MediaBlob.objects.values_list('name', flat=True)), blobs)
+
+
+@override_settings(MEDIA_DEDUP=True, MEDIA_PIPELINE_ASYNC=False, PHASH_DUPLICATE_DISTANCE=6)
+class ScreenshotDuplicateTests(TestCase):
+    """Perceptual hashes: copies are found, unrelated images are not, the band index misses nothing"""
+
+    def setUp(self):
+        use_temp_media(self)
+        self.user = User.objects.create_user(username='member', email='member@example.com', password='pass')
+        self.serial = 0
+
+    def payment(self, upload=None, image_hash=None):
+        self.serial += 1
+        payment = Payment.objects.create(
+            user=self.user, description='Monthly', amount=Decimal('300.00'), transaction_id=f'TXN{self.serial}',
+            account_holder_name='Asha Verma', screenshot=upload or f'payment_proofs/{self.serial}.jpg',
+            date=date(2026, 3, 10),
+        )
+        if image_hash is not None:
+            Payment.objects.filter(pk=payment.pk).update(**phash.hash_columns('screenshot_phash', image_hash))
+        return Payment.objects.get(pk=payment.pk)
+
+    def flip(self, value, positions):
+        for position in positions:
+            value ^= 1 << position
+        return value
+
+    def test_reencoded_copy_is_a_possible_duplicate(self):
+        original = photo(1)
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self.payment(original)
+            copies = [
+                self.payment(reencoded(original, 0.5, 60)),
+                self.payment(reencoded(original, 0.25, 40)),
+            ]
+            unrelated = self.payment(photo(2))
+        first.refresh_from_db()
+
+        for copy in copies:
+            copy.refresh_from_db()
+            self.assertLessEqual(phash.distance(first.screenshot_phash, copy.screenshot_phash), 6)
+        unrelated.refresh_from_db()
+        self.assertGreater(phash.distance(first.screenshot_phash, unrelated.screenshot_phash), 6)
+
+        duplicates = first.possible_duplicates()
+        self.assertEqual(sorted(row['id'] for row in duplicates), sorted(copy.pk for copy in copies))
+        self.assertEqual([row['distance'] for row in duplicates], sorted(row['distance'] for row in duplicates))
+        self.assertEqual(duplicates[0]['user__username'], 'member')
+
+    def test_band_prefilter_has_no_false_negatives(self):
+        rng = random.Random(42)
+        for _ in range(2000):
+            value = rng.getrandbits(phash.HASH_BITS)
+            other = self.flip(value, rng.sample(range(phash.HASH_BITS), rng.randint(0, 6)))
+            probes = dict(phash.candidate_q('h', phash.to_signed(value), within=6).children)
+            self.assertTrue(any(
+                band in probes[f'h_{index}__in'] for index, band in enumerate(phash.bands(other))
+            ), f'{value:016x} {other:016x}')
+
+    def test_find_duplicates_within_distance(self):
+        value = 0x8badf00ddeadbeef
+        # Flips spread over the bands as evenly as possible: the worst case for the band index
+        expected = {
+            self.payment(image_hash=self.flip(value, positions)).pk: len(positions)
+            for positions in (
+                (), (3,), (0, 16), (1, 17, 33), (2, 18, 34, 50), (4, 5, 20, 36, 52), (6, 7, 21, 22, 37, 53),
+            )
+        }
+        for positions in ((8, 9, 24, 25, 40, 56, 57), (10, 11, 26, 27, 42, 43, 58, 59)):
+            self.payment(image_hash=self.flip(value, positions))
+        source = self.payment(image_hash=value)
+        # Negative signed values round-trip through the BigIntegerField
+        self.assertLess(source.screenshot_phash, 0)
+
+        found = {row['id']: row['distance'] for row in source.possible_duplicates()}
+        self.assertEqual(found, expected)
+        closest = phash.find_duplicates(Payment.objects.all(), 'screenshot_phash', [source], ['id'], limit=3)
+        self.assertEqual([row['distance'] for row in closest[source.pk]], [0, 1, 2])
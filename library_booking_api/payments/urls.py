@@ -4,4 +4,5 @@ from . import views
 # Only custom endpoints, ViewSets are handled by main router
 urlpatterns = [
     path('stats/', views.payment_stats, name='payment-stats'),
+    path('stats/revenue/', views.revenue_series, name='payment-revenue-series'),
 ]
\ No newline at end of file
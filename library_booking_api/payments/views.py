@@ -2,10 +2,18 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
-from django.db.models import Sum
-from .models import MembershipPlan, Payment
+from datetime import date
+import csv
+from django.http import HttpResponse
+from .models import DUPLICATE_FIELDS, MembershipPlan, Payment
 from .serializers import MembershipPlanSerializer, PaymentSerializer
+from . import stats
+from .reconcile import reconcile_statement
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from library_booking_api import phash
+from library_booking_api.exports import date_range_filters, get_export_format, stream_export
+from library_booking_api.reconciliation import write_report
+from library_booking_api.pagination import CreatedAtCursorPagination
 
 class MembershipPlanViewSet(viewsets.ModelViewSet):
     """सदस्यता योजनाओं के लिए ViewSet"""
@@ -19,7 +27,7 @@ class PaymentViewSet(viewsets.ModelViewSet):
     authentication_classes = [JWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = (MultiPartParser, FormParser, JSONParser) # Support both file upload and JSON
-    pagination_class = None  # Disable pagination to return list directly
+    pagination_class = CreatedAtCursorPagination  # (created_at, id) keyset pages, count only on request
 
     def get_queryset(self):
         # एडमिन सब देख सकता है, यूजर सिर्फ अपना डेटा
@@ -28,6 +36,17 @@ class PaymentViewSet(viewsets.ModelViewSet):
             return Payment.objects.all().order_by('-created_at')
         return Payment.objects.filter(user=user).order_by('-created_at')
 
+    def get_serializer(self, *args, **kwargs):
+        # एडमिन लिस्ट: पूरे पेज के possible duplicates एक ही query में
+        if kwargs.get('many') and args and self.request.user.is_staff:
+            kwargs['context'] = {
+                **self.get_serializer_context(),
+                'duplicates': phash.find_duplicates(
+                    Payment.objects.all(), 'screenshot_phash', args[0], DUPLICATE_FIELDS,
+                ),
+            }
+        return super().get_serializer(*args, **kwargs)
+
     def perform_create(self, serializer):
         # सेव करते समय लॉगिन यूजर को ऑटोमैटिक जोड़ें
         serializer.save(user=self.request.user)
@@ -37,31 +56,116 @@ class PaymentViewSet(viewsets.ModelViewSet):
         """Approve a payment (admin only)"""
         payment = self.get_object()
         payment.status = 'paid'
-        payment.save()
-        return Response({'message': 'Payment approved successfully'})
+        payment.save(update_fields=['status'])
+        response = {'message': 'Payment approved successfully'}
+        if request.user.is_staff:
+            # Approval still goes through; the admin sees any reused screenshot in the response
+            response['possible_duplicates'] = payment.possible_duplicates()
+        return Response(response)
 
     @action(detail=True, methods=['post'])
     def reject(self, request, pk=None):
         """Reject a payment (admin only)"""
         payment = self.get_object()
         payment.status = 'rejected'
-        payment.save()
+        payment.save(update_fields=['status'])
         return Response({'message': 'Payment rejected successfully'})
 
+    @action(detail=False, methods=['post'], url_path='bulk-approve', permission_classes=[permissions.IsAdminUser])
+    def bulk_approve(self, request):
+        """Approve many payments in one UPDATE ({"ids": [...]})"""
+        return self._bulk_set_status(request, 'paid')
+
+    @action(detail=False, methods=['post'], url_path='bulk-reject', permission_classes=[permissions.IsAdminUser])
+    def bulk_reject(self, request):
+        """Reject many payments in one UPDATE ({"ids": [...]})"""
+        return self._bulk_set_status(request, 'rejected')
+
+    def _bulk_set_status(self, request, new_status):
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not ids or not all(isinstance(pk, int) for pk in ids):
+            return Response({'error': 'ids must be a non-empty list of payment ids'}, status=status.HTTP_400_BAD_REQUEST)
+
+        updated = Payment.objects.filter(id__in=ids).set_status(new_status)
+        return Response({'updated': updated, 'status': new_status})
+
+    @action(detail=False, methods=['post'], permission_classes=[permissions.IsAdminUser])
+    def reconcile(self, request):
+        """
+        बैंक स्टेटमेंट CSV ('statement' फाइल) से पेंडिंग पेमेंट्स मिलाएं (admin only).
+        Exact transaction id + amount matches are approved; ?dry_run=true only
+        reports. ?file_format=csv returns the mismatch report as a CSV download.
+        """
+        statement = request.FILES.get('statement')
+        if not statement:
+            return Response({'error': 'Upload the statement CSV as "statement"'}, status=status.HTTP_400_BAD_REQUEST)
+
+        dry_run = str(request.query_params.get('dry_run', request.data.get('dry_run', ''))).lower() in ('1', 'true', 'yes')
+        try:
+            tolerance = request.query_params.get('date_tolerance')
+            result = reconcile_statement(
+                statement.open('rb'), dry_run=dry_run, date_tolerance=int(tolerance) if tolerance else None,
+            )
+        except (ValueError, UnicodeDecodeError, csv.Error) as exc:
+            return Response({'error': f'Could not read statement: {exc}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.query_params.get('file_format') == 'csv':
+            response = HttpResponse(content_type='text/csv')
+            response['Content-Disposition'] = 'attachment; filename="reconciliation_report.csv"'
+            write_report(result['report'], response)
+            return response
+        return Response({'dry_run': dry_run, **result})
+
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAdminUser])
+    def export(self, request):
+        """पेमेंट्स को CSV या NDJSON में स्ट्रीम करें (admin only)"""
+        file_format = get_export_format(request)
+        if not file_format:
+            return Response(
+                {'error': 'file_format must be csv or ndjson'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            payments = self.get_queryset().filter(**date_range_filters(request, 'created_at'))
+        except ValueError:
+            return Response(
+                {'error': 'Dates must be in YYYY-MM-DD format'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        status_filter = request.query_params.get('status')
+        if status_filter:
+            payments = payments.filter(status=status_filter)
+
+        fields = [
+            'id', 'user_id', 'user__email', 'membership_plan_id', 'membership_plan__name',
+            'description', 'amount', 'method', 'status', 'transaction_id',
+            'account_holder_name', 'date', 'created_at',
+        ]
+        return stream_export(payments.order_by('id'), fields, file_format, 'payments')
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAdminUser])
 def payment_stats(request):
     """एडमिन डैशबोर्ड के लिए स्टेटिस्टिक्स"""
-    total_payments = Payment.objects.count()
-    paid_payments = Payment.objects.filter(status='paid').count()
-    pending_payments = Payment.objects.filter(status='pending').count()
-    total_revenue = Payment.objects.filter(status='paid').aggregate(
-        total=Sum('amount')
-    )['total'] or 0
-
-    return Response({
-        'total_payments': total_payments,
-        'paid_payments': paid_payments,
-        'pending_payments': pending_payments,
-        'total_revenue': total_revenue
-    })
\ No newline at end of file
+    return Response(stats.payment_summary())
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def revenue_series(request):
+    """चार्ट के लिए दैनिक/साप्ताहिक रेवेन्यू (?period=daily|weekly&start_date=&end_date=)"""
+    period = request.query_params.get('period', 'daily')
+    try:
+        start_date = request.query_params.get('start_date')
+        end_date = request.query_params.get('end_date')
+        series = stats.revenue_series(
+            period,
+            start_date=date.fromisoformat(start_date) if start_date else None,
+            end_date=date.fromisoformat(end_date) if end_date else None,
+        )
+    except ValueError as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({'period': period, 'series': series})
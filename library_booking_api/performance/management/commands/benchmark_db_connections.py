@@ -0,0 +1,63 @@
+import json
+import platform
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from library_booking_api.benchmarks import connection_modes, run_connection_benchmark
+
+
+class Command(BaseCommand):
+    help = 'Compare connect-per-request, persistent and pooled database connections under threaded load'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Database alias to benchmark (default: default)')
+        parser.add_argument('--requests', type=int, default=500, help='Requests per thread (default: 500)')
+        parser.add_argument('--threads', type=int, default=4, help='Concurrent threads, like gunicorn --threads (default: 4)')
+        parser.add_argument(
+            '--mode',
+            action='append',
+            choices=['connect_per_request', 'persistent', 'pooled'],
+            help='Only run this connection mode (repeatable)',
+        )
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        if alias not in connections:
+            raise CommandError(f"Unknown database alias '{alias}'")
+        if options['requests'] < 1 or options['threads'] < 1:
+            raise CommandError('--requests and --threads must be at least 1')
+
+        available = connection_modes(alias)
+        modes = options['mode'] or available
+        unavailable = [mode for mode in modes if mode not in available]
+        if unavailable:
+            raise CommandError(
+                f"{', '.join(unavailable)} not available here: pooling needs PostgreSQL and psycopg[pool]"
+            )
+        if connections[alias].vendor == 'sqlite':
+            self.stderr.write('SQLite connects in-process, so connection costs here understate PostgreSQL')
+
+        results = run_connection_benchmark(
+            alias, modes=modes, requests=options['requests'], threads=options['threads'],
+            log=lambda message: self.stderr.write(message),
+        )
+
+        report = {
+            'meta': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connections[alias].vendor,
+                'requests_per_thread': options['requests'],
+                'threads': options['threads'],
+            },
+            'modes': results,
+        }
+        payload = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(payload + '\n')
+            self.stderr.write(f"Connection benchmark written to {options['output']}")
+        else:
+            self.stdout.write(payload)
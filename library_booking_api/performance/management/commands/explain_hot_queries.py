@@ -0,0 +1,115 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from accounts.models import User
+from attendance.models import AttendanceRecord, DailyAttendanceSummary
+from library_booking_api.pagination import CreatedAtCursorPagination
+from notifications.models import UserNotification
+from payments.models import Payment
+from seats.models import Seat, SeatBooking
+
+
+class Command(BaseCommand):
+    help = 'Run EXPLAIN on the hot view queries and fail if any of them does a sequential scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Print the full plan for every query',
+        )
+        parser.add_argument(
+            '--allow-seqscan',
+            action='store_true',
+            help='On PostgreSQL, keep enable_seqscan on (small tables may then legitimately seq scan)',
+        )
+
+    def handle(self, *args, **options):
+        offenders = []
+
+        with transaction.atomic():
+            if connection.vendor == 'postgresql' and not options['allow_seqscan']:
+                # Tiny dev tables make seq scans the cheapest plan; this shows whether an index is usable at all
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for name, queryset in self.hot_queries():
+                plan = queryset.explain()
+                scans = self.sequential_scans(plan)
+
+                if scans:
+                    offenders.append(name)
+                    self.stdout.write(self.style.ERROR(f'✗ {name}: {"; ".join(scans)}'))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'✓ {name}'))
+
+                if options['verbose_plans'] or scans:
+                    self.stdout.write(plan)
+
+        if offenders:
+            raise CommandError(f'Sequential scans in {len(offenders)} hot queries: {", ".join(offenders)}')
+
+        self.stdout.write(self.style.SUCCESS('All hot queries use indexes'))
+
+    def hot_queries(self):
+        """The query shapes issued by the booking, attendance, payment and notification views"""
+        now = timezone.now()
+        later = now + timedelta(hours=2)
+        today = timezone.localdate()
+        day_start, day_end = DailyAttendanceSummary.day_bounds(today)
+
+        user_id = User.objects.values_list('id', flat=True).first() or 0
+        seat_id = Seat.objects.values_list('id', flat=True).first() or 0
+
+        return [
+            ('booking conflict check', SeatBooking.objects.filter(
+                seat_id=seat_id, status__in=['confirmed', 'active'],
+                start_time__lt=later, end_time__gt=now,
+            ).values('id')[:1]),
+            ('seat current booking', SeatBooking.objects.filter(
+                seat_id=seat_id, status='active', start_time__lte=now, end_time__gt=now,
+            ).values('id')[:1]),
+            ('live bookings in window', SeatBooking.objects.filter(
+                status__in=['confirmed', 'active'], start_time__lt=later, end_time__gt=now,
+            ).values('seat_id')),
+            ('my bookings', SeatBooking.objects.filter(user_id=user_id).order_by('-created_at')[:20]),
+            ('user booking stats', SeatBooking.objects.filter(
+                user_id=user_id, status__in=['completed', 'active'],
+            ).values('id')),
+            ('booking list page', SeatBooking.objects.order_by('-created_at', '-id')[:20]),
+            ('booking list after cursor', CreatedAtCursorPagination.keyset_filter(
+                SeatBooking.objects.order_by('-created_at', '-id'), now, 0,
+            )[:20]),
+            ('attendance for user day', AttendanceRecord.objects.filter(
+                user_id=user_id, check_in_time__gte=day_start, check_in_time__lt=day_end,
+            ).values('id', 'status', 'duration_minutes')),
+            ('my attendance', AttendanceRecord.objects.filter(user_id=user_id).order_by('-check_in_time')[:20]),
+            ('attendance rollup report', DailyAttendanceSummary.objects.filter(
+                date__gte=today - timedelta(days=30), date__lte=today,
+            ).values('user_id', 'sessions')),
+            ('pending payments', Payment.objects.filter(status='pending').order_by('-created_at')[:20]),
+            ('paid revenue', Payment.objects.filter(status='paid').values('amount')),
+            ('payment list page', Payment.objects.order_by('-created_at', '-id')[:20]),
+            ('unread notifications', UserNotification.objects.filter(
+                user_id=user_id, is_read=False,
+            ).order_by('-created_at')[:20]),
+        ]
+
+    def sequential_scans(self, plan):
+        """Plan lines that read a whole table instead of an index"""
+        scans = []
+        for line in plan.splitlines():
+            text = line.strip().lstrip('-> ').strip()
+            if connection.vendor == 'postgresql':
+                if text.startswith('Seq Scan') or text.startswith('Parallel Seq Scan'):
+                    scans.append(text.split('  ')[0])
+            elif connection.vendor == 'sqlite':
+                # SQLite: "SCAN <table>" is a full table scan, "SCAN ... USING INDEX" walks an index
+                if text.startswith('SCAN') and 'USING' not in text:
+                    scans.append(text)
+            elif 'ALL' in text.split():
+                # MySQL tabular EXPLAIN marks full scans with access type ALL
+                scans.append(text)
+        return scans
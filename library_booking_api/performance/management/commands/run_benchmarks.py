@@ -0,0 +1,79 @@
+import json
+import platform
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+from library_booking_api.benchmarks import SCENARIOS, run_benchmarks, seed_benchmark_data
+
+
+class Command(BaseCommand):
+    help = 'Seed a throwaway test database and benchmark the key API endpoints in process'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=2000, help='Users to seed (default: 2000)')
+        parser.add_argument('--seats', type=int, default=300, help='Seats to seed (default: 300)')
+        parser.add_argument('--days', type=int, default=90, help='Days of booking history (default: 90)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+        parser.add_argument('--iterations', type=int, default=200, help='Requests per scenario (default: 200)')
+        parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per scenario (default: 5)')
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            choices=[scenario.name for scenario in SCENARIOS],
+            help='Only run this scenario (repeatable)',
+        )
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1')
+
+        log = lambda message: self.stderr.write(message)
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            # Benchmarks measure the views, not the instrumentation around them
+            with override_settings(
+                QUERY_BUDGET_ENABLED=False, METRICS_ENABLED=False, PROFILING_ENABLED=False,
+                ATTENDANCE_REPORTS_ASYNC=False,
+            ):
+                started = timezone.now()
+                ctx = seed_benchmark_data(
+                    users=options['users'], seats=options['seats'], days=options['days'],
+                    seed=options['seed'], log=log,
+                )
+                results = run_benchmarks(
+                    ctx, iterations=options['iterations'], warmup=options['warmup'],
+                    only=options['scenario'], log=log,
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            'meta': {
+                'started_at': started.isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'users': options['users'],
+                'seats': options['seats'],
+                'days': options['days'],
+                'seed': options['seed'],
+                'iterations': options['iterations'],
+            },
+            'scenarios': results,
+        }
+
+        payload = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(payload + '\n')
+            log(f"Benchmark report written to {options['output']}")
+        else:
+            self.stdout.write(payload)
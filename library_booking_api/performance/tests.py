@@ -0,0 +1,217 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+from datetime import date
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import User
+from library_booking_api import metrics, profiling
+from library_booking_api.datagen import DataGenerator
+from seats.models import SeatBooking
+
+
+def use_temp_dir(test, setting):
+    """Point a directory setting at a fresh temporary directory for one test"""
+    directory = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+    override = override_settings(**{setting: directory})
+    override.enable()
+    test.addCleanup(override.disable)
+    return directory
+
+
+class DataGeneratorTests(TestCase):
+    """Generated data is namespaced by prefix, so several datasets can share a database"""
+
+    def generate(self, prefix):
+        return DataGenerator(
+            users=30, rooms=1, seats_per_room=10, days=3, end_date=date(2026, 3, 15), prefix=prefix,
+        ).run()
+
+    def test_second_prefix_does_not_collide(self):
+        first = self.generate('gen')
+        second = self.generate('other')
+        self.assertTrue(first['counts']['SeatBooking'])
+        self.assertTrue(second['counts']['SeatBooking'])
+        references = SeatBooking.objects.values_list('booking_reference', flat=True)
+        self.assertEqual(len(set(references)), first['counts']['SeatBooking'] + second['counts']['SeatBooking'])
+        self.assertTrue(all(len(reference) <= 20 for reference in references))
+
+
+class MetricsTests(TestCase):
+    """Worker files, the exited-worker aggregate and the Prometheus endpoint"""
+
+    def setUp(self):
+        self.directory = use_temp_dir(self, 'METRICS_DIR')
+
+    def write_worker(self, worker_id, *durations, view='seat-list'):
+        registry = metrics.MetricsRegistry()
+        for duration in durations:
+            registry.observe('GET', view, 200, duration, slow_ms=1000)
+        metrics._write_json(os.path.join(self.directory, f'worker-{worker_id}.json'), registry.snapshot())
+
+    def requests(self, view='seat-list'):
+        histograms, statuses, slow = metrics.collect()
+        counts, _ = histograms.get(('GET', view), ([0], 0.0))
+        self.assertEqual(sum(counts), statuses.get(('GET', view, '200'), 0))
+        return sum(counts)
+
+    def test_bucket_boundaries(self):
+        registry = metrics.MetricsRegistry()
+        bounds = metrics.BUCKET_BOUNDS_MS
+        for duration in (0.2, 1, 1.01, 1.5, 2, bounds[-1], bounds[-1] + 1):
+            registry.observe('GET', 'seat-list', 200, duration, slow_ms=1000)
+        counts = registry.histograms[('GET', 'seat-list')][0]
+        self.assertEqual(len(counts), len(bounds) + 1)
+        # A latency equal to a bound belongs to that bucket (Prometheus "le")
+        self.assertEqual(counts[:3], [2, 2, 1])
+        self.assertEqual(counts[-2:], [1, 1])
+        self.assertEqual(registry.slow[('GET', 'seat-list')], 2)
+
+        text = metrics.render_prometheus(registry.histograms, registry.statuses, registry.slow)
+        self.assertIn('le="0.001"} 2\n', text)
+        self.assertIn('le="0.0015"} 4\n', text)
+        self.assertIn('le="+Inf"} 7\n', text)
+
+    def test_collect_merges_workers_and_aggregate(self):
+        self.write_worker('101-aaaa', 5, 5)
+        self.write_worker('102-bbbb', 50)
+        metrics._write_json(os.path.join(self.directory, metrics.AGGREGATE_FILE), {
+            **metrics.MetricsRegistry().snapshot(), 'workers': [],
+        })
+        self.assertEqual(self.requests(), 3)
+
+        self.write_worker('100-cccc', 1, 1, 1, 1)
+        metrics.retire_worker(100)
+        self.assertEqual(self.requests(), 7)
+
+    def test_retire_worker_counts_once(self):
+        self.write_worker('101-aaaa', 5, 5)
+        self.write_worker('102-bbbb', 50)
+        metrics.retire_worker(101)
+        self.assertFalse(os.path.exists(os.path.join(self.directory, 'worker-101-aaaa.json')))
+        self.assertEqual(self.requests(), 3)
+
+        # A scrape that listed the file just before it was deleted
+        self.write_worker('101-aaaa', 5, 5)
+        self.assertEqual(self.requests(), 3)
+        metrics.retire_worker(101)
+        metrics.retire_worker(101)
+        self.assertEqual(self.requests(), 3)
+
+        metrics.retire_worker(102)
+        self.assertEqual(self.requests(), 3)
+        self.assertEqual(os.listdir(self.directory), [metrics.AGGREGATE_FILE])
+
+    def test_metrics_endpoint(self):
+        url = '/api/metrics/'
+        client = APIClient()
+        self.assertIn(client.get(url).status_code, (401, 403))
+        member = User.objects.create_user(username='member', email='member@example.com', password='pass')
+        client.force_authenticate(member)
+        self.assertEqual(client.get(url).status_code, 403)
+
+        admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='pass', is_staff=True,
+        )
+        client.force_authenticate(admin)
+        client.get(url)
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        text = response.content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', text)
+        self.assertIn('http_responses_total{method="GET",view="metrics",status="403"}', text)
+        served = re.search(r'^http_responses_total\{method="GET",view="metrics",status="200"\} (\d+)$', text, re.M)
+        self.assertGreaterEqual(int(served.group(1)), 1)
+        self.assertTrue(text.endswith('\n'))
+
+
+class ProfilingTests(TestCase):
+    """Staff-only request profiles, the on-disk ring and downloads"""
+
+    def setUp(self):
+        self.directory = use_temp_dir(self, 'PROFILING_DIR')
+        self.member = User.objects.create_user(username='member', email='member@example.com', password='pass')
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='pass', is_staff=True,
+        )
+
+    def client_for(self, user):
+        client = APIClient()
+        if user is not None:
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        return client
+
+    def profile(self, user=None, **params):
+        response = self.client_for(user or self.admin).get('/api/seats/', {'_profile': '1', **params})
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def stored(self):
+        return sorted(name[:-len('.json')] for name in os.listdir(self.directory) if name.endswith('.json'))
+
+    def test_non_staff_are_not_profiled(self):
+        client = self.client_for(self.member)
+        for response in (
+            client.get('/api/seats/', {'_profile': '1'}),
+            client.get('/api/seats/', HTTP_X_PROFILE='1'),
+            client.get('/api/seats/', {'_profile': 'text'}),
+            self.client_for(None).get('/api/seats/', {'_profile': '1'}),
+        ):
+            self.assertNotIn('X-Profile-Id', response)
+            self.assertNotEqual(response.get('Content-Type'), 'text/plain; charset=utf-8')
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_staff_profile_is_saved_with_db_time(self):
+        response = self.client_for(self.admin).get('/api/seats/', HTTP_X_PROFILE='1')
+        profile_id = response['X-Profile-Id']
+        self.assertEqual(self.stored(), [profile_id])
+        self.assertIn('queries=', response['X-Profile-Timing'])
+
+        with open(os.path.join(self.directory, f'{profile_id}.json')) as handle:
+            meta = json.load(handle)
+        self.assertEqual((meta['path'], meta['status_code']), ('/api/seats/', 200))
+        self.assertGreater(meta['query_count'], 0)
+        self.assertGreaterEqual(meta['db_ms'], 0)
+        self.assertAlmostEqual(meta['db_ms'] + meta['python_ms'], meta['total_ms'], delta=0.02)
+        self.assertTrue(os.path.exists(os.path.join(self.directory, meta['file'])))
+
+    @override_settings(PROFILING_MAX_FILES=2)
+    def test_ring_keeps_newest_profiles(self):
+        ids = [self.profile()['X-Profile-Id'] for _ in range(3)]
+        self.assertEqual(self.stored(), ids[1:])
+        self.assertFalse([name for name in os.listdir(self.directory) if name.startswith(ids[0])])
+
+    def test_download(self):
+        profile_id = self.profile()['X-Profile-Id']
+        url = f'/api/profiles/{profile_id}/'
+        self.assertIn(self.client_for(None).get(url).status_code, (401, 403))
+        self.assertEqual(self.client_for(self.member).get(url).status_code, 403)
+
+        response = self.client_for(self.admin).get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('attachment', response['Content-Disposition'])
+        self.assertTrue(b''.join(response.streaming_content))
+
+    def test_download_rejects_path_traversal(self):
+        client = self.client_for(self.admin)
+        secret = os.path.join(os.path.dirname(self.directory), 'secret.txt')
+        with open(secret, 'w') as handle:
+            handle.write('secret')
+        self.addCleanup(os.unlink, secret)
+
+        for profile_id in ('..%2Fsecret.txt', '..', '...json', f'{self.profile()["X-Profile-Id"]}x'):
+            self.assertEqual(client.get(f'/api/profiles/{profile_id}/').status_code, 404, profile_id)
+
+        # Metadata pointing outside the ring
+        profile_id = '20260101T000000000000-abcdef'
+        self.assertTrue(profiling.PROFILE_ID_RE.match(profile_id))
+        with open(os.path.join(self.directory, f'{profile_id}.json'), 'w') as handle:
+            json.dump({'id': profile_id, 'file': '../secret.txt'}, handle)
+        self.assertEqual(client.get(f'/api/profiles/{profile_id}/').status_code, 404)
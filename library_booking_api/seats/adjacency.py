@@ -0,0 +1,108 @@
+"""
+Group seating: k adjacent free seats in one search.
+
+Seats sit on a per-room grid (Seat.row / Seat.column); seats in the same
+row with consecutive columns are neighbours. For a time window the active
+seats of the candidate rooms and the ids of the seats already booked in it
+are loaded with one query each, every row becomes a free/taken array
+indexed by column, and a window of k columns slides along it keeping a
+running count of free seats. Each window that is all free is a candidate.
+
+Candidates are ranked best fit first:
+  1. fewest seats left over in the free run they are cut from, so a group
+     of 3 takes a run of 3 rather than breaking up a run of 8,
+  2. windows at the end of a run before ones that split it in two,
+  3. more power outlets, then room, row and column.
+"""
+
+import heapq
+from itertools import groupby
+
+from .models import Room, Seat, SeatBooking
+from .slots import HOLDING_STATUSES
+
+SEAT_FIELDS = ('id', 'room_id', 'row', 'column', 'seat_number', 'seat_type', 'status', 'has_power_outlet')
+
+
+def _row_windows(seats, count, busy, seat_type):
+    """Yield (rank key, window seats, run length) for each free window of `count` seats in one grid row"""
+    first_column = seats[0]['column']
+    by_column = [None] * (seats[-1]['column'] - first_column + 1)
+    for seat in seats:
+        by_column[seat['column'] - first_column] = seat
+    free = [
+        seat is not None and seat['status'] == 'available' and seat['id'] not in busy
+        and (seat_type is None or seat['seat_type'] == seat_type)
+        for seat in by_column
+    ]
+    if len(free) < count:
+        return
+
+    # Start and length of the free run each column belongs to
+    run_start = [0] * len(free)
+    run_length = [0] * len(free)
+    position = 0
+    while position < len(free):
+        end = position
+        while end < len(free) and free[end] == free[position]:
+            end += 1
+        for column in range(position, end):
+            run_start[column], run_length[column] = position, end - position
+        position = end
+
+    free_in_window = sum(free[:count])
+    power_in_window = sum(bool(seat and seat['has_power_outlet']) for seat in by_column[:count])
+    for left in range(len(free) - count + 1):
+        if left:
+            right = left + count - 1
+            free_in_window += free[right] - free[left - 1]
+            power_in_window += (
+                bool(by_column[right] and by_column[right]['has_power_outlet'])
+                - bool(by_column[left - 1] and by_column[left - 1]['has_power_outlet'])
+            )
+        if free_in_window < count:
+            continue
+        length = run_length[left]
+        splits_run = left != run_start[left] and left + count != run_start[left] + length
+        window = by_column[left:left + count]
+        key = (length - count, splits_run, -power_in_window, window[0]['room_id'], window[0]['row'], window[0]['column'])
+        yield key, window, length
+
+
+def find_adjacent(count, start_time, end_time, room_id=None, seat_type=None, limit=5):
+    """
+    Up to `limit` groups of `count` neighbouring seats free for the whole
+    window, best first. Each group is a dict with room, row, run_length and
+    the seats (dicts of SEAT_FIELDS) in column order.
+    """
+    seats = Seat.objects.filter(
+        is_active=True, room__is_active=True, row__isnull=False, column__isnull=False,
+    )
+    if room_id:
+        seats = seats.filter(room_id=room_id)
+
+    busy = set(SeatBooking.objects.filter(
+        seat__in=seats, status__in=HOLDING_STATUSES, start_time__lt=end_time, end_time__gt=start_time,
+    ).values_list('seat_id', flat=True).distinct())
+
+    rows = seats.order_by('room_id', 'row', 'column').values(*SEAT_FIELDS)
+    candidates = (
+        candidate
+        for _, row_seats in groupby(rows, key=lambda seat: (seat['room_id'], seat['row']))
+        for candidate in _row_windows(list(row_seats), count, busy, seat_type)
+    )
+    best = heapq.nsmallest(limit, candidates, key=lambda candidate: candidate[0])
+
+    room_names = dict(Room.objects.filter(
+        id__in={window[0]['room_id'] for _, window, _ in best}
+    ).values_list('id', 'name'))
+    return [
+        {
+            'room': window[0]['room_id'],
+            'room_name': room_names.get(window[0]['room_id']),
+            'row': window[0]['row'],
+            'run_length': length,
+            'seats': window,
+        }
+        for _, window, length in best
+    ]
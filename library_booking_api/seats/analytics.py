@@ -0,0 +1,225 @@
+"""
+Seat utilization analytics (cached per period).
+
+Bookings overlapping the period are read in keyset-paginated chunks of
+ANALYTICS_CHUNK_SIZE rows, as three columns (seat_id, start_time,
+end_time) turned into NumPy arrays. Each chunk is bucketed without a
+Python loop over bookings: a booking's first and last hour get their
+partial seconds, the whole hours between are expanded with np.repeat,
+and every piece is folded onto the 168 hours of the week (weekday x hour)
+and summed per seat with np.bincount.
+
+The result is a seats x 168 matrix of booked seat-seconds plus how many
+times each hour of the week occurs in the period. Every report (heatmap
+per room, utilization by room, hour, weekday or seat feature) is a
+grouped sum over that matrix, so it is built once per period and cached:
+ANALYTICS_CACHE_SECONDS while the period is still running,
+ANALYTICS_CLOSED_PERIOD_CACHE_SECONDS once it has ended.
+
+Utilization is booked seat-hours over seat-hours in the period (around the
+clock; operating hours are not taken into account), counting confirmed,
+active and completed bookings.
+"""
+
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .freebusy import local_range
+from .models import Room, Seat, SeatBooking
+
+BOOKED_STATUSES = ('confirmed', 'active', 'completed')
+HOUR = 3600
+WEEK_HOURS = 7 * 24
+MAX_PERIOD_DAYS = 366
+
+GROUP_BY = ('room', 'hour', 'weekday', 'seat_type', 'has_power_outlet', 'is_near_window')
+SEAT_FIELDS = ('id', 'room_id', 'seat_type', 'has_power_outlet', 'is_near_window', 'is_active')
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def period_bounds(start_date=None, end_date=None):
+    """Validated (start_date, end_date); defaults to the last 30 days"""
+    end_date = end_date or timezone.localdate()
+    start_date = start_date or end_date - timedelta(days=29)
+    if start_date > end_date:
+        raise ValueError('start_date must be on or before end_date')
+    if (end_date - start_date).days >= MAX_PERIOD_DAYS:
+        raise ValueError(f'Date range can be at most {MAX_PERIOD_DAYS} days')
+    return start_date, end_date
+
+
+def _timestamps(values):
+    return np.fromiter((value.timestamp() for value in values), dtype=np.float64, count=len(values))
+
+
+def _bucket_chunk(rows, seat_ids, origin, hours, first_weekday):
+    """Booked seconds per (seat row, hour of week) for one chunk, flattened"""
+    booked_seats, starts, ends = zip(*rows)
+    limit = hours * HOUR
+    start = np.clip(_timestamps(starts) - origin, 0, limit)
+    end = np.clip(_timestamps(ends) - origin, 0, limit)
+    booked_seats = np.fromiter(booked_seats, dtype=np.int64, count=len(rows))
+    seat_row = np.minimum(np.searchsorted(seat_ids, booked_seats), len(seat_ids) - 1)
+    # Seats created after seat_ids was read are skipped
+    known = seat_ids[seat_row] == booked_seats
+
+    first = np.floor(start / HOUR).astype(np.int64)
+    last = np.floor(end / HOUR).astype(np.int64)
+    single = first == last
+
+    # Partial first hour (whole booking when it starts and ends in one hour) and partial last hour
+    slots = [first, last[~single]]
+    rows_for = [seat_row, seat_row[~single]]
+    seconds = [
+        np.where(single, end - start, (first + 1) * HOUR - start) * known,
+        (end[~single] - last[~single] * HOUR) * known[~single],
+    ]
+
+    # Whole hours in between
+    whole = np.maximum(last - first - 1, 0)
+    if whole.any():
+        offsets = np.arange(whole.sum()) - np.repeat(np.cumsum(whole) - whole, whole)
+        slots.append(np.repeat(first + 1, whole) + offsets)
+        rows_for.append(np.repeat(seat_row, whole))
+        seconds.append(np.repeat(known * float(HOUR), whole))
+
+    slots, rows_for, seconds = np.concatenate(slots), np.concatenate(rows_for), np.concatenate(seconds)
+    keep = (slots < hours) & (seconds > 0)
+    slots, rows_for, seconds = slots[keep], rows_for[keep], seconds[keep]
+    week_hour = ((first_weekday + slots // 24) % 7) * 24 + slots % 24
+    return np.bincount(rows_for * WEEK_HOURS + week_hour, weights=seconds, minlength=len(seat_ids) * WEEK_HOURS)
+
+
+def compute_occupancy(start_date, end_date):
+    """
+    {'seat_ids', 'seconds' (seats x 168 booked seat-seconds), 'hour_counts'
+    (occurrences of each hour of the week in the period)} for the period.
+    """
+    start, end = local_range(start_date, end_date)
+    hours = int((end - start).total_seconds()) // HOUR
+    first_weekday = start_date.weekday()
+    seat_ids = np.array(sorted(Seat.objects.values_list('id', flat=True)), dtype=np.int64)
+    seconds = np.zeros(len(seat_ids) * WEEK_HOURS, dtype=np.float64)
+
+    bookings = SeatBooking.objects.filter(
+        status__in=BOOKED_STATUSES, start_time__lt=end, end_time__gt=start,
+    ).order_by('id')
+    chunk_size = _setting('ANALYTICS_CHUNK_SIZE', 20000)
+    last_id = 0
+    while True:
+        chunk = list(bookings.filter(id__gt=last_id).values_list('id', 'seat_id', 'start_time', 'end_time')[:chunk_size])
+        if not chunk:
+            break
+        last_id = chunk[-1][0]
+        seconds += _bucket_chunk([row[1:] for row in chunk], seat_ids, start.timestamp(), hours, first_weekday)
+        if len(chunk) < chunk_size:
+            break
+
+    all_hours = np.arange(hours)
+    hour_counts = np.bincount(((first_weekday + all_hours // 24) % 7) * 24 + all_hours % 24, minlength=WEEK_HOURS)
+    return {'seat_ids': seat_ids, 'seconds': seconds.reshape(-1, WEEK_HOURS), 'hour_counts': hour_counts}
+
+
+def occupancy(start_date, end_date):
+    """compute_occupancy(), cached per period"""
+    key = f'seats:analytics:{start_date}:{end_date}'
+    result = cache.get(key)
+    if result is None:
+        result = compute_occupancy(start_date, end_date)
+        closed = end_date < timezone.localdate()
+        cache.set(key, result, (
+            _setting('ANALYTICS_CLOSED_PERIOD_CACHE_SECONDS', 86400) if closed
+            else _setting('ANALYTICS_CACHE_SECONDS', 900)
+        ))
+    return result
+
+
+def _seat_columns(seat_ids, occupied):
+    """Seat attributes aligned with the occupancy rows; seats counted = active or booked in the period"""
+    rows = {row[0]: row for row in Seat.objects.values_list(*SEAT_FIELDS)}
+    # Seats deleted since the occupancy was cached have no attributes and are left out
+    missing = (None, None, '', False, False, False)
+    aligned = [rows.get(seat_id, missing) for seat_id in seat_ids.tolist()]
+    columns = {
+        field: np.array([row[index] for row in aligned])
+        for index, field in enumerate(SEAT_FIELDS)
+    }
+    present = np.array([row[0] is not None for row in aligned], dtype=bool)
+    columns['counted'] = present & (columns['is_active'].astype(bool) | occupied)
+    return columns
+
+
+def _ratio(booked, capacity):
+    return np.round(np.divide(booked, capacity, out=np.zeros_like(booked), where=capacity > 0), 4)
+
+
+def heatmap(start_date, end_date, room_id=None):
+    """Per-room utilization for each weekday (Monday first) x hour of day"""
+    data = occupancy(start_date, end_date)
+    seconds = data['seconds']
+    columns = _seat_columns(data['seat_ids'], seconds.sum(axis=1) > 0)
+    room_ids = sorted(set(columns['room_id'][columns['counted']].tolist()))
+    if room_id is not None:
+        room_ids = [room for room in room_ids if room == room_id]
+    names = dict(Room.objects.filter(id__in=room_ids).values_list('id', 'name'))
+
+    rooms = []
+    for room in room_ids:
+        in_room = columns['counted'] & (columns['room_id'] == room)
+        booked = seconds[in_room].sum(axis=0)
+        capacity = data['hour_counts'] * in_room.sum() * float(HOUR)
+        rooms.append({
+            'room': room,
+            'room_name': names.get(room),
+            'seats': int(in_room.sum()),
+            'utilization': _ratio(booked, capacity).reshape(7, 24).tolist(),
+        })
+    return rooms
+
+
+def utilization(start_date, end_date, group_by='room'):
+    """Booked hours, capacity hours and utilization per group (see GROUP_BY)"""
+    if group_by not in GROUP_BY:
+        raise ValueError(f"group_by must be one of: {', '.join(GROUP_BY)}")
+
+    data = occupancy(start_date, end_date)
+    columns = _seat_columns(data['seat_ids'], data['seconds'].sum(axis=1) > 0)
+    seconds = data['seconds'][columns['counted']]
+    hour_counts = data['hour_counts'].astype(np.float64)
+    seat_count = seconds.shape[0]
+
+    if group_by in ('hour', 'weekday'):
+        by_week_hour = seconds.sum(axis=0).reshape(7, 24)
+        counts = hour_counts.reshape(7, 24)
+        axis = 0 if group_by == 'hour' else 1
+        keys = range(24) if group_by == 'hour' else range(7)
+        booked = by_week_hour.sum(axis=axis)
+        capacity = counts.sum(axis=axis) * seat_count * HOUR
+    else:
+        values = columns[f'{group_by}_id' if group_by == 'room' else group_by][columns['counted']]
+        keys = sorted(set(values.tolist()))
+        per_seat = seconds.sum(axis=1)
+        booked = np.array([per_seat[values == key].sum() for key in keys])
+        capacity = np.array([(values == key).sum() for key in keys]) * hour_counts.sum() * HOUR
+
+    booked = np.asarray(booked, dtype=np.float64)
+    capacity = np.asarray(capacity, dtype=np.float64)
+    names = dict(Room.objects.values_list('id', 'name')) if group_by == 'room' else {}
+    ratios = _ratio(booked, capacity)
+    return [
+        {
+            'group': key,
+            **({'room_name': names.get(key)} if group_by == 'room' else {}),
+            'booked_hours': round(float(booked[index]) / HOUR, 2),
+            'capacity_hours': round(float(capacity[index]) / HOUR, 2),
+            'utilization': float(ratios[index]),
+        }
+        for index, key in enumerate(keys)
+    ]
@@ -1,5 +1,13 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class SeatsConfig(AppConfig):
     name = 'seats'
+
+    def ready(self):
+        import seats.signals
+        from library_booking_api import scheduler
+        from .lifecycle import sweep
+
+        scheduler.register('booking-lifecycle', getattr(settings, 'BOOKING_SWEEP_INTERVAL', 60), sweep)
@@ -0,0 +1,115 @@
+"""
+Free/busy grid for a seat or a room over a date range.
+
+The days are cut into fixed slots of FREE_BUSY_SLOT_MINUTES starting at
+local midnight, and each slot gets the number of seats with a booking in
+it (0/1 for a single seat). Bookings for the range come from one query as
+(seat_id, start_time, end_time) and are bucketed with NumPy: each booking
+marks a +1/-1 pair on its seat's row of a seats x slots difference array,
+a cumulative sum along the row gives the seat's busy slots, and a column
+sum gives the per-slot count. A seat with back-to-back bookings inside
+one slot is counted once.
+
+The ETag is the latest updated_at and the number of bookings touching the
+range (any status, so cancellations change it too). The grid is cached
+under the ETag, so an unchanged calendar costs one aggregate query.
+"""
+
+import hashlib
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import SeatBooking
+from .slots import HOLDING_STATUSES
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def max_days():
+    return _setting('FREE_BUSY_MAX_DAYS', 62)
+
+
+def default_slot_minutes():
+    return _setting('FREE_BUSY_SLOT_MINUTES', 60)
+
+
+def max_age():
+    return _setting('FREE_BUSY_MAX_AGE', 60)
+
+
+def local_range(start_date, end_date):
+    """Local midnight of start_date and whole 24-hour days after it, through end_date"""
+    start = timezone.make_aware(datetime.combine(start_date, time.min), timezone.get_current_timezone())
+    return start, start + timedelta(days=(end_date - start_date).days + 1)
+
+
+def etag(seat_ids, start_date, end_date, slot_minutes):
+    """ETag for the grid: changes whenever a booking touching the range does"""
+    start, end = local_range(start_date, end_date)
+    latest = SeatBooking.objects.filter(
+        seat_id__in=seat_ids, start_time__lt=end, end_time__gt=start,
+    ).order_by().aggregate(changed=Max('updated_at'), bookings=Count('id'))
+    changed = latest['changed'].isoformat() if latest['changed'] else '-'
+    key = f"{','.join(map(str, sorted(seat_ids)))}|{start_date}|{end_date}|{slot_minutes}|{changed}|{latest['bookings']}"
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def busy_counts(seat_ids, start, end, slot_minutes):
+    """Array of busy seat counts per slot from start to end"""
+    slot_seconds = slot_minutes * 60
+    slot_count = int((end - start).total_seconds()) // slot_seconds
+    rows = list(SeatBooking.objects.filter(
+        seat_id__in=seat_ids, status__in=HOLDING_STATUSES, start_time__lt=end, end_time__gt=start,
+    ).order_by().values_list('seat_id', 'start_time', 'end_time'))
+    if not rows:
+        return np.zeros(slot_count, dtype=np.int32)
+
+    booked_seats, starts, ends = zip(*rows)
+    origin = start.timestamp()
+    starts = np.fromiter((value.timestamp() for value in starts), dtype=np.float64, count=len(rows)) - origin
+    ends = np.fromiter((value.timestamp() for value in ends), dtype=np.float64, count=len(rows)) - origin
+    first = np.clip(np.floor(starts / slot_seconds), 0, slot_count).astype(np.int64)
+    last = np.clip(np.ceil(ends / slot_seconds), 0, slot_count).astype(np.int64)
+
+    seat_index = {seat_id: index for index, seat_id in enumerate(seat_ids)}
+    row_index = np.fromiter((seat_index[seat_id] for seat_id in booked_seats), dtype=np.int64, count=len(rows))
+    diff = np.zeros((len(seat_ids), slot_count + 1), dtype=np.int32)
+    np.add.at(diff, (row_index, first), 1)
+    np.add.at(diff, (row_index, last), -1)
+    busy = np.cumsum(diff[:, :-1], axis=1) > 0
+    return busy.sum(axis=0, dtype=np.int32)
+
+
+def grid(seat_ids, start_date, end_date, slot_minutes, tag=None):
+    """
+    {'capacity', 'slot_minutes', 'slots_per_day', 'days': [{'date', 'busy': [...]}]},
+    cached under the ETag when one is given.
+    """
+    cache_key = f'seats:freebusy:{tag}' if tag else None
+    if cache_key:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    start, end = local_range(start_date, end_date)
+    slots_per_day = 24 * 60 // slot_minutes
+    counts = busy_counts(list(seat_ids), start, end, slot_minutes).reshape(-1, slots_per_day)
+    result = {
+        'capacity': len(seat_ids),
+        'slot_minutes': slot_minutes,
+        'slots_per_day': slots_per_day,
+        'days': [
+            {'date': start_date + timedelta(days=offset), 'busy': day.tolist()}
+            for offset, day in enumerate(counts)
+        ],
+    }
+    if cache_key:
+        cache.set(cache_key, result, _setting('FREE_BUSY_CACHE_SECONDS', 300))
+    return result
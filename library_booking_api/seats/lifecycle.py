@@ -0,0 +1,67 @@
+"""
+Booking lifecycle sweeps.
+
+Bookings otherwise only leave 'confirmed'/'active' through check_out() or
+cancel(), so rows nobody closes keep matching every conflict query. sweep()
+closes them with one set-based UPDATE per transition:
+
+  * confirmed, not checked in BOOKING_NO_SHOW_GRACE_MINUTES after start -> no_show
+  * active, past end_time -> completed (checked out at end_time)
+
+Each UPDATE re-checks the status it transitions from, so running the sweep
+twice, or from several processes at once, changes nothing the second time.
+Released seats are announced through seats.signals.seat_availability_changed.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import SeatBooking
+from .signals import announce_availability
+
+
+def no_show_grace():
+    return timedelta(minutes=getattr(settings, 'BOOKING_NO_SHOW_GRACE_MINUTES', 15))
+
+
+def _transition(bookings, from_status, **changes):
+    """Move `bookings` out of from_status; returns (booking ids, seat ids) actually changed"""
+    rows = list(bookings.filter(status=from_status).select_for_update().values_list('id', 'seat_id'))
+    if not rows:
+        return [], []
+    ids = [booking_id for booking_id, _ in rows]
+    SeatBooking.objects.filter(id__in=ids, status=from_status).update(**changes)
+    return ids, [seat_id for _, seat_id in rows]
+
+
+def mark_no_shows(now=None):
+    now = now or timezone.now()
+    with transaction.atomic():
+        ids, seat_ids = _transition(
+            SeatBooking.objects.filter(checked_in_at__isnull=True, start_time__lte=now - no_show_grace()),
+            'confirmed', status='no_show', updated_at=now,
+        )
+        announce_availability(seat_ids, ids, 'no_show')
+    return len(ids)
+
+
+def complete_finished(now=None):
+    now = now or timezone.now()
+    with transaction.atomic():
+        ids, seat_ids = _transition(
+            SeatBooking.objects.filter(end_time__lte=now),
+            'active', status='completed', checked_out_at=Coalesce('checked_out_at', F('end_time')), updated_at=now,
+        )
+        announce_availability(seat_ids, ids, 'completed')
+    return len(ids)
+
+
+def sweep(now=None):
+    """Run both transitions; returns counts"""
+    now = now or timezone.now()
+    return {'no_show': mark_no_shows(now), 'completed': complete_finished(now)}
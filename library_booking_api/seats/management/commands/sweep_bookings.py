@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from seats import lifecycle
+
+
+class Command(BaseCommand):
+    help = 'Close stale bookings: confirmed no-shows become no_show, finished active bookings become completed'
+
+    def handle(self, *args, **options):
+        result = lifecycle.sweep()
+        self.stdout.write(self.style.SUCCESS(
+            f"Marked {result['no_show']} no-shows and completed {result['completed']} bookings"
+        ))
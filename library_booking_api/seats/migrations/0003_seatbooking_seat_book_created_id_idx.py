@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seats', '0002_seatbooking_payment'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='seatbooking',
+            index=models.Index(fields=['-created_at', '-id'], name='seat_book_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seats', '0003_seatbooking_seat_book_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='seatbooking',
+            index=models.Index(fields=['seat', 'status', 'start_time', 'end_time'], name='seat_book_conflict_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seatbooking',
+            index=models.Index(condition=models.Q(('status__in', ['confirmed', 'active'])), fields=['end_time', 'start_time'], name='seat_book_live_range_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seatbooking',
+            index=models.Index(fields=['user', 'status'], name='seat_book_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seatbooking',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='seat_book_user_created_idx'),
+        ),
+    ]
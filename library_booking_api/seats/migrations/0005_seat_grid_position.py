@@ -0,0 +1,58 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:58
+
+import re
+
+from django.db import migrations, models
+
+# Frozen copy of seats.models.grid_position as of this migration
+SEAT_NUMBER_RE = re.compile(r'^\s*([A-Za-z]+)\s*-?\s*(\d+)\s*$')
+GRID_MAX = 32767
+
+
+def grid_position(seat_number):
+    match = SEAT_NUMBER_RE.match(seat_number or '')
+    if not match:
+        return None
+    row = 0
+    for letter in match.group(1).upper():
+        row = row * 26 + ord(letter) - ord('A') + 1
+    column = int(match.group(2))
+    if row > GRID_MAX or column > GRID_MAX:
+        return None
+    return row, column
+
+
+def fill_grid_positions(apps, schema_editor):
+    Seat = apps.get_model('seats', 'Seat')
+    seats = []
+    for seat in Seat.objects.filter(row__isnull=True).only('id', 'seat_number').iterator(chunk_size=2000):
+        position = grid_position(seat.seat_number)
+        if position:
+            seat.row, seat.column = position
+            seats.append(seat)
+    Seat.objects.bulk_update(seats, ['row', 'column'], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seats', '0004_query_shape_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seat',
+            name='column',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='seat',
+            name='row',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='seat',
+            index=models.Index(fields=['room', 'row', 'column'], name='seat_room_grid_idx'),
+        ),
+        migrations.RunPython(fill_grid_positions, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,11 @@
+import re
+
 from django.db import models
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from accounts.models import User
 from payments.models import Payment # Payment model import करें
+from .signals import announce_availability
 
 class Room(models.Model):
     """Library room or zone containing seats"""
@@ -29,6 +32,41 @@ class Room(models.Model):
         self.save()
 
 
+SEAT_NUMBER_RE = re.compile(r'^\s*([A-Za-z]+)\s*-?\s*(\d+)\s*$')
+# Largest value a PositiveSmallIntegerField holds on every backend
+GRID_MAX = 32767
+
+
+def grid_position(seat_number):
+    """
+    (row, column) from a seat number like "A01" or "AB-7" (A=1, Z=26, AA=27);
+    None if it has no row letters or either part is past GRID_MAX.
+    """
+    match = SEAT_NUMBER_RE.match(seat_number or '')
+    if not match:
+        return None
+    row = 0
+    for letter in match.group(1).upper():
+        row = row * 26 + ord(letter) - ord('A') + 1
+    column = int(match.group(2))
+    if row > GRID_MAX or column > GRID_MAX:
+        return None
+    return row, column
+
+
+class SeatQuerySet(models.QuerySet):
+    def with_current_booking(self):
+        """Prefetch each seat's active booking so get_current_booking() needs no query per seat"""
+        now = timezone.now()
+        return self.prefetch_related(models.Prefetch(
+            'bookings',
+            queryset=SeatBooking.objects.filter(
+                status='active', start_time__lte=now, end_time__gt=now,
+            ).select_related('user').order_by('id'),
+            to_attr='current_bookings',
+        ))
+
+
 class Seat(models.Model):
     """Individual seat in the library"""
 
@@ -57,13 +95,23 @@ class Seat(models.Model):
     is_near_window = models.BooleanField(default=False)
     is_accessible = models.BooleanField(default=False)  # Wheelchair accessible
 
+    # Position in the room's seating grid; seats in one row with consecutive
+    # columns are neighbours. Filled from seat_number when not set explicitly.
+    row = models.PositiveSmallIntegerField(blank=True, null=True)
+    column = models.PositiveSmallIntegerField(blank=True, null=True)
+
     # Administrative
     is_active = models.BooleanField(default=True)
     notes = models.TextField(blank=True, null=True)
 
+    objects = SeatQuerySet.as_manager()
+
     class Meta:
         db_table = 'seats'
         unique_together = ['room', 'seat_number']
+        indexes = [
+            models.Index(fields=['room', 'row', 'column'], name='seat_room_grid_idx'),
+        ]
         verbose_name = 'Seat'
         verbose_name_plural = 'Seats'
 
@@ -75,6 +123,11 @@ class Seat(models.Model):
         if not self.seat_number:
             raise ValidationError("Seat number is required")
 
+    def save(self, *args, **kwargs):
+        if self.row is None or self.column is None:
+            self.row, self.column = grid_position(self.seat_number) or (self.row, self.column)
+        super().save(*args, **kwargs)
+
     def is_available_for_booking(self, start_time, end_time):
         """Check if seat is available for the given time period"""
         if self.status != 'available':
@@ -91,6 +144,8 @@ class Seat(models.Model):
 
     def get_current_booking(self):
         """Get the current active booking for this seat"""
+        if hasattr(self, 'current_bookings'):
+            return self.current_bookings[0] if self.current_bookings else None
         now = timezone.now()
         return SeatBooking.objects.filter(
             seat=self,
@@ -138,6 +193,20 @@ class SeatBooking(models.Model):
     class Meta:
         db_table = 'seat_bookings'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='seat_book_created_id_idx'),
+            # Conflict checks: seat + status + overlapping time range
+            models.Index(fields=['seat', 'status', 'start_time', 'end_time'], name='seat_book_conflict_idx'),
+            # Live bookings only (partial index where supported), for cross-seat range scans
+            models.Index(
+                fields=['end_time', 'start_time'],
+                condition=models.Q(status__in=['confirmed', 'active']),
+                name='seat_book_live_range_idx',
+            ),
+            # Per-user lists and stats
+            models.Index(fields=['user', 'status'], name='seat_book_user_status_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='seat_book_user_created_idx'),
+        ]
         verbose_name = 'Seat Booking'
         verbose_name_plural = 'Seat Bookings'
 
@@ -186,12 +255,14 @@ class SeatBooking(models.Model):
             self.status = 'completed'
             self.checked_out_at = timezone.now()
             self.save()
+            announce_availability([self.seat_id], [self.pk], 'checked_out')
 
     def cancel(self):
         """Cancel the booking"""
         if self.status in ['pending', 'confirmed']:
             self.status = 'cancelled'
             self.save()
+            announce_availability([self.seat_id], [self.pk], 'cancelled')
 
     @property
     def is_active_now(self):
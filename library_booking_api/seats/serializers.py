@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.utils import timezone
 from .models import Room, Seat, SeatBooking
+from .slots import find_slots
 from payments.serializers import PaymentSerializer
 
 
@@ -38,7 +39,7 @@ class SeatSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'number', 'room', 'room_name', 'seat_number', 'seat_type', 'status',
             'has_power_outlet', 'has_monitor', 'is_near_window', 'is_accessible',
-            'is_active', 'notes', 'current_booking', 'photo'
+            'row', 'column', 'is_active', 'notes', 'current_booking', 'photo'
         ]
         read_only_fields = ['id']
 
@@ -351,7 +352,14 @@ class SeatBookingCreateSerializer(serializers.ModelSerializer):
 
             # Check availability
             if seat and not seat.is_available_for_booking(start_time, end_time):
-                raise serializers.ValidationError({"seat": "Seat is not available for the selected time period"})
+                # Suggest the next free slots of the same length so clients don't have to probe
+                found = []
+                if seat.status == 'available':
+                    found = find_slots([seat], end_time - start_time, start_time, limit=3)[seat.pk]
+                raise serializers.ValidationError({
+                    "seat": "Seat is not available for the selected time period",
+                    "next_available": [start.isoformat() for start, _ in found],
+                })
 
         # Payment validation - if payment_screenshot is provided, it's an online payment
         if payment_screenshot:
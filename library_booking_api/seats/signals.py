@@ -0,0 +1,24 @@
+import logging
+
+from django.db import transaction
+from django.dispatch import Signal, receiver
+
+logger = logging.getLogger(__name__)
+
+# Sent after commit whenever bookings stop (or start) holding seats.
+# kwargs: seat_ids, booking_ids, reason ('no_show', 'completed', 'cancelled', 'checked_out')
+seat_availability_changed = Signal()
+
+
+def announce_availability(seat_ids, booking_ids, reason):
+    """Send seat_availability_changed once the current transaction commits"""
+    seat_ids, booking_ids = sorted(set(seat_ids)), sorted(set(booking_ids))
+    if seat_ids:
+        transaction.on_commit(lambda: seat_availability_changed.send(
+            sender=None, seat_ids=seat_ids, booking_ids=booking_ids, reason=reason,
+        ))
+
+
+@receiver(seat_availability_changed)
+def log_availability_change(sender, seat_ids, booking_ids, reason, **kwargs):
+    logger.info('%s seats released (%s): %s bookings', len(seat_ids), reason, len(booking_ids))
@@ -0,0 +1,155 @@
+"""
+Next-available-slot search.
+
+A seat's bookings for the search horizon are loaded once (one query for a
+whole room), merged into disjoint busy intervals in start order, and the
+gaps between them that fall inside the room's opening hours and are at
+least `duration` long are returned. Clients get the first free slots in a
+single request instead of probing available-seats with shifted windows.
+
+Room.operating_hours is either one schedule for every day
+    {"open": "08:00", "close": "22:00"}
+or per weekday, with a missing/empty day meaning closed
+    {"monday": {"open": "08:00", "close": "20:00"}, "sunday": null, ...}
+An empty dict means open around the clock; a close at or before the open
+time runs past midnight.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import SeatBooking
+
+# Statuses that block a seat (same as Seat.is_available_for_booking)
+HOLDING_STATUSES = ('confirmed', 'active')
+
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+
+
+def search_days():
+    return getattr(settings, 'SLOT_SEARCH_DAYS', 7)
+
+
+def _parse_time(value):
+    return time.fromisoformat(value) if isinstance(value, str) else value
+
+
+def hours_for(operating_hours, day):
+    """(open, close) times for a date, None when closed; open all day if no hours are set"""
+    if not operating_hours:
+        return time.min, time.min
+    schedule = operating_hours
+    if not {'open', 'close'} <= operating_hours.keys():
+        schedule = operating_hours.get(WEEKDAYS[day.weekday()])
+    if not schedule or not schedule.get('open') or not schedule.get('close'):
+        return None
+    return _parse_time(schedule['open']), _parse_time(schedule['close'])
+
+
+def open_windows(operating_hours, start, end):
+    """Merged opening windows (aware datetimes) covering start..end"""
+    tz = timezone.get_current_timezone()
+    windows = []
+    # Start a day early so a window running past midnight into `start` is included
+    day = timezone.localtime(start, tz).date() - timedelta(days=1)
+    last_day = timezone.localtime(end, tz).date()
+    while day <= last_day:
+        hours = hours_for(operating_hours, day)
+        if hours:
+            opens, closes = hours
+            window_start = timezone.make_aware(datetime.combine(day, opens), tz)
+            close_day = day if closes > opens else day + timedelta(days=1)
+            window_end = timezone.make_aware(datetime.combine(close_day, closes), tz)
+            window_start, window_end = max(window_start, start), min(window_end, end)
+            if window_start < window_end:
+                if windows and window_start <= windows[-1][1]:
+                    windows[-1] = (windows[-1][0], max(windows[-1][1], window_end))
+                else:
+                    windows.append((window_start, window_end))
+        day += timedelta(days=1)
+    return windows
+
+
+def merge(intervals):
+    """Disjoint, sorted union of (start, end) intervals already sorted by start"""
+    merged = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def gaps(busy, windows, duration, limit):
+    """First `limit` (start, end) gaps of at least `duration` inside windows, avoiding merged busy intervals"""
+    found = []
+    first = 0
+    for window_start, window_end in windows:
+        cursor = window_start
+        while first < len(busy) and busy[first][1] <= cursor:
+            first += 1
+        index = first
+        while cursor < window_end and len(found) < limit:
+            if index < len(busy) and busy[index][0] < window_end:
+                busy_start, busy_end = busy[index]
+                if busy_start - cursor >= duration:
+                    found.append((cursor, busy_start))
+                cursor = max(cursor, busy_end)
+                index += 1
+            else:
+                if window_end - cursor >= duration:
+                    found.append((cursor, window_end))
+                break
+        if len(found) >= limit:
+            break
+    return found
+
+
+def _next_minute(value):
+    """value rounded up to a whole minute, so a suggested start is never in the past"""
+    whole = value.replace(second=0, microsecond=0)
+    return whole if whole == value else whole + timedelta(minutes=1)
+
+
+def find_slots(seats, duration, earliest=None, days=None, limit=5):
+    """
+    Free slots of `duration` starting at or after `earliest` (default now),
+    within `days` days. `seats` is a list of Seat objects with room loaded.
+    Returns {seat id: [(start, available_until), ...]} with at most `limit`
+    slots per seat; available_until is where the gap ends.
+    """
+    earliest = _next_minute(earliest or timezone.now())
+    horizon = earliest + timedelta(days=days or search_days())
+    if not seats:
+        return {}
+
+    busy = {seat.pk: [] for seat in seats}
+    bookings = SeatBooking.objects.filter(
+        seat_id__in=busy, status__in=HOLDING_STATUSES, start_time__lt=horizon, end_time__gt=earliest,
+    ).order_by('seat_id', 'start_time').values_list('seat_id', 'start_time', 'end_time')
+    for seat_id, start_time, end_time in bookings:
+        busy[seat_id].append((start_time, end_time))
+
+    windows_by_room = {}
+    slots = {}
+    for seat in seats:
+        if seat.room_id not in windows_by_room:
+            windows_by_room[seat.room_id] = open_windows(seat.room.operating_hours, earliest, horizon)
+        slots[seat.pk] = gaps(merge(busy[seat.pk]), windows_by_room[seat.room_id], duration, limit)
+    return slots
+
+
+def first_slots(seats, duration, earliest=None, days=None, limit=5):
+    """The `limit` earliest slots across all `seats`, as (seat, start, available_until)"""
+    by_id = {seat.pk: seat for seat in seats}
+    slots = find_slots(seats, duration, earliest, days, limit)
+    ranked = sorted(
+        (start, by_id[seat_id].seat_number, seat_id, available_until)
+        for seat_id, seat_slots in slots.items()
+        for start, available_until in seat_slots
+    )
+    return [(by_id[seat_id], start, available_until) for start, _, seat_id, available_until in ranked[:limit]]
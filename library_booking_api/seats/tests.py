@@ -1,3 +1,437 @@
-from django.test import TestCase
+import random
+from datetime import date, datetime, timedelta
 
-# Create your tests here.
+import numpy as np
+from django.db.models import DateTimeField, F, Value
+from django.test import TestCase, override_settings
+from django.urls import resolve
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from library_booking_api.pagination import CreatedAtCursorPagination, RowComparison
+from library_booking_api.query_budget import assert_max_queries
+from . import adjacency, analytics, lifecycle, slots
+from .freebusy import local_range
+from .models import Room, Seat, SeatBooking
+from .signals import seat_availability_changed
+
+
+class SeatQueryValidationTests(TestCase):
+    """Malformed query parameters on the seat search endpoints are 400s, not 500s"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='member', email='member@example.com', password='pass')
+        self.room = Room.objects.create(name='Reading Room')
+        self.seat = Seat.objects.create(room=self.room, seat_number='A01')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assertBadRequest(self, url, params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 400, (params, response.data))
+
+    def test_next_available(self):
+        url = '/api/seats/next-available/'
+        self.assertBadRequest(url, {'room': 'abc', 'duration_hours': 1})
+        self.assertBadRequest(url, {'seat': 'abc', 'duration_hours': 1})
+        for duration in ('nan', 'inf', '1e300', '0'):
+            self.assertBadRequest(url, {'seat': self.seat.id, 'duration_hours': duration})
+        self.assertEqual(self.client.get(url, {'seat': self.seat.id, 'duration_hours': 1}).status_code, 200)
+
+    def test_free_busy(self):
+        url = '/api/seats/free-busy/'
+        self.assertBadRequest(url, {'seat': 'abc'})
+        self.assertBadRequest(url, {'room': 'abc'})
+        response = self.client.get(url, {'room': self.room.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['room'], self.room.id)
+
+    def test_adjacent_seats(self):
+        url = '/api/seats/adjacent-seats/'
+        window = {'count': 1, 'date': '2030-01-07', 'start_time': '10:00', 'end_time': '12:00'}
+        self.assertBadRequest(url, {**window, 'room': 'abc'})
+        self.assertEqual(self.client.get(url, {**window, 'room': self.room.id}).status_code, 200)
+
+    def test_grid_position_out_of_range(self):
+        self.assertEqual((self.seat.row, self.seat.column), (1, 1))
+        seat = Seat.objects.create(room=self.room, seat_number='A40000')
+        self.assertEqual((seat.row, seat.column), (None, None))
+
+    def test_app_endpoints_are_not_router_detail_routes(self):
+        self.assertEqual(resolve('/api/seats/available-seats/').url_name, 'available-seats')
+        self.assertEqual(resolve('/api/payments/stats/').url_name, 'payment-stats')
+
+    def test_booking_export_rejects_non_numeric_user(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.assertBadRequest('/api/bookings/export/', {'user_id': 'abc'})
+
+
+class SeatQueryBudgetTests(TestCase):
+    """Seat list and available-seats run a fixed number of queries however many seats there are"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='member', email='member@example.com', password='pass')
+        room = Room.objects.create(name='Reading Room')
+        self.seats = [Seat.objects.create(room=room, seat_number=f'A{n:02d}') for n in range(1, 9)]
+        now = timezone.now()
+        self.current = SeatBooking.objects.create(
+            user=self.user, seat=self.seats[0], status='active',
+            start_time=now - timedelta(hours=1), end_time=now + timedelta(hours=1),
+        )
+        self.start = timezone.make_aware(datetime(2030, 1, 7, 10))
+        SeatBooking.objects.create(
+            user=self.user, seat=self.seats[1], status='confirmed',
+            start_time=self.start, end_time=self.start + timedelta(hours=2),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_available_seats(self):
+        with assert_max_queries(3, max_duplicates=0):
+            response = self.client.get('/api/seats/available-seats/', {
+                'date': '2030-01-07', 'start_time': '11:00', 'end_time': '12:00',
+            })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sorted(seat['id'] for seat in response.data),
+            sorted(seat.id for seat in self.seats[:1] + self.seats[2:]),
+        )
+        current = next(seat for seat in response.data if seat['id'] == self.seats[0].id)
+        self.assertEqual(current['current_booking']['id'], self.current.id)
+
+    def test_seat_list(self):
+        with assert_max_queries(5, max_duplicates=0):
+            response = self.client.get('/api/seats/')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(QUERY_BUDGETS={'seat-list': 1})
+    def test_over_budget_request_is_logged(self):
+        with self.assertLogs('performance', 'WARNING') as logs:
+            self.client.get('/api/seats/')
+        self.assertIn('Query budget exceeded', logs.output[0])
+
+
+def brute_force_occupancy(rows, seat_ids, start, hours, first_weekday):
+    """Booked seconds per (seat, hour of week), one hour of the period at a time"""
+    seconds = np.zeros((len(seat_ids), analytics.WEEK_HOURS))
+    row_of = {seat_id: row for row, seat_id in enumerate(seat_ids)}
+    for seat_id, booking_start, booking_end in rows:
+        if seat_id not in row_of:
+            continue
+        for hour in range(hours):
+            hour_start = start + timedelta(hours=hour)
+            overlap = (min(booking_end, hour_start + timedelta(hours=1)) - max(booking_start, hour_start)).total_seconds()
+            if overlap > 0:
+                week_hour = ((first_weekday + hour // 24) % 7) * 24 + hour % 24
+                seconds[row_of[seat_id], week_hour] += overlap
+    return seconds
+
+
+class OccupancyBucketingTests(TestCase):
+    """The vectorised hour bucketing agrees with a per-hour loop"""
+
+    def setUp(self):
+        self.start_date, self.end_date = date(2026, 3, 2), date(2026, 3, 15)
+        self.start, self.end = local_range(self.start_date, self.end_date)
+        self.hours = int((self.end - self.start).total_seconds()) // analytics.HOUR
+        self.seat_ids = np.array([3, 7, 11], dtype=np.int64)
+
+    def bookings(self, count, seed=7):
+        rng = random.Random(seed)
+        rows = [
+            # Across midnight, across both period edges, minute-aligned and odd seconds
+            (3, self.start + timedelta(hours=22, minutes=30), self.start + timedelta(days=1, hours=2, minutes=15)),
+            (7, self.start - timedelta(hours=5), self.start + timedelta(hours=1, seconds=17)),
+            (11, self.end - timedelta(minutes=40), self.end + timedelta(hours=3)),
+            (3, self.start - timedelta(days=1), self.end + timedelta(days=1)),
+            (7, self.start + timedelta(hours=5, minutes=10), self.start + timedelta(hours=5, minutes=50)),
+            # Seat created after the seat list was read
+            (99, self.start + timedelta(hours=3), self.start + timedelta(hours=9)),
+        ]
+        for _ in range(count):
+            booking_start = self.start + timedelta(seconds=rng.randrange(-86400, self.hours * 3600))
+            booking_end = booking_start + timedelta(seconds=rng.randrange(60, 3 * 86400))
+            rows.append((rng.choice([3, 7, 11]), booking_start, booking_end))
+        return rows
+
+    def test_matches_per_hour_loop(self):
+        rows = self.bookings(200)
+        first_weekday = self.start_date.weekday()
+        bucketed = analytics._bucket_chunk(rows, self.seat_ids, self.start.timestamp(), self.hours, first_weekday)
+        expected = brute_force_occupancy(rows, self.seat_ids.tolist(), self.start, self.hours, first_weekday)
+        np.testing.assert_allclose(bucketed.reshape(-1, analytics.WEEK_HOURS), expected, atol=1e-6)
+
+    @override_settings(ANALYTICS_CHUNK_SIZE=4)
+    def test_compute_occupancy_across_chunks(self):
+        user = User.objects.create_user(username='member', email='member@example.com', password='pass')
+        room = Room.objects.create(name='Reading Room')
+        seats = [Seat.objects.create(room=room, seat_number=f'A{n:02d}') for n in range(1, 4)]
+        seat_of = dict(zip([3, 7, 11], seats))
+        rows = []
+        for seat_id, booking_start, booking_end in self.bookings(15, seed=11):
+            if seat_id not in seat_of:
+                continue
+            SeatBooking.objects.create(
+                user=user, seat=seat_of[seat_id], start_time=booking_start, end_time=booking_end, status='completed',
+            )
+            rows.append((seat_of[seat_id].id, booking_start, booking_end))
+        SeatBooking.objects.create(
+            user=user, seat=seats[0], start_time=self.start + timedelta(hours=1),
+            end_time=self.start + timedelta(hours=2), status='cancelled',
+        )
+
+        result = analytics.compute_occupancy(self.start_date, self.end_date)
+        expected = brute_force_occupancy(
+            rows, result['seat_ids'].tolist(), self.start, self.hours, self.start_date.weekday(),
+        )
+        np.testing.assert_allclose(result['seconds'], expected, atol=1e-6)
+        self.assertEqual(result['hour_counts'].sum(), self.hours)
+
+
+@override_settings(BOOKING_NO_SHOW_GRACE_MINUTES=15)
+class BookingLifecycleTests(TestCase):
+    """The sweep closes bookings nobody checked in to or out of, once"""
+
+    def setUp(self):
+        self.now = timezone.now().replace(microsecond=0)
+        user = User.objects.create_user(username='member', email='member@example.com', password='pass')
+        room = Room.objects.create(name='Reading Room')
+        self.seats = [Seat.objects.create(room=room, seat_number=f'A{n:02d}') for n in range(1, 7)]
+        self.bookings = {}
+        for seat, (name, status, start, end, checked_in, checked_out) in zip(self.seats, [
+            ('no_show', 'confirmed', -30, 90, None, None),
+            ('in_grace', 'confirmed', -10, 110, None, None),
+            ('checked_in', 'confirmed', -30, 90, -25, None),
+            ('finished', 'active', -180, -10, -175, None),
+            ('left_early', 'active', -180, -10, -175, -60),
+            ('running', 'active', -60, 60, -55, None),
+        ]):
+            self.bookings[name] = SeatBooking.objects.create(
+                user=user, seat=seat, status=status,
+                start_time=self.at(start), end_time=self.at(end),
+                checked_in_at=self.at(checked_in), checked_out_at=self.at(checked_out),
+            )
+        self.announced = []
+        receiver = lambda sender, **kwargs: self.announced.append((kwargs['reason'], kwargs['seat_ids']))
+        seat_availability_changed.connect(receiver, weak=False)
+        self.addCleanup(seat_availability_changed.disconnect, receiver)
+
+    def at(self, minutes):
+        return None if minutes is None else self.now + timedelta(minutes=minutes)
+
+    def state(self, name):
+        booking = SeatBooking.objects.get(id=self.bookings[name].id)
+        return booking.status, booking.checked_out_at
+
+    def test_sweep(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(lifecycle.sweep(self.now), {'no_show': 1, 'completed': 2})
+            self.assertEqual(self.announced, [])
+
+        self.assertEqual(self.state('no_show'), ('no_show', None))
+        self.assertEqual(self.state('in_grace'), ('confirmed', None))
+        self.assertEqual(self.state('checked_in'), ('confirmed', None))
+        self.assertEqual(self.state('finished'), ('completed', self.at(-10)))
+        self.assertEqual(self.state('left_early'), ('completed', self.at(-60)))
+        self.assertEqual(self.state('running'), ('active', None))
+        self.assertEqual(self.announced, [
+            ('no_show', [self.seats[0].id]),
+            ('completed', sorted([self.seats[3].id, self.seats[4].id])),
+        ])
+
+    def test_second_sweep_changes_nothing(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            lifecycle.sweep(self.now)
+        before = list(SeatBooking.objects.order_by('id').values_list('status', 'checked_out_at', 'updated_at'))
+        self.announced.clear()
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.assertEqual(lifecycle.sweep(self.now), {'no_show': 0, 'completed': 0})
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.announced, [])
+        after = list(SeatBooking.objects.order_by('id').values_list('status', 'checked_out_at', 'updated_at'))
+        self.assertEqual(after, before)
+
+
+class BookingPaginationTests(TestCase):
+    """(created_at, id) keyset pages visit every booking once, in order, both ways"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='member', email='member@example.com', password='pass')
+        room = Room.objects.create(name='Reading Room')
+        seat = Seat.objects.create(room=room, seat_number='A01')
+        start = timezone.make_aware(datetime(2030, 1, 7, 10))
+        created = timezone.make_aware(datetime(2026, 3, 1, 9))
+        # Three bookings share a created_at, so the id breaks the tie
+        offsets = [0, 5, 5, 5, 9, 12, 20]
+        for n, minutes in enumerate(offsets):
+            SeatBooking.objects.create(
+                user=self.user, seat=seat, status='completed', created_at=created + timedelta(minutes=minutes),
+                start_time=start + timedelta(days=n), end_time=start + timedelta(days=n, hours=1),
+            )
+        self.newest_first = list(SeatBooking.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_pages_forward_and_back(self):
+        pages, url = [], '/api/bookings/?page_size=3'
+        while url:
+            data = self.client.get(url).data
+            pages.append([booking['id'] for booking in data['results']])
+            last, url = data, data['next']
+        self.assertEqual(sum(pages, []), self.newest_first)
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+
+        back, url = [], last['previous']
+        while url:
+            data = self.client.get(url).data
+            back.insert(0, [booking['id'] for booking in data['results']])
+            url = data['previous']
+        self.assertEqual(back, pages[:-1])
+
+    def test_row_comparison_matches_or_form(self):
+        bookings = SeatBooking.objects.order_by('-created_at', '-id')
+        for booking in SeatBooking.objects.all():
+            for operator, newer in (('<', False), ('>', True)):
+                rows = bookings.filter(RowComparison(
+                    (F('created_at'), F('id')), operator,
+                    (Value(booking.created_at, output_field=DateTimeField()), Value(booking.id)),
+                ))
+                expected = CreatedAtCursorPagination.keyset_filter(bookings, booking.created_at, booking.id, newer)
+                self.assertEqual(list(rows.values_list('id', flat=True)), list(expected.values_list('id', flat=True)))
+
+
+class SlotSearchTests(TestCase):
+    """Free slots fall between merged bookings and inside opening hours"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='member', email='member@example.com', password='pass')
+        self.room = Room.objects.create(name='Reading Room', operating_hours={'open': '08:00', 'close': '20:00'})
+        self.seat = Seat.objects.create(room=self.room, seat_number='A01')
+        self.other = Seat.objects.create(room=self.room, seat_number='A02')
+        self.day = date(2030, 1, 7)  # Monday
+
+    def at(self, hour, minute=0, day=0):
+        return timezone.make_aware(datetime.combine(self.day + timedelta(days=day), datetime.min.time())) + timedelta(
+            hours=hour, minutes=minute,
+        )
+
+    def book(self, seat, start, end, status='confirmed'):
+        SeatBooking.objects.create(user=self.user, seat=seat, status=status, start_time=start, end_time=end)
+
+    def test_gaps_between_bookings_and_opening_hours(self):
+        self.book(self.seat, self.at(9), self.at(10))
+        self.book(self.seat, self.at(9, 30), self.at(12))
+        self.book(self.seat, self.at(14), self.at(15), status='active')
+        self.book(self.seat, self.at(12), self.at(14), status='cancelled')
+        self.book(self.seat, self.at(15, 30), self.at(16))
+
+        found = slots.find_slots([self.seat], timedelta(hours=1), earliest=self.at(7), days=1)
+        self.assertEqual(found[self.seat.id], [
+            (self.at(8), self.at(9)),
+            (self.at(12), self.at(14)),
+            (self.at(16), self.at(20)),
+        ])
+        # 30 minutes between the 15:00 and 15:30 bookings now fit
+        found = slots.find_slots([self.seat], timedelta(minutes=30), earliest=self.at(7), days=1, limit=3)
+        self.assertEqual(found[self.seat.id][2], (self.at(15), self.at(15, 30)))
+
+    def test_closed_days_and_overnight_hours(self):
+        self.room.operating_hours = {
+            'monday': {'open': '20:00', 'close': '02:00'},
+            'tuesday': None,
+            'wednesday': {'open': '09:00', 'close': '10:00'},
+        }
+        self.room.save()
+        self.book(self.seat, self.at(23), self.at(1, day=1))
+
+        found = slots.find_slots([self.seat], timedelta(hours=1), earliest=self.at(12), days=3)
+        self.assertEqual(found[self.seat.id], [
+            (self.at(20), self.at(23)),
+            (self.at(1, day=1), self.at(2, day=1)),
+            (self.at(9, day=2), self.at(10, day=2)),
+        ])
+
+    def test_first_slots_across_seats(self):
+        self.book(self.seat, self.at(8), self.at(12))
+        self.book(self.other, self.at(8), self.at(10))
+        ranked = slots.first_slots([self.seat, self.other], timedelta(hours=2), earliest=self.at(7), days=1, limit=2)
+        self.assertEqual(ranked, [
+            (self.other, self.at(10), self.at(20)),
+            (self.seat, self.at(12), self.at(20)),
+        ])
+
+    def test_start_is_rounded_up_to_the_minute(self):
+        self.room.operating_hours = {}
+        self.room.save()
+        found = slots.find_slots([self.seat], timedelta(hours=1), earliest=self.at(10, 0) + timedelta(seconds=30), days=1)
+        self.assertEqual(found[self.seat.id][0][0], self.at(10, 1))
+        found = slots.find_slots([self.seat], timedelta(hours=1), earliest=self.at(10, 0), days=1)
+        self.assertEqual(found[self.seat.id][0][0], self.at(10))
+
+
+class AdjacentSeatTests(TestCase):
+    """The sliding window finds k neighbouring free seats and ranks best fit first"""
+
+    def setUp(self):
+        user = User.objects.create_user(username='member', email='member@example.com', password='pass')
+        self.room = Room.objects.create(name='Reading Room')
+        # A1-A8 with A4 booked; B1-B3 with B2 under maintenance; C1-C3 with power at C3;
+        # D has no D3, so D1-D2 and D4-D5 are not neighbours
+        numbers = [f'A{n}' for n in range(1, 9)] + ['B1', 'B2', 'B3', 'C1', 'C2', 'C3', 'D1', 'D2', 'D4', 'D5']
+        self.seats = {
+            number: Seat.objects.create(
+                room=self.room, seat_number=number, has_power_outlet=number == 'C3',
+                status='maintenance' if number == 'B2' else 'available',
+            )
+            for number in numbers
+        }
+        self.start = timezone.make_aware(datetime(2030, 1, 7, 10))
+        self.end = self.start + timedelta(hours=2)
+        for number, status, offset in (('A4', 'confirmed', 1), ('C2', 'cancelled', 1), ('C1', 'active', 3)):
+            SeatBooking.objects.create(
+                user=user, seat=self.seats[number], status=status,
+                start_time=self.start + timedelta(hours=offset), end_time=self.start + timedelta(hours=offset + 1),
+            )
+
+    def groups(self, count, **kwargs):
+        return [
+            [seat['seat_number'] for seat in group['seats']]
+            for group in adjacency.find_adjacent(count, self.start, self.end, limit=20, **kwargs)
+        ]
+
+    def test_best_fit_ranking(self):
+        self.assertEqual(self.groups(3), [
+            ['C1', 'C2', 'C3'],  # exact fit with a power outlet
+            ['A1', 'A2', 'A3'],  # exact fit
+            ['A5', 'A6', 'A7'],  # end of a run of 4
+            ['A6', 'A7', 'A8'],
+        ])
+
+    def test_windows_that_split_a_run_come_last(self):
+        groups = self.groups(2)
+        # Exact fits, then a run of 3 with the outlet, then by row
+        self.assertEqual(groups[:5], [['D1', 'D2'], ['D4', 'D5'], ['C2', 'C3'], ['A1', 'A2'], ['A2', 'A3']])
+        a_run = [group for group in groups if group[0] in ('A5', 'A6', 'A7')]
+        self.assertEqual(a_run, [['A5', 'A6'], ['A7', 'A8'], ['A6', 'A7']])
+        self.assertFalse([group for group in groups if 'A4' in group or 'B2' in group])
+
+    def test_room_and_seat_type_filters(self):
+        self.assertEqual(self.groups(3, room_id=self.room.id + 1), [])
+        self.assertEqual(self.groups(3, seat_type='computer'), [])
+        self.assertEqual(self.groups(9), [])
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.get(username='member'))
+        response = client.get('/api/seats/adjacent-seats/', {
+            'count': 3, 'date': '2030-01-07', 'start_time': '10:00', 'end_time': '12:00', 'limit': 2,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [[seat['seat_number'] for seat in group['seats']] for group in response.data['groups']],
+            [['C1', 'C2', 'C3'], ['A1', 'A2', 'A3']],
+        )
+        self.assertEqual(response.data['groups'][0]['run_length'], 3)
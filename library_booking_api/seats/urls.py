@@ -4,5 +4,10 @@ from . import views
 # Only custom endpoints, ViewSets are handled by main router
 urlpatterns = [
     path('available-seats/', views.available_seats, name='available-seats'),
+    path('adjacent-seats/', views.adjacent_seats, name='adjacent-seats'),
+    path('next-available/', views.next_available, name='next-available'),
+    path('free-busy/', views.free_busy, name='free-busy'),
+    path('analytics/heatmap/', views.occupancy_heatmap, name='seat-occupancy-heatmap'),
+    path('analytics/utilization/', views.utilization, name='seat-utilization'),
     path('my-bookings/', views.my_bookings, name='my-bookings'),
 ]
\ No newline at end of file
@@ -1,11 +1,19 @@
+import math
+from datetime import date, timedelta
+
 from rest_framework import viewsets, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.db.models import Q
+from library_booking_api.db_router import replica_read
+from library_booking_api.exports import date_range_filters, get_export_format, stream_export
+from library_booking_api.pagination import CreatedAtCursorPagination
 from .models import Room, Seat, SeatBooking
+from . import adjacency, analytics, freebusy, slots
 from .serializers import RoomSerializer, SeatSerializer, SeatBookingSerializer, SeatBookingCreateSerializer
 
 
@@ -38,7 +46,7 @@ class SeatViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         # Use select_related to prefetch room to avoid N+1 queries and ensure room is loaded
-        queryset = Seat.objects.filter(is_active=True).select_related('room')
+        queryset = Seat.objects.filter(is_active=True).select_related('room').with_current_booking()
         room_id = self.request.query_params.get('room', None)
         status_filter = self.request.query_params.get('status', None)
 
@@ -57,6 +65,7 @@ class SeatBookingViewSet(viewsets.ModelViewSet):
     queryset = SeatBooking.objects.all()
     serializer_class = SeatBookingSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
     parser_classes = [MultiPartParser, FormParser, JSONParser]  # Support file uploads
 
     def get_queryset(self):
@@ -92,6 +101,38 @@ class SeatBookingViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def export(self, request):
+        """Stream seat bookings as CSV or NDJSON (admin only)"""
+        file_format = get_export_format(request)
+        if not file_format:
+            return Response(
+                {'error': 'file_format must be csv or ndjson'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            bookings = self.get_queryset().filter(**date_range_filters(request, 'start_time'))
+            user_id = request.query_params.get('user_id')
+            if user_id:
+                bookings = bookings.filter(user_id=int(user_id))
+        except ValueError:
+            return Response(
+                {'error': 'Dates must be in YYYY-MM-DD format and user_id a number'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        status_filter = request.query_params.get('status')
+        if status_filter:
+            bookings = bookings.filter(status=status_filter)
+
+        fields = [
+            'id', 'booking_reference', 'user_id', 'user__email', 'seat_id', 'seat__seat_number',
+            'seat__room__name', 'start_time', 'end_time', 'duration_hours', 'status',
+            'payment_id', 'purpose', 'checked_in_at', 'checked_out_at', 'created_at',
+        ]
+        return stream_export(bookings.order_by('id'), fields, file_format, 'seat_bookings')
+
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -118,16 +159,16 @@ def available_seats(request):
         start_datetime = timezone.make_aware(start_datetime)
         end_datetime = timezone.make_aware(end_datetime)
 
-        # Get available seats
+        # Get available seats (same conflict rule as Seat.is_available_for_booking, one query for all seats)
         seats = Seat.objects.filter(is_active=True, status='available')
 
         if room_id:
             seats = seats.filter(room_id=room_id)
 
-        available_seats = []
-        for seat in seats:
-            if seat.is_available_for_booking(start_datetime, end_datetime):
-                available_seats.append(seat)
+        busy = SeatBooking.objects.filter(
+            status__in=slots.HOLDING_STATUSES, start_time__lt=end_datetime, end_time__gt=start_datetime,
+        ).values('seat_id')
+        available_seats = seats.exclude(id__in=busy).select_related('room').with_current_booking()
 
         serializer = SeatSerializer(available_seats, many=True)
         return Response(serializer.data)
@@ -139,6 +180,185 @@ def available_seats(request):
         )
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def adjacent_seats(request):
+    """
+    Groups of `count` neighbouring seats free for date/start_time/end_time
+    (same format as available-seats), best fit first. Optional: room, seat_type, limit.
+    """
+    date_str = request.query_params.get('date')
+    start_time_str = request.query_params.get('start_time')
+    end_time_str = request.query_params.get('end_time')
+    room_id = request.query_params.get('room')
+    seat_type = request.query_params.get('seat_type')
+
+    if not all([date_str, start_time_str, end_time_str, request.query_params.get('count')]):
+        return Response(
+            {'error': 'count, date, start_time, and end_time are required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        from datetime import datetime
+        room_id = int(room_id) if room_id else None
+        count = int(request.query_params['count'])
+        limit = min(max(int(request.query_params.get('limit', 5)), 1), 50)
+        start_datetime = timezone.make_aware(datetime.fromisoformat(f"{date_str}T{start_time_str}"))
+        end_datetime = timezone.make_aware(datetime.fromisoformat(f"{date_str}T{end_time_str}"))
+    except ValueError as e:
+        return Response(
+            {'error': f'Invalid count, room or date/time format: {str(e)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if not 1 <= count <= 20:
+        return Response({'error': 'count must be between 1 and 20'}, status=status.HTTP_400_BAD_REQUEST)
+    if end_datetime <= start_datetime:
+        return Response({'error': 'end_time must be after start_time'}, status=status.HTTP_400_BAD_REQUEST)
+    if seat_type and seat_type not in dict(Seat.SEAT_TYPE_CHOICES):
+        return Response({'error': 'Unknown seat_type'}, status=status.HTTP_400_BAD_REQUEST)
+
+    groups = adjacency.find_adjacent(count, start_datetime, end_datetime, room_id, seat_type or None, limit)
+    return Response({'count': count, 'start_time': start_datetime, 'end_time': end_datetime, 'groups': groups})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def next_available(request):
+    """
+    First free slots of a given length for a seat (?seat=) or across a room (?room=).
+    Params: duration_hours (required), earliest (ISO datetime, default now),
+    limit (default 5), days to search ahead (default SLOT_SEARCH_DAYS).
+    """
+    seat_id = request.query_params.get('seat')
+    room_id = request.query_params.get('room')
+    if bool(seat_id) == bool(room_id):
+        return Response(
+            {'error': 'Pass exactly one of seat or room'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        seat_id = int(seat_id) if seat_id else None
+        room_id = int(room_id) if room_id else None
+        duration_hours = float(request.query_params['duration_hours'])
+        limit = min(max(int(request.query_params.get('limit', 5)), 1), 50)
+        days = min(max(int(request.query_params.get('days', slots.search_days())), 1), 31)
+    except (KeyError, ValueError):
+        return Response(
+            {'error': 'duration_hours is required; seat, room, duration_hours, limit and days must be numbers'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if not math.isfinite(duration_hours) or not 0 < duration_hours <= days * 24:
+        return Response(
+            {'error': 'duration_hours must be positive and fit in the search window'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    earliest = timezone.now()
+    if request.query_params.get('earliest'):
+        try:
+            earliest = parse_datetime(request.query_params['earliest'])
+        except ValueError:
+            earliest = None
+        if earliest is None:
+            return Response({'error': 'earliest must be an ISO datetime'}, status=status.HTTP_400_BAD_REQUEST)
+        if timezone.is_naive(earliest):
+            earliest = timezone.make_aware(earliest)
+        earliest = max(earliest, timezone.now())
+
+    seats = Seat.objects.filter(is_active=True, status='available', room__is_active=True).select_related('room')
+    seats = list(seats.filter(pk=seat_id) if seat_id else seats.filter(room_id=room_id))
+    if not seats:
+        return Response({'error': 'No bookable seat found'}, status=status.HTTP_404_NOT_FOUND)
+
+    duration = timedelta(hours=duration_hours)
+
+    def slot(seat, start, available_until):
+        return {
+            'seat': seat.pk, 'seat_number': seat.seat_number,
+            'start_time': start, 'end_time': start + duration, 'available_until': available_until,
+        }
+
+    if seat_id:
+        found = slots.find_slots(seats, duration, earliest, days, limit)[seats[0].pk]
+        results = [slot(seats[0], start, available_until) for start, available_until in found]
+    else:
+        results = [slot(*found) for found in slots.first_slots(seats, duration, earliest, days, limit)]
+
+    return Response({
+        'seat': seat_id,
+        'room': seats[0].room_id,
+        'duration_hours': duration_hours,
+        'slots': results,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def free_busy(request):
+    """
+    Per-day, per-slot busy counts for a seat (?seat=) or room (?room=) from
+    start_date to end_date (YYYY-MM-DD, inclusive; default a month from today).
+    Optional slot_minutes (default FREE_BUSY_SLOT_MINUTES). Supports If-None-Match.
+    """
+    seat_id = request.query_params.get('seat')
+    room_id = request.query_params.get('room')
+    if bool(seat_id) == bool(room_id):
+        return Response(
+            {'error': 'Pass exactly one of seat or room'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        seat_id = int(seat_id) if seat_id else None
+        room_id = int(room_id) if room_id else None
+        start_date = date.fromisoformat(request.query_params.get('start_date') or timezone.localdate().isoformat())
+        end_date = request.query_params.get('end_date')
+        end_date = date.fromisoformat(end_date) if end_date else start_date + timedelta(days=30)
+        slot_minutes = int(request.query_params.get('slot_minutes', freebusy.default_slot_minutes()))
+    except ValueError:
+        return Response(
+            {'error': 'Dates must be in YYYY-MM-DD format; seat, room and slot_minutes must be numbers'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if end_date < start_date or (end_date - start_date).days >= freebusy.max_days():
+        return Response(
+            {'error': f'end_date must be on or after start_date and at most {freebusy.max_days()} days later'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if slot_minutes < 15 or (24 * 60) % slot_minutes:
+        return Response(
+            {'error': 'slot_minutes must be at least 15 and divide a day evenly'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    seats = Seat.objects.filter(is_active=True)
+    seats = seats.filter(pk=seat_id) if seat_id else seats.filter(room_id=room_id)
+    seat_ids = list(seats.values_list('id', flat=True))
+    if not seat_ids:
+        return Response({'error': 'No seats found'}, status=status.HTTP_404_NOT_FOUND)
+
+    tag = freebusy.etag(seat_ids, start_date, end_date, slot_minutes)
+    headers = {
+        'ETag': f'"{tag}"',
+        'Cache-Control': f"private, max-age={freebusy.max_age()}",
+    }
+    if f'"{tag}"' in request.headers.get('If-None-Match', ''):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    grid = freebusy.grid(seat_ids, start_date, end_date, slot_minutes, tag)
+    return Response({
+        'seat': seat_id,
+        'room': room_id,
+        'start_date': start_date,
+        'end_date': end_date,
+        **grid,
+    }, headers=headers)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def my_bookings(request):
@@ -216,3 +436,46 @@ def check_out(request, booking_id):
             {'error': str(e)},
             status=status.HTTP_400_BAD_REQUEST
         )
+
+
+def _analytics_period(request):
+    """(start_date, end_date) from ?start_date=&end_date= (YYYY-MM-DD); raises ValueError"""
+    start_date = request.query_params.get('start_date')
+    end_date = request.query_params.get('end_date')
+    return analytics.period_bounds(
+        date.fromisoformat(start_date) if start_date else None,
+        date.fromisoformat(end_date) if end_date else None,
+    )
+
+
+@replica_read
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def occupancy_heatmap(request):
+    """Per-room utilization by weekday x hour (?start_date=&end_date=&room=)"""
+    try:
+        start_date, end_date = _analytics_period(request)
+        room_id = int(request.query_params['room']) if request.query_params.get('room') else None
+    except ValueError as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        'start_date': start_date,
+        'end_date': end_date,
+        'rooms': analytics.heatmap(start_date, end_date, room_id),
+    })
+
+
+@replica_read
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def utilization(request):
+    """Utilization grouped by room, hour, weekday, seat_type, has_power_outlet or is_near_window"""
+    group_by = request.query_params.get('group_by', 'room')
+    try:
+        start_date, end_date = _analytics_period(request)
+        groups = analytics.utilization(start_date, end_date, group_by)
+    except ValueError as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({'start_date': start_date, 'end_date': end_date, 'group_by': group_by, 'groups': groups})